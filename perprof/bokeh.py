@@ -4,6 +4,17 @@ import gettext
 import os.path
 
 import bokeh.plotting as plt
+import numpy as np
+from bokeh.layouts import column, row
+from bokeh.models import (
+    CheckboxGroup,
+    ColumnDataSource,
+    CustomJS,
+    HoverTool,
+    RadioButtonGroup,
+    Slider,
+    TextInput,
+)
 
 from . import prof
 
@@ -11,6 +22,83 @@ THIS_DIR, THIS_FILENAME = os.path.split(__file__)
 THIS_TRANSLATION = gettext.translation("perprof", os.path.join(THIS_DIR, "locale"))
 _ = THIS_TRANSLATION.gettext
 
+# Maximum number of problem names shown in a tooltip
+MAX_HOVER_PROBLEMS = 10
+
+# Recomputes the profiles of the interactive report in the browser
+INTERACTIVE_JS = """
+const tau = slider.value;
+const active = solvers.active;
+let pattern = null;
+try {
+  pattern = subset.value ? new RegExp(subset.value) : null;
+} catch (error) {
+  pattern = null;
+}
+const names = data.data["name"];
+const ratios = active.map((j) => data.data["ratio" + j]);
+const optimal = active.map((j) => data.data["optimal" + j]);
+const rows = [];
+for (let i = 0; i < names.length; i++) {
+  if (pattern === null || pattern.test(names[i])) {
+    rows.push(i);
+  }
+}
+// The ratios are relative to the fastest selected solver
+const best = rows.map((i) => {
+  let any = Infinity;
+  let eligible = Infinity;
+  for (let k = 0; k < active.length; k++) {
+    const r = ratios[k][i];
+    any = Math.min(any, r);
+    if (optimal[k] === undefined || optimal[k][i]) {
+      eligible = Math.min(eligible, r);
+    }
+  }
+  return eligible < Infinity ? eligible : any;
+});
+const n = rows.length;
+for (let j = 0; j < sources.length; j++) {
+  const k = active.indexOf(j);
+  const x = [];
+  const y = [];
+  if (k >= 0 && n > 0) {
+    const values = [];
+    rows.forEach((i, m) => {
+      const r = ratios[k][i] / best[m];
+      if (r <= tau) {
+        values.push(r);
+      }
+    });
+    values.sort((a, b) => a - b);
+    let m = 0;
+    while (m < values.length && values[m] <= 1) {
+      m++;
+    }
+    x.push(1);
+    y.push(m / n);
+    while (m < values.length) {
+      const v = values[m];
+      while (m < values.length && values[m] === v) {
+        m++;
+      }
+      x.push(v);
+      y.push(m / n);
+    }
+    x.push(tau);
+    y.push(m / n);
+  }
+  sources[j].data = {x: x, y: y};
+  for (const fig of figures) {
+    fig.renderers[j].visible = k >= 0;
+  }
+}
+for (let f = 0; f < figures.length; f++) {
+  figures[f].x_range.end = tau;
+  figures[f].visible = scale.active === f;
+}
+"""
+
 # TODO: Add more colors to list and compatible with others backend
 BOKEH_COLOR_LIST = ["blue", "green", "red", "cyan", "magenta", "yellow"]
 
@@ -74,6 +162,7 @@ class Profiler(prof.Pdata):
                 - semilog: Use logarithmic x-axis scaling
                 - lang: Language for plot labels
                 - title/xlabel/ylabel: Plot text customization
+                - interactive: Write the report of `interactive_report`
 
         Note:
             Color customization and black_and_white options are not supported
@@ -94,6 +183,7 @@ class Profiler(prof.Pdata):
                 f"{profiler_options['output']}.{profiler_options['output_format']}"
             )
         self.output_format = profiler_options["output_format"]
+        self.interactive = profiler_options.get("interactive", False)
 
         # Language for the plot
         translation = gettext.translation(
@@ -112,7 +202,8 @@ class Profiler(prof.Pdata):
 
         Interactive features:
         - Zoom and pan controls for detailed analysis
-        - Hover tooltips (planned feature, not yet implemented)
+        - Hover tooltips with the ratio, the fraction of problems solved and the
+          problems solved since the previous point (see `ProfileData.drilldown`)
         - Legend entries for toggling solver visibility
         - Responsive layout for different screen sizes
         - Grid lines with customizable transparency
@@ -140,6 +231,9 @@ class Profiler(prof.Pdata):
         self.pre_plot()
 
         plt.output_file(self.output, title=self.plot_lang(self.title))
+        if self.interactive:
+            plt.save(self.interactive_report())
+            return
 
         # Axis
         try:
@@ -161,16 +255,36 @@ class Profiler(prof.Pdata):
         )
 
         for idx, solver in enumerate(self.solvers):
+            source = ColumnDataSource(
+                {
+                    "x": self.times,
+                    "y": self.ppsbt[solver],
+                    "solver": [solver] * len(self.times),
+                    "problems": self.hover_problems(solver),
+                }
+            )
             p.line(
-                self.times,
-                self.ppsbt[solver],
-                legend=solver,
+                "x",
+                "y",
+                source=source,
+                legend_label=solver,
                 line_width=2,
                 line_color=BOKEH_COLOR_LIST[idx % len(BOKEH_COLOR_LIST)],
             )
 
+        p.add_tools(
+            HoverTool(
+                tooltips=[
+                    (self.plot_lang("Solver"), "@solver"),
+                    (self.plot_lang("Ratio"), "@x{0.000}"),
+                    (self.plot_lang("Solved"), "@y{0.0%}"),
+                    (self.plot_lang("Problems"), "@problems"),
+                ]
+            )
+        )
+
         # Legend
-        p.legend.orientation = "bottom_right"
+        p.legend.location = "bottom_right"
 
         # Help lines
         p.grid.grid_line_color = "black"
@@ -178,3 +292,127 @@ class Profiler(prof.Pdata):
 
         # Save the plot
         plt.save(p)
+
+    def hover_problems(self, solver):
+        """List the problems that a solver solves at each point of the plot.
+
+        Args:
+            solver (str): name of the solver
+
+        Returns:
+            list[str]: for each time, the problems solved with ratio in
+                (previous time, time], separated by commas, or empty strings if
+                the profile was loaded from a file
+        """
+        if self.profile is None:
+            return [""] * len(self.times)
+        index = self.profile.drilldown()
+        hover = []
+        previous = -float("inf")
+        for time in self.times:
+            problems = index.problems_between(solver, previous, time)
+            text = ", ".join(problems[:MAX_HOVER_PROBLEMS])
+            if len(problems) > MAX_HOVER_PROBLEMS:
+                text += f", ... (+{len(problems) - MAX_HOVER_PROBLEMS})"
+            hover.append(text)
+            previous = time
+        return hover
+
+    def interactive_report(self):
+        """Build a report whose profiles are recomputed in the browser.
+
+        The ratios of all the problems are embedded once, as float32, with the
+        problem names. A slider sets tau, a toggle switches between the linear
+        and the log scale, checkboxes select the solvers, and a regular
+        expression selects the problems. On every change, a CustomJS callback
+        recomputes the profiles, with the ratios relative to the fastest
+        selected solver, so exploring the comparison needs no more perprof runs.
+
+        Returns:
+            bokeh.models.LayoutDOM: the layout of the report
+
+        Raises:
+            ValueError: If the ratios are not available, e.g., if the profile was
+                loaded from a file without them.
+        """
+        profile = self.profile
+        if profile is None or profile.ratio is None or profile.problems is None:
+            raise ValueError(
+                _("ERROR: the interactive report needs the ratios of the problems")
+            )
+        ratio = profile.ratio.astype(np.float32)
+        # With the optimal values comparison, only optimal runs can be the fastest
+        optimal = profile._optimal  # pylint: disable=protected-access
+        data = {"name": list(profile.problems)}
+        for j in range(len(profile.algnames)):
+            data[f"ratio{j}"] = ratio[:, j]
+            if optimal is not None:
+                data[f"optimal{j}"] = optimal[:, j].astype(np.uint8)
+
+        finite = ratio[ratio < float("inf")]
+        max_ratio = max(float(finite.max()) if finite.size > 0 else 1.0, 1.01)
+        tau = min(self.tau, max_ratio) if self.tau else max_ratio
+        slider = Slider(
+            start=1.0,
+            end=max_ratio,
+            value=tau,
+            step=(max_ratio - 1) / 1000,
+            title="tau",
+        )
+        scale = RadioButtonGroup(labels=["linear", "log"], active=int(self.semilog))
+        solvers = CheckboxGroup(
+            labels=list(profile.algnames), active=list(range(len(profile.algnames)))
+        )
+        subset = TextInput(
+            title=self.plot_lang("Problems (regular expression)"), value=""
+        )
+
+        sources = [
+            ColumnDataSource({"x": self.times, "y": self.ppsbt[solver]})
+            for solver in profile.algnames
+        ]
+        figures = []
+        for axis_type in ["linear", "log"]:
+            fig = plt.figure(
+                title=self.plot_lang(self.title),
+                x_axis_label=self.plot_lang(self.xlabel),
+                y_axis_label=self.plot_lang(self.ylabel),
+                x_axis_type=axis_type,
+                x_range=[1, tau],
+                y_range=[0, 1],
+                visible=(axis_type == "log") == self.semilog,
+            )
+            for idx, (solver, source) in enumerate(zip(profile.algnames, sources)):
+                fig.step(
+                    "x",
+                    "y",
+                    source=source,
+                    mode="after",
+                    legend_label=solver,
+                    line_width=2,
+                    line_color=BOKEH_COLOR_LIST[idx % len(BOKEH_COLOR_LIST)],
+                )
+            fig.legend.location = "bottom_right"
+            fig.legend.click_policy = "hide"
+            fig.grid.grid_line_color = "black"
+            fig.grid.grid_line_alpha = 0.5
+            figures.append(fig)
+
+        callback = CustomJS(
+            args={
+                "data": ColumnDataSource(data),
+                "sources": sources,
+                "figures": figures,
+                "slider": slider,
+                "scale": scale,
+                "solvers": solvers,
+                "subset": subset,
+            },
+            code=INTERACTIVE_JS,
+        )
+        slider.js_on_change("value", callback)
+        scale.js_on_change("active", callback)
+        solvers.js_on_change("active", callback)
+        subset.js_on_change("value", callback)
+
+        return column(row(slider, scale, subset), row(column(*figures), solvers))
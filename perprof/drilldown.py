@@ -0,0 +1,127 @@
+"""Drill-down from a performance profile back to its problems.
+
+A `DrillDownIndex` sorts the ratios of each solver once, keeping the order of
+the problems (an argsort per solver). The problems solved by a solver within a
+ratio tau are then a prefix of its order, found by binary search, so listing
+them costs O(log P + k) for P problems and k results, instead of a scan of the
+whole ratio matrix. This answers which problems make a curve jump between two
+breakpoints.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class DrillDownIndex:
+    """Index from the ratios of each solver back to the problems.
+
+    Attributes:
+        algnames (list[str]): Names of the solvers.
+        problems (pandas.Index): Names of the problems, the rows of `ratio`.
+        ratio (numpy.ndarray): Ratio matrix of shape (n_problems, n_solvers).
+        order (numpy.ndarray): Problems sorted by ratio, for each solver (column).
+        sorted_ratio (numpy.ndarray): Ratios of each solver, in ascending order.
+
+    Example:
+        >>> import numpy as np
+        >>> from perprof.drilldown import DrillDownIndex
+        >>> ratio = np.array([[1.0, 2.0], [1.0, 1.0], [np.inf, 1.0], [3.0, 1.0]])
+        >>> index = DrillDownIndex(ratio, ["p1", "p2", "p3", "p4"], ["A", "B"])
+        >>> index.problems_within("A", 2.0).tolist()
+        ['p1', 'p2']
+        >>> index.problems_between("A", 1.0, 5.0).tolist()
+        ['p4']
+        >>> index.best_solvers("p2")
+        ['A', 'B']
+    """
+
+    def __init__(
+        self, ratio: np.ndarray, problems: Sequence[str], algnames: Sequence[str]
+    ) -> None:
+        """Sort the ratios of each solver.
+
+        Args:
+            ratio (numpy.ndarray): Ratio matrix of shape (n_problems, n_solvers),
+                with infinite values for the problems not solved.
+            problems (Sequence[str]): Names of the problems, the rows of `ratio`.
+            algnames (Sequence[str]): Names of the solvers, the columns of `ratio`.
+        """
+        self.algnames = list(algnames)
+        self.problems = pd.Index(problems, dtype=object)
+        self.ratio = ratio
+        self.order = np.argsort(ratio, axis=0, kind="stable")
+        self.sorted_ratio = np.take_along_axis(ratio, self.order, axis=0)
+
+    def _range(self, solver: str, tau1: float, tau2: float) -> tuple[int, int, int]:
+        """Find the column of a solver and its sorted rows with tau1 < ratio <= tau2.
+
+        Raises:
+            KeyError: If the solver is not in the profile.
+        """
+        try:
+            j = self.algnames.index(solver)
+        except ValueError:
+            raise KeyError(solver) from None
+        start, stop = np.searchsorted(self.sorted_ratio[:, j], [tau1, tau2], "right")
+        return j, int(start), int(stop)
+
+    def problems_within(self, solver: str, tau: float) -> pd.Index:
+        """List the problems solved by a solver within a ratio.
+
+        Args:
+            solver (str): Name of the solver.
+            tau (float): The ratio.
+
+        Returns:
+            pandas.Index: The problems with ratio <= tau, sorted by ratio.
+        """
+        return self.problems_between(solver, -np.inf, tau)
+
+    def problems_between(self, solver: str, tau1: float, tau2: float) -> pd.Index:
+        """List the problems that a solver solves between two ratios.
+
+        These are the problems that make the profile of the solver go up from
+        `tau1` to `tau2`.
+
+        Args:
+            solver (str): Name of the solver.
+            tau1 (float): The lower ratio, excluded.
+            tau2 (float): The upper ratio, included.
+
+        Returns:
+            pandas.Index: The problems with tau1 < ratio <= tau2, sorted by ratio.
+        """
+        j, start, stop = self._range(solver, tau1, tau2)
+        return self.problems[self.order[start:stop, j]]
+
+    def ratios_between(self, solver: str, tau1: float, tau2: float) -> pd.Series:
+        """Return the ratios of the problems of `problems_between`.
+
+        Returns:
+            pandas.Series: The ratios, indexed by the problems, in ascending order.
+        """
+        j, start, stop = self._range(solver, tau1, tau2)
+        return pd.Series(
+            self.sorted_ratio[start:stop, j],
+            index=self.problems[self.order[start:stop, j]],
+        )
+
+    def best_solvers(self, problem: str) -> list[str]:
+        """Name the fastest solvers of a problem.
+
+        Args:
+            problem (str): Name of the problem.
+
+        Returns:
+            list[str]: The solvers with ratio 1 (more than one in case of ties),
+                or an empty list if no solver solved the problem.
+
+        Raises:
+            KeyError: If the problem is not in the profile.
+        """
+        row = self.ratio[self.problems.get_loc(problem)]
+        return [self.algnames[j] for j in np.flatnonzero(row <= 1)]
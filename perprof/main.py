@@ -8,7 +8,10 @@ import logging
 import os.path
 import sys
 import warnings
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
+
+if TYPE_CHECKING:
+    from .selection import ProblemSelection
 
 # pylint: disable=import-outside-toplevel
 
@@ -78,7 +81,7 @@ class ParserOptions(TypedDict):
     compare: str
     unc: bool
     infeas_tol: float
-    subset: list[str]
+    subset: ProblemSelection | None
 
 
 class ProfilerOptions(TypedDict):
@@ -101,6 +104,17 @@ class ProfilerOptions(TypedDict):
     background: tuple[int, int, int] | None
     page_background: tuple[int, int, int] | None
     output_format: str | None
+    load_profile: str | None
+    grid: int | None
+    grid_scale: str
+    max_memory: int | None
+    pdf_timeout: float | None
+    interactive: bool
+    many_solvers: bool
+    highlight: list[str] | None
+    colormap: str
+    rasterize_dpi: float | None
+    simplify_threshold: float | None
 
 
 # pylint: disable=too-many-statements,too-many-branches
@@ -139,7 +153,7 @@ def process_arguments(
         "compare": args.compare,
         "unc": args.unconstrained,
         "infeas_tol": args.infeasibility_tolerance,
-        "subset": [],  # Will be set below if args.subset exists
+        "subset": None,  # Will be set below if args.subset or args.filter exists
     }
 
     profiler_options: ProfilerOptions = {
@@ -160,6 +174,17 @@ def process_arguments(
         "background": None,  # Will be set below if args.background exists
         "page_background": None,  # Will be set below if args.page_background exists
         "output_format": None,  # Will be set below based on args
+        "load_profile": args.load_profile,
+        "grid": args.grid,
+        "grid_scale": args.grid_scale,
+        "max_memory": args.max_memory,
+        "pdf_timeout": args.pdf_timeout,
+        "interactive": args.interactive,
+        "many_solvers": args.many_solvers,
+        "highlight": args.highlight.split(",") if args.highlight else None,
+        "colormap": args.colormap,
+        "rasterize_dpi": args.rasterize,
+        "simplify_threshold": args.simplify_threshold,
     }
 
     if args.no_title:
@@ -229,16 +254,74 @@ def process_arguments(
         )
     if args.table and output_format:
         raise NotImplementedError(_("--table only write to .tex or to standard output"))
-
+    if args.formats and (args.raw or args.table):
+        raise NotImplementedError(_("--formats requires --bokeh, --mp or --tikz"))
+    if args.table_format and not args.table:
+        raise NotImplementedError(_("--table-format requires --table"))
+    if args.raw_format and not args.raw:
+        raise NotImplementedError(_("--raw-format requires --raw"))
+    if args.highlight and not args.many_solvers:
+        raise NotImplementedError(_("--highlight requires --many-solvers"))
+    if args.raw and args.load_profile:
+        raise NotImplementedError(_("--raw does not support --load-profile"))
+
+    from .selection import ProblemSelection
+
+    attributes = None
+    if args.problem_attributes:
+        import pandas as pd
+
+        attributes = pd.read_csv(args.problem_attributes)
     if args.subset:
-        with open(args.subset, encoding="utf-8") as subset_file:
-            parser_options["subset"] = [line.strip() for line in subset_file]
-        if len(parser_options["subset"]) == 0:
+        parser_options["subset"] = ProblemSelection.from_file(
+            args.subset, attributes=attributes, filters=args.filter
+        )
+        if parser_options["subset"].is_empty():
             raise AttributeError(_("ERROR: Subset is empty"))
+    elif args.filter:
+        if attributes is None:
+            raise AttributeError(_("ERROR: --filter requires --problem-attributes"))
+        parser_options["subset"] = ProblemSelection(
+            attributes=attributes, filters=args.filter
+        )
 
     return parser_options, profiler_options
 
 
+def memory_size(text: str) -> int:
+    """Convert a memory size such as "512M" or "2G" into a number of bytes.
+
+    Args:
+        text (str): A number, optionally followed by K, M, G or T (powers of 1024)
+            and by B.
+
+    Returns:
+        int: The number of bytes.
+
+    Raises:
+        argparse.ArgumentTypeError: If the size is not valid.
+
+    Example:
+        >>> from perprof.main import memory_size
+        >>> memory_size("512M"), memory_size("1.5GB"), memory_size("1000")
+        (536870912, 1610612736, 1000)
+    """
+    units = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+    number = text.strip().upper()
+    if number.endswith("B"):
+        number = number[:-1]
+    unit = number[-1:] if number[-1:] in units else ""
+    try:
+        size = float(number[: len(number) - len(unit)])
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            _("invalid memory size: {}").format(text)
+        ) from None
+    if size <= 0:
+        raise argparse.ArgumentTypeError(_("invalid memory size: {}").format(text))
+    return int(size * units[unit])
+
+
 def set_arguments(args: list[str]) -> argparse.Namespace:
     """Parse and validate command-line arguments for perprof.
 
@@ -289,13 +372,30 @@ def set_arguments(args: list[str]) -> argparse.Namespace:
     backend.add_argument(
         "--raw",
         action="store_true",
-        help=_("Print raw data. Default output: standard output"),
+        help=_("Print raw data (see --raw-format). Default output: standard output"),
     )
     backend.add_argument(
         "--table",
         action="store_true",
         help=_("Print table of robustness and efficiency"),
     )
+    backend_args.add_argument(
+        "--table-format",
+        choices=["text", "csv", "tex"],
+        help=_(
+            "With --table, print a table of summary metrics (robustness, "
+            "efficiency, area under the profile, shifted geometric mean of the "
+            "times, wins, ties and ratio at 50%% and 90%% solved) in this format"
+        ),
+    )
+    backend_args.add_argument(
+        "--raw-format",
+        choices=["table", "csv", "tsv", "jsonl"],
+        help=_(
+            "With --raw, write one problem per line in this format (default: "
+            "table), to the standard output or to the output file"
+        ),
+    )
 
     output_format_args = parser.add_argument_group(_("Output formats"))
     output_format = output_format_args.add_mutually_exclusive_group()
@@ -337,6 +437,56 @@ def set_arguments(args: list[str]) -> argparse.Namespace:
         help=_("Set pgfplots backwards compatibility mode to given version"),
     )
 
+    bokeh_options = parser.add_argument_group(_("Bokeh options"))
+    bokeh_options.add_argument(
+        "--interactive",
+        action="store_true",
+        help=_(
+            "Embed the ratios in the HTML file, with controls for tau, the scale, "
+            "the solvers and the problems, recomputed in the browser"
+        ),
+    )
+
+    mp_options = parser.add_argument_group(_("Matplotlib options"))
+    mp_options.add_argument(
+        "--many-solvers",
+        action="store_true",
+        help=_(
+            "Draw all the curves as a single artist colored by --colormap, "
+            "for hundreds of solvers"
+        ),
+    )
+    mp_options.add_argument(
+        "--highlight",
+        help=_(
+            "Comma-separated solvers drawn on top of the others, with a legend "
+            "entry each, with --many-solvers"
+        ),
+    )
+    mp_options.add_argument(
+        "--colormap",
+        default="viridis",
+        help=_("Matplotlib colormap of the curves with --many-solvers"),
+    )
+    mp_options.add_argument(
+        "--rasterize",
+        type=float,
+        metavar="DPI",
+        help=_(
+            "Rasterize the curves at this resolution, keeping the axes and the "
+            "text as vector graphics, for huge profiles in pdf, svg, eps or ps"
+        ),
+    )
+    mp_options.add_argument(
+        "--simplify-threshold",
+        type=float,
+        metavar="PIXELS",
+        help=_(
+            "Largest distance of the vertices removed from the curves by path "
+            "simplification. Default: the one of matplotlib (1/9)"
+        ),
+    )
+
     parser.add_argument(
         "--lang",
         "-l",
@@ -442,11 +592,50 @@ def set_arguments(args: list[str]) -> argparse.Namespace:
 
     parser.add_argument("-c", "--cache", action="store_true", help=_("Enable cache."))
     parser.add_argument(
-        "-s", "--subset", help=_("Name of a file with a subset of problems to compare")
+        "-s",
+        "--subset",
+        help=_(
+            "Name of a file with a subset of problems to compare. Each line is a "
+            "problem name, a shell-style pattern, or a regex prefixed by `re:`"
+        ),
+    )
+    parser.add_argument(
+        "--problem-attributes",
+        help=_("Name of a CSV file with a `name` column and problem attributes"),
+    )
+    parser.add_argument(
+        "--filter",
+        action="append",
+        help=_(
+            "Expression over the problem attributes to select problems, "
+            "e.g. `nvar <= 100`. Can be given multiple times"
+        ),
     )
     parser.add_argument(
         "--tau", type=float, help=_("Limit the x-axis based this value")
     )
+    parser.add_argument(
+        "--grid",
+        type=int,
+        help=_(
+            "Evaluate the profile only on a grid with this many points, "
+            "up to tau if given, instead of at every ratio"
+        ),
+    )
+    parser.add_argument(
+        "--grid-scale",
+        choices=["log", "linear"],
+        default="log",
+        help=_("Spacing of the points of --grid. Default: log"),
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=memory_size,
+        help=_(
+            "Memory budget of the profile computation, e.g. 512M or 2G. "
+            "Profiles over the budget are computed in chunks"
+        ),
+    )
     parser.add_argument(
         "-f", "--force", action="store_true", help=_("Force overwrite the output file")
     )
@@ -471,6 +660,42 @@ def set_arguments(args: list[str]) -> argparse.Namespace:
         "--log-file", help=_("Write log output to specified file")
     )
 
+    parser.add_argument(
+        "--save-profile",
+        help=_(
+            "Save the computed profile to this file (.npz or .json), "
+            "to be plotted later with --load-profile"
+        ),
+    )
+    parser.add_argument(
+        "--load-profile",
+        help=_(
+            "Plot the profile saved in this file (.npz or .json) "
+            "instead of computing it from input files"
+        ),
+    )
+
+    render_group = parser.add_argument_group(_("Rendering options"))
+    render_group.add_argument(
+        "--formats",
+        type=lambda value: value.split(","),
+        help=_(
+            "Comma-separated output formats (e.g. png,pdf,svg,tex), rendered in "
+            "parallel. Formats not supported by the backend use another backend"
+        ),
+    )
+    render_group.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help=_("Maximum number of outputs rendered at the same time"),
+    )
+    render_group.add_argument(
+        "--pdf-timeout",
+        type=float,
+        help=_("Time limit for each pdflatex compilation, in seconds"),
+    )
+
     parser.add_argument(
         "--demo", action="store_true", help=_("Use examples files as input")
     )
@@ -484,6 +709,8 @@ def set_arguments(args: list[str]) -> argparse.Namespace:
     )
 
     parsed_args = parser.parse_args(args)
+    if parsed_args.problem_attributes and not parsed_args.filter:
+        parser.error(_("--problem-attributes requires --filter"))
 
     # Set input files for demo
     if parsed_args.demo:
@@ -494,12 +721,70 @@ def set_arguments(args: list[str]) -> argparse.Namespace:
             os.path.join(THIS_DIR, "examples/beta.table"),
             os.path.join(THIS_DIR, "examples/gamma.table"),
         ]
-    elif len(parsed_args.file_name) <= 1:
+    elif len(parsed_args.file_name) <= 1 and not parsed_args.load_profile:
         raise ValueError(_("You must provide at least two input files."))
 
     return parsed_args
 
 
+def _save_profile(profiler, filename: str | None) -> None:
+    """Save the computed profile of a backend, if a file name is given.
+
+    Args:
+        profiler (prof.Pdata): The backend profiler.
+        filename (str | None): Name of the profile file (.npz or .json).
+    """
+    if filename:
+        logging.getLogger("perprof.main").info("Saving profile to %s", filename)
+        profiler.save_profile(filename)
+
+
+def _render_formats(
+    args: argparse.Namespace,
+    parser_options: ParserOptions,
+    profiler_options: ProfilerOptions,
+) -> None:
+    """Render the profile in every format of `--formats`, in parallel.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+        parser_options (ParserOptions): Parser options.
+        profiler_options (ProfilerOptions): Profiler options.
+
+    Raises:
+        SystemExit: After listing the outputs that could not be rendered, if some
+            job failed.
+    """
+    from . import prof
+    from .render import render_outputs
+
+    logger = logging.getLogger("perprof.main")
+    backend = "bokeh" if args.bokeh else "mp" if args.mp else "tikz"
+    if args.save_profile:
+        _save_profile(prof.Pdata(parser_options, profiler_options), args.save_profile)
+        profiler_options = {**profiler_options, "load_profile": args.save_profile}
+    logger.info("Rendering formats %s with %s", ",".join(args.formats), backend)
+    results = render_outputs(
+        backend,
+        args.formats,
+        dict(parser_options),
+        dict(profiler_options),
+        processes=args.jobs,
+        pdf_timeout=args.pdf_timeout,
+    )
+    failed = [result for result in results if result.error is not None]
+    for result in results:
+        if result.error is None:
+            print(result.output)
+    if failed:
+        error_msg = _("ERROR: {} outputs could not be rendered:").format(len(failed))
+        logger.error(error_msg)
+        print(error_msg)
+        for result in failed:
+            print(f"  {result.job.target}: {result.error}")
+        sys.exit(1)
+
+
 def main() -> None:
     """Run the perprof command-line tool.
 
@@ -536,13 +821,16 @@ def main() -> None:
             logger.debug("Parser options: %s", parser_options)
             logger.debug("Profiler options: %s", profiler_options)
 
-        if args.bokeh:
+        if args.formats:
+            _render_formats(args, parser_options, profiler_options)
+        elif args.bokeh:
             logger.info(
                 "Using Bokeh backend for %s output", profiler_options["output_format"]
             )
             from . import bokeh
 
             bokeh_profiler = bokeh.Profiler(parser_options, profiler_options)
+            _save_profile(bokeh_profiler, args.save_profile)
             bokeh_profiler.plot()
             logger.info("Bokeh plot generation completed")
         elif args.mp:
@@ -553,6 +841,7 @@ def main() -> None:
             from . import matplotlib
 
             mp_profiler = matplotlib.Profiler(parser_options, profiler_options)
+            _save_profile(mp_profiler, args.save_profile)
             mp_profiler.plot()
             logger.info("Matplotlib plot generation completed")
         elif args.tikz:
@@ -571,21 +860,41 @@ def main() -> None:
                 from . import tikz
 
                 tikz_profiler = tikz.Profiler(parser_options, profiler_options)
+                _save_profile(tikz_profiler, args.save_profile)
                 tikz_profiler.plot()
                 logger.info("TikZ plot generation completed")
         elif args.raw:
             logger.info("Generating raw data output")
             from . import prof
 
-            print("raw")
-
-            print(prof.Pdata(parser_options, profiler_options))
+            pdata = prof.Pdata(parser_options, profiler_options)
+            _save_profile(pdata, args.save_profile)
+            raw_format = args.raw_format or "table"
+            if args.output is None:
+                try:
+                    if raw_format == "table":
+                        print("raw")
+                    pdata.write_raw(sys.stdout, raw_format)
+                    sys.stdout.flush()
+                except BrokenPipeError:
+                    # The reader stopped early, e.g., `perprof --raw | head`
+                    devnull = os.open(os.devnull, os.O_WRONLY)
+                    os.dup2(devnull, sys.stdout.fileno())
+                    sys.exit(1)
+            else:
+                output = f"{args.output}.{prof.RAW_FORMATS[raw_format]}"
+                with open(output, "w", encoding="utf-8", newline="") as file_:
+                    pdata.write_raw(file_, raw_format)
         elif args.table:
             logger.info("Generating robustness/efficiency table")
             from . import prof
 
             pdata = prof.Pdata(parser_options, profiler_options)
-            pdata.print_rob_eff_table()
+            _save_profile(pdata, args.save_profile)
+            if args.table_format:
+                pdata.print_summary_table(args.table_format)
+            else:
+                pdata.print_rob_eff_table()
     except ValueError as error:
         logger = logging.getLogger("perprof.main")
         logger.error("Input validation error: %s", error)
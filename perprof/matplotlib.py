@@ -5,11 +5,19 @@ import os
 
 import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
 from . import prof
 
 matplotlib.use("Agg")
 
+# Line styles of the highlighted solvers in black and white
+HIGHLIGHT_LINESTYLES = ["-", "--", ":", "-."]
+# Number of vertices of each chunk of a long path drawn by Agg (the raster layer)
+AGG_CHUNKSIZE = 20000
+
 THIS_DIR, THIS_FILENAME = os.path.split(__file__)
 THIS_TRANSLATION = gettext.translation("perprof", os.path.join(THIS_DIR, "locale"))
 _ = THIS_TRANSLATION.gettext
@@ -27,6 +35,14 @@ class Profiler(prof.Pdata):
         output (str): Output filename including format extension.
         output_format (str): File format for the output (png, pdf, svg, etc.).
         plot_lang (function): Localization function for plot text.
+        many_solvers (bool): Draw all the curves as one `LineCollection`.
+        highlight (list[str]): Solvers drawn on top of the others, with a legend
+            entry each, in the many-solvers mode.
+        colormap (str): Name of the matplotlib colormap of the many-solvers mode.
+        rasterize_dpi (float): If not None, the curves are rasterized at this
+            resolution, while the axes and the text stay vector graphics.
+        simplify_threshold (float): If not None, the largest distance in pixels
+            of the vertices removed by path simplification.
 
     Example:
         Creating a matplotlib profiler for performance analysis:
@@ -75,6 +91,13 @@ class Profiler(prof.Pdata):
                 - lang: Language for plot labels
                 - title/xlabel/ylabel: Plot text customization
                 - background/page_background: Color customization
+                - many_solvers: Draw all the curves as a single artist, for
+                  hundreds of solvers (see `plot_collection`)
+                - highlight: Solvers to highlight in the many-solvers mode
+                - colormap: Colormap of the curves in the many-solvers mode
+                - rasterize_dpi: Resolution of the rasterized curves, for pdf,
+                  svg, eps and ps outputs of huge profiles
+                - simplify_threshold: Path simplification threshold in pixels
 
         Example:
             ```python
@@ -96,6 +119,11 @@ class Profiler(prof.Pdata):
             "perprof", os.path.join(THIS_DIR, "locale"), [profiler_options["lang"]]
         )
         self.plot_lang = translation.gettext
+        self.many_solvers = profiler_options.get("many_solvers", False)
+        self.highlight = list(profiler_options.get("highlight") or [])
+        self.colormap = profiler_options.get("colormap") or "viridis"
+        self.rasterize_dpi = profiler_options.get("rasterize_dpi")
+        self.simplify_threshold = profiler_options.get("simplify_threshold")
 
         prof.Pdata.__init__(self, parser_options, profiler_options)
 
@@ -112,6 +140,12 @@ class Profiler(prof.Pdata):
         - Customizable background colors and transparency
         - Legend and grid lines
         - Automatic axis scaling
+        - Curves drawn from the corners of their steps only, with path
+          simplification and chunking enabled, and optionally rasterized
+
+        The vector outputs of profiles with many breakpoints stay small: path
+        simplification merges the vertices closer than `simplify_threshold`
+        pixels to a line, and with `rasterize_dpi` the curves are one image.
 
         Saves plot to filename specified during initialization.
 
@@ -157,22 +191,28 @@ class Profiler(prof.Pdata):
         if not self.background and not self.page_background:
             save_configs["transparent"] = True
             save_configs["facecolor"] = "none"
+        if self.rasterize_dpi is not None:
+            save_configs["dpi"] = self.rasterize_dpi
 
-        # Define the linestyles
-        if self.black_and_white:
-            linestyles = ["k-", "k--", "k:", "k-."]
+        if self.many_solvers:
+            self.plot_collection(plot_)
         else:
-            linestyles = ["b", "g", "r", "c", "m", "y"]
-
-        # Generate the plot for each solver
-        for idx, solver in enumerate(self.solvers):
-            plot_.step(
-                self.times,
-                self.ppsbt[solver],
-                linestyles[idx],
-                label=solver,
-                where="post",
-            )
+            # Define the linestyles, repeated if there are more solvers
+            if self.black_and_white:
+                linestyles = ["k-", "k--", "k:", "k-."]
+            else:
+                linestyles = ["b", "g", "r", "c", "m", "y"]
+
+            # Generate the plot for each solver
+            for idx, solver in enumerate(self.solvers):
+                vertices = step_vertices(self.times, self.ppsbt[solver])
+                plot_.plot(
+                    vertices[:, 0],
+                    vertices[:, 1],
+                    linestyles[idx % len(linestyles)],
+                    label=solver,
+                    rasterized=self.rasterize_dpi is not None,
+                )
 
         # Change the xscale to log scale
         if self.semilog:
@@ -196,5 +236,103 @@ class Profiler(prof.Pdata):
         # Help lines
         plt.gca().grid(axis="y", color="0.5", linestyle="-")
 
-        # Save the plot
-        plt.savefig(self.output, bbox_inches="tight", pad_inches=0.05, **save_configs)
+        # Save the plot, simplifying the paths even if disabled in matplotlibrc
+        path_params = {"path.simplify": True, "agg.path.chunksize": AGG_CHUNKSIZE}
+        if self.simplify_threshold is not None:
+            path_params["path.simplify_threshold"] = self.simplify_threshold
+        with matplotlib.rc_context(path_params):
+            plt.savefig(
+                self.output, bbox_inches="tight", pad_inches=0.05, **save_configs
+            )
+
+    def plot_collection(self, plot_):
+        """Draw the curves of all the solvers as one `LineCollection`.
+
+        Each curve keeps only the corners of its steps, and all of them are
+        drawn by a single artist, colored by a cycle of `colormap` (or in gray,
+        in black and white), so the time to render does not grow with the number
+        of artists. The solvers in `highlight` are drawn on top, by a second
+        collection with thicker lines, and are the only ones with a legend entry
+        of their own.
+
+        Args:
+            plot_ (matplotlib.axes.Axes): The axes of the plot.
+
+        Raises:
+            ValueError: If a highlighted solver is not in the profile.
+        """
+        for solver in self.highlight:
+            if solver not in self.solvers:
+                raise ValueError(_("ERROR: unknown solver to highlight: ") + solver)
+        others = [s for s in self.solvers if s not in self.highlight]
+        if self.black_and_white:
+            colors = ["0.6"] * len(others)
+        else:
+            colors = plt.get_cmap(self.colormap)(np.linspace(0, 1, len(others)))
+        if others:
+            label = self.plot_lang("{} solvers").format(len(others))
+            if self.highlight:
+                label = self.plot_lang("{} other solvers").format(len(others))
+            plot_.add_collection(
+                LineCollection(
+                    [step_vertices(self.times, self.ppsbt[s]) for s in others],
+                    colors=colors,
+                    linewidths=0.8,
+                    alpha=0.4 if self.highlight else 0.8,
+                    label=label,
+                    rasterized=self.rasterize_dpi is not None,
+                )
+            )
+        if not self.highlight:
+            return
+        if self.black_and_white:
+            colors = ["k"] * len(self.highlight)
+            linestyles = [
+                HIGHLIGHT_LINESTYLES[i % len(HIGHLIGHT_LINESTYLES)]
+                for i in range(len(self.highlight))
+            ]
+        else:
+            cycle = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+            colors = [cycle[i % len(cycle)] for i in range(len(self.highlight))]
+            linestyles = ["-"] * len(self.highlight)
+        plot_.add_collection(
+            LineCollection(
+                [step_vertices(self.times, self.ppsbt[s]) for s in self.highlight],
+                colors=colors,
+                linestyles=linestyles,
+                linewidths=2.0,
+                zorder=3,
+                rasterized=self.rasterize_dpi is not None,
+            )
+        )
+        # The collection has no legend entry per line, so add one per solver
+        for solver, color, linestyle in zip(self.highlight, colors, linestyles):
+            plot_.add_line(
+                Line2D([], [], color=color, linestyle=linestyle, lw=2.0, label=solver)
+            )
+
+
+def step_vertices(times, values):
+    """Compute the corners of a step curve that jumps after each time.
+
+    The curve is the one of `matplotlib.pyplot.step` with `where="post"`, but only
+    the points where the value changes are kept, besides the first and last ones.
+
+    Args:
+        times (list[float]): Increasing times.
+        values (list[float]): Value of the curve from each time to the next one.
+
+    Returns:
+        numpy.ndarray: The vertices of the curve, of shape (n_vertices, 2).
+
+    Example:
+        >>> from perprof.matplotlib import step_vertices
+        >>> step_vertices([1.0, 2.0, 3.0, 4.0], [0.5, 0.5, 1.0, 1.0]).tolist()
+        [[1.0, 0.5], [3.0, 0.5], [3.0, 1.0], [4.0, 1.0]]
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    jumps = np.flatnonzero(np.diff(values)) + 1
+    levels = values[np.concatenate([[0], jumps])]
+    x = np.concatenate([times[:1], np.repeat(times[jumps], 2), times[-1:]])
+    return np.column_stack([x, np.repeat(levels, 2)])
@@ -15,12 +15,17 @@ The files must be in the following format::
 import gettext
 import os.path
 
+from .selection import as_selection
+
 # pylint: disable=import-outside-toplevel
 
 THIS_DIR, THIS_FILENAME = os.path.split(__file__)
 THIS_TRANSLATION = gettext.translation("perprof", os.path.join(THIS_DIR, "locale"))
 _ = THIS_TRANSLATION.gettext
 
+# YAML options describing the run, which are kept but do not affect parsing
+METADATA_OPTIONS = ["version", "machine", "date"]
+
 
 def _error_message(filename, line_number, details):
     """Format the error message.
@@ -65,6 +70,28 @@ def _parse_yaml(options, yaml_header):
         options[opt] = metadata[opt]
 
 
+def _set_columns(options):
+    """Set the column options from the `columns` option, if given.
+
+    Args:
+        options (dict): the local options for the parser
+    """
+    if not options["columns"]:
+        return
+    columns = options["columns"]
+    if isinstance(columns, str):
+        columns = columns.replace(",", " ").split()
+    for colopt in ["name", "exit", "time", "fval", "primal", "dual"]:
+        if colopt in columns:
+            # Columns starts at 1 but indexing at 0
+            options["col_" + colopt] = columns.index(colopt) + 1
+        elif colopt in ["name", "exit", "time"]:
+            raise ValueError(_("Missing column in the columns option: ") + colopt)
+        else:
+            # Out of bounds, as a missing column
+            options["col_" + colopt] = len(columns) + 1
+
+
 # pylint: disable=too-many-branches,too-many-statements,too-many-locals
 def parse_file(filename, parser_options):
     """Parse one file.
@@ -74,7 +101,7 @@ def parse_file(filename, parser_options):
         parser_options (dict):
             dictionary with the following keys:
 
-            - subset (list): list with the name of the problems to use
+            - subset (list | ProblemSelection): the problems to use
             - success (list): list with strings to mark sucess
             - mintime (float): minimum time running the solver
             - maxtime (float): maximum time running the solver
@@ -86,12 +113,16 @@ def parse_file(filename, parser_options):
     """
     options = parser_options.copy()
     options["algname"] = _str_sanitize(filename)
+    options["columns"] = None
+    for key in METADATA_OPTIONS:
+        options[key] = None
     colopts = ["name", "exit", "time", "fval", "primal", "dual"]
     col = {}
     for colopt in colopts:
         # Columns starts at 1 but indexing at 0
         options["col_" + colopt] = colopts.index(colopt) + 1
         col[colopt] = colopts.index(colopt)
+    subset = as_selection(options["subset"])
     data = {}
     with open(filename, encoding="utf-8") as file_:
         line_number = 0
@@ -109,6 +140,7 @@ def parse_file(filename, parser_options):
             elif ldata[0] == "---":
                 if in_yaml:
                     _parse_yaml(options, yaml_header)
+                    _set_columns(options)
                     for colopt in colopts:
                         # Columns starts at 1 but indexing at 0
                         col[colopt] = options["col_" + colopt] - 1
@@ -129,7 +161,7 @@ def parse_file(filename, parser_options):
             else:
                 ldata[col["name"]] = _str_sanitize(ldata[col["name"]])
                 pname = ldata[col["name"]]
-                if options["subset"] and pname not in options["subset"]:
+                if subset is not None and pname not in subset:
                     continue
                 if pname in data:
                     raise ValueError(
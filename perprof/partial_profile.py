@@ -0,0 +1,327 @@
+"""Mergeable summaries of performance profiles over disjoint sets of problems.
+
+When the problems of a benchmark are split into shards, e.g., run on different
+machines, each shard can compute its own `PartialProfile` where the data lives.
+The partial profiles are small (one entry per distinct ratio of each solver) and
+can be shipped around, saved, and merged into exactly the profile that
+`ProfileData.process` would compute on the union of the shards.
+
+The shards must be disjoint, and each shard must hold the results of every solver
+for its problems, since the best time of a problem is computed inside its shard.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from .profile_data import ProfileData, evaluation_grid
+
+PARTIAL_FORMAT = "perprof-partial-profile"
+
+
+class PartialProfile:
+    """Summary of the ratios of each solver over a set of problems.
+
+    Attributes:
+        algnames (list[str]):
+            Names of the solvers.
+        n_problems (int):
+            Number of problems summarized, including the ones no solver solved.
+        values (list[numpy.ndarray]):
+            For each solver, the sorted distinct finite ratios.
+        counts (list[numpy.ndarray]):
+            For each solver, the number of problems with each ratio in `values`.
+
+    Example:
+        >>> import pandas as pd
+        >>> from perprof.partial_profile import merge_partials
+        >>> from perprof.profile_data import ProfileData
+        >>> from perprof.solver_data import SolverData
+        >>>
+        >>> def shard(names, times_a, times_b):
+        ...     return [
+        ...         SolverData(algname, pd.DataFrame({"name": names, "exit": ["c"] * len(names), "time": times}))
+        ...         for algname, times in [("A", times_a), ("B", times_b)]
+        ...     ]
+        >>> shard1 = shard(["p1", "p2"], [1.0, 2.0], [2.0, 1.0])
+        >>> shard2 = shard(["p3"], [3.0], [1.0])
+        >>> partials = [ProfileData(*s).partial() for s in [shard1, shard2]]
+        >>> merged = merge_partials(*partials)
+        >>> merged.breakpoints
+        array([1., 2., 3.])
+        >>> union = shard(["p1", "p2", "p3"], [1.0, 2.0, 3.0], [2.0, 1.0, 1.0])
+        >>> bool((merged.cumulative == ProfileData(*union).cumulative).all())
+        True
+    """
+
+    def __init__(
+        self,
+        algnames: Sequence[str],
+        n_problems: int,
+        values: Sequence[np.ndarray],
+        counts: Sequence[np.ndarray],
+    ) -> None:
+        """Initialize the partial profile.
+
+        Args:
+            algnames (Sequence[str]): Names of the solvers.
+            n_problems (int): Number of problems summarized.
+            values (Sequence[numpy.ndarray]): Sorted distinct finite ratios of
+                each solver.
+            counts (Sequence[numpy.ndarray]): Multiplicity of each ratio.
+
+        Raises:
+            ValueError: If the lengths of the arguments do not match.
+        """
+        if not len(algnames) == len(values) == len(counts):
+            raise ValueError("Expected values and counts for each solver")
+        self.algnames = list(algnames)
+        self.n_problems = int(n_problems)
+        self.values = [np.asarray(v, dtype=float) for v in values]
+        self.counts = [np.asarray(c, dtype=np.int64) for c in counts]
+
+    @classmethod
+    def from_ratio(cls, algnames: Sequence[str], ratio: np.ndarray) -> PartialProfile:
+        """Summarize a ratio matrix.
+
+        Args:
+            algnames (Sequence[str]): Names of the solvers.
+            ratio (numpy.ndarray): Ratio matrix of shape (n_problems, n_solvers).
+
+        Returns:
+            PartialProfile: The summary of the ratios.
+        """
+        values, counts = [], []
+        for j in range(ratio.shape[1]):
+            column = ratio[:, j]
+            column_values, column_counts = np.unique(
+                column[column < float("inf")], return_counts=True
+            )
+            values.append(column_values)
+            counts.append(column_counts)
+        return cls(algnames, ratio.shape[0], values, counts)
+
+    def merge(self, *others: PartialProfile) -> PartialProfile:
+        """Merge this partial profile with others over disjoint problems.
+
+        Args:
+            *others (PartialProfile): Partial profiles with the same solvers, in
+                any order.
+
+        Returns:
+            PartialProfile: The summary of the union of the problems.
+
+        Raises:
+            ValueError: If the solvers do not match.
+        """
+        values = [[v] for v in self.values]
+        counts = [[c] for c in self.counts]
+        n_problems = self.n_problems
+        for other in others:
+            if sorted(other.algnames) != sorted(self.algnames):
+                raise ValueError("Partial profiles must have the same solvers")
+            n_problems += other.n_problems
+            for j, algname in enumerate(self.algnames):
+                k = other.algnames.index(algname)
+                values[j].append(other.values[k])
+                counts[j].append(other.counts[k])
+        merged_values, merged_counts = [], []
+        for solver_values, solver_counts in zip(values, counts):
+            unique, inverse = np.unique(
+                np.concatenate(solver_values), return_inverse=True
+            )
+            merged_values.append(unique)
+            merged_counts.append(
+                np.bincount(
+                    inverse.reshape(-1),
+                    weights=np.concatenate(solver_counts),
+                    minlength=len(unique),
+                ).astype(np.int64)
+            )
+        return PartialProfile(self.algnames, n_problems, merged_values, merged_counts)
+
+    def solved_counts(self, points: np.ndarray) -> np.ndarray:
+        """Count the problems with ratio up to each point, for each solver.
+
+        Args:
+            points (numpy.ndarray): Sorted points of shape (n_points,).
+
+        Returns:
+            numpy.ndarray: Array of shape (n_points, n_solvers).
+        """
+        counts = np.zeros((len(points), len(self.algnames)), dtype=np.int64)
+        for j, (values, solver_counts) in enumerate(zip(self.values, self.counts)):
+            cumulative = np.concatenate([[0], np.cumsum(solver_counts)])
+            counts[:, j] = cumulative[np.searchsorted(values, points, side="right")]
+        return counts
+
+    def to_profile(
+        self,
+        grid: int | Iterable[float] | None = None,
+        grid_scale: str = "log",
+        tau: float | None = None,
+    ) -> ProfileData:
+        """Compute the profile of the summarized problems.
+
+        Args:
+            grid (int | Iterable[float], optional): See `ProfileData`.
+            grid_scale (str): See `ProfileData`.
+            tau (float, optional): See `ProfileData`.
+
+        Returns:
+            ProfileData: The profile, without solver data, ratio matrix or
+                problem names. Without `grid`, it is exactly the profile computed
+                by `ProfileData.process` over all the summarized problems.
+
+        Raises:
+            ValueError: If no problem was summarized.
+        """
+        if self.n_problems == 0:
+            raise ValueError("ERROR: problem set is empty")
+        if grid is None:
+            breakpoints = np.unique(np.concatenate(self.values))
+        elif isinstance(grid, (int, np.integer)):
+            max_ratio = max((v[-1] for v in self.values if len(v) > 0), default=1.0)
+            breakpoints = evaluation_grid(max_ratio, grid, grid_scale, tau)
+        else:
+            breakpoints = np.sort(np.asarray(grid, dtype=float))
+        if tau is not None:
+            breakpoints = breakpoints[breakpoints <= tau]
+        cumulative = self.solved_counts(breakpoints) / self.n_problems
+        return ProfileData._from_computed(  # pylint: disable=protected-access
+            self.algnames, breakpoints, cumulative, n_problems=self.n_problems
+        )
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable representation of the partial profile."""
+        return {
+            "format": PARTIAL_FORMAT,
+            "algnames": self.algnames,
+            "n_problems": self.n_problems,
+            "values": [v.tolist() for v in self.values],
+            "counts": [c.tolist() for c in self.counts],
+        }
+
+    @classmethod
+    def from_dict(cls, content: dict) -> PartialProfile:
+        """Create a partial profile from the output of `to_dict`.
+
+        Raises:
+            ValueError: If `content` is not a partial profile.
+        """
+        if content.get("format") != PARTIAL_FORMAT:
+            raise ValueError("Not a perprof partial profile")
+        return cls(
+            content["algnames"],
+            content["n_problems"],
+            content["values"],
+            content["counts"],
+        )
+
+    def save(self, filename: Union[str, Path]) -> None:
+        """Save the partial profile to a .json or .npz file."""
+        suffix = Path(filename).suffix
+        if suffix == ".json":
+            with open(filename, "w", encoding="utf-8") as file_:
+                json.dump(self.to_dict(), file_)
+        elif suffix == ".npz":
+            with open(filename, "wb") as file_:
+                np.savez_compressed(
+                    file_,
+                    format=np.array(PARTIAL_FORMAT),
+                    algnames=np.array(self.algnames, dtype=str),
+                    n_problems=np.array(self.n_problems),
+                    offsets=np.cumsum([0] + [len(v) for v in self.values]),
+                    values=np.concatenate(self.values),
+                    counts=np.concatenate(self.counts),
+                )
+        else:
+            raise ValueError(f"Unsupported extension for partial profile: {suffix}")
+
+    @classmethod
+    def load(cls, filename: Union[str, Path]) -> PartialProfile:
+        """Load a partial profile saved with `save`."""
+        suffix = Path(filename).suffix
+        if suffix == ".json":
+            with open(filename, encoding="utf-8") as file_:
+                return cls.from_dict(json.load(file_))
+        if suffix != ".npz":
+            raise ValueError(f"Unsupported extension for partial profile: {suffix}")
+        with np.load(filename, allow_pickle=False) as arrays:
+            if str(arrays["format"]) != PARTIAL_FORMAT:
+                raise ValueError(f"{filename} is not a perprof partial profile")
+            offsets = arrays["offsets"]
+            slices = [slice(a, b) for a, b in zip(offsets[:-1], offsets[1:])]
+            return cls(
+                [str(x) for x in arrays["algnames"]],
+                int(arrays["n_problems"]),
+                [arrays["values"][s] for s in slices],
+                [arrays["counts"][s] for s in slices],
+            )
+
+
+def merge_partials(
+    *partials: PartialProfile,
+    grid: int | Iterable[float] | None = None,
+    grid_scale: str = "log",
+    tau: float | None = None,
+) -> ProfileData:
+    """Merge partial profiles of disjoint shards into the profile of their union.
+
+    Args:
+        *partials (PartialProfile): At least one partial profile.
+        grid (int | Iterable[float], optional): See `ProfileData`.
+        grid_scale (str): See `ProfileData`.
+        tau (float, optional): See `ProfileData`.
+
+    Returns:
+        ProfileData: The profile of the union of the shards.
+
+    Raises:
+        ValueError: If no partial profile is given, the solvers do not match, or
+            the shards have no problems.
+    """
+    if not partials:
+        raise ValueError("At least one partial profile is needed")
+    merged = partials[0].merge(*partials[1:])
+    return merged.to_profile(grid=grid, grid_scale=grid_scale, tau=tau)
+
+
+def _shard_partial(sources: Sequence, profile_options: dict) -> PartialProfile:
+    """Compute the partial profile of one shard (used by the process pool)."""
+    return ProfileData(*sources, **profile_options).partial()
+
+
+def compute_partials(
+    shards: Iterable[Sequence],
+    processes: int | None = None,
+    **profile_options,
+) -> list[PartialProfile]:
+    """Compute the partial profile of each shard in a pool of processes.
+
+    Args:
+        shards (Iterable[Sequence]): For each shard, the solver sources accepted
+            by `ProfileData`, e.g., file paths, in the same order for all shards.
+        processes (int, optional): Number of worker processes. Defaults to the
+            number of CPUs. With 1, the shards are computed in this process.
+        **profile_options: Keyword arguments passed to `ProfileData`, e.g.,
+            `subset`.
+
+    Returns:
+        list[PartialProfile]: The partial profiles, in the order of the shards.
+    """
+    shards = list(shards)
+    if processes == 1:
+        return [_shard_partial(sources, profile_options) for sources in shards]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(_shard_partial, sources, profile_options)
+            for sources in shards
+        ]
+        return [future.result() for future in futures]
@@ -1,15 +1,27 @@
 """The functions related with the perform (not the output)."""
 
+import csv
 import gettext
+import json
 import os.path
 import sys
 
+import numpy as np
+import pandas as pd
+
 from . import parse
+from .profile_data import ProfileData
+from .profile_io import read_profile, write_profile
+from .solver_data import SolverData
+from .summary import format_summary
 
 THIS_DIR, THIS_FILENAME = os.path.split(__file__)
 THIS_TRANSLATION = gettext.translation("perprof", os.path.join(THIS_DIR, "locale"))
 _ = THIS_TRANSLATION.gettext
 
+# Formats of the raw data and the extensions of their files
+RAW_FORMATS = {"table": "txt", "csv": "csv", "tsv": "tsv", "jsonl": "jsonl"}
+
 
 def load_data(parser_options):
     """Load the data.
@@ -32,9 +44,15 @@ class Pdata:
 
         Args:
             parser_options (dict): parser configuration.
-            profiler_options (dict): profiler configuration
+            profiler_options (dict): profiler configuration. If it has the key
+                "load_profile", the profile is read from that file (see
+                `load_profile`) instead of computed from the parser files.
         """
-        self.data = load_data(parser_options)
+        profile_file = profiler_options.get("load_profile")
+        if profile_file:
+            self.data = {}
+        else:
+            self.data = load_data(parser_options)
         self.cache = profiler_options["cache"]
         self.force = profiler_options["force"]
         self.semilog = profiler_options["semilog"]
@@ -45,34 +63,98 @@ class Pdata:
         self.output_format = profiler_options["output_format"]
         self.pgfplot_version = profiler_options["pgfplot_version"]
         self.tau = profiler_options["tau"]
+        self.grid = profiler_options.get("grid")
+        self.grid_scale = profiler_options.get("grid_scale") or "log"
+        self.max_memory = profiler_options.get("max_memory")
         self.title = profiler_options["title"]
         self.xlabel = profiler_options["xlabel"]
         self.ylabel = profiler_options["ylabel"]
+        self.compare = parser_options.get("compare")
+        self.profile = None
         self.already_scaled = False
         self.tablename = profiler_options["output"]
 
         self.solvers = sorted(list(self.data.keys()))
         self.problems = {x for v in self.data.values() for x in v}
         self.number_problems = len(self.problems)
+        if profile_file:
+            self.load_profile(profile_file)
 
     def __repr__(self):
         """Return a representation of the Pdata object."""
-        str2output = " " * 18
+        lines = [self._table_header()]
+        lines.extend(self._table_row(problem, times) for problem, times in self.raw())
+        return "\n".join(lines)[:-1]
 
-        for solver in self.solvers:
-            str2output += f"{solver[-16:]:>16}  "
-        str2output += "\n"
+    def raw(self):
+        """Generate the time of every solver for each problem, sorted by name.
 
-        for problem in self.problems:
-            str2output += f"{problem:>16}  "
-            for solver in self.solvers:
-                try:
-                    str2output += " " * 8 + f"{self.data[solver][problem]['time']:8.4} "
-                except KeyError:
-                    str2output += " " * 13 + "inf  "
-            str2output += "\n"
+        Yields:
+            tuple[str, list[float | None]]: the problem and the time of each
+                solver, in the order of `solvers`, infinite for failures and None
+                if the solver has no result
+        """
+        for problem in sorted(self.problems):
+            yield (
+                problem,
+                [
+                    self.data[solver][problem]["time"]
+                    if problem in self.data[solver]
+                    else None
+                    for solver in self.solvers
+                ],
+            )
+
+    def write_raw(self, file_, fmt="table"):
+        """Write the raw data, one problem per line.
+
+        Each line is written as soon as it is formatted, so the memory use does
+        not grow with the number of problems.
+
+        Args:
+            file_ (TextIO): the output, e.g., `sys.stdout`
+            fmt (str): "table" (aligned columns), "csv" or "tsv" (empty values
+                for missing results), or "jsonl" (one JSON object per problem, with
+                null for failures and missing results)
 
-        return str2output[:-2]
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if fmt == "table":
+            file_.write(self._table_header() + "\n")
+            for problem, times in self.raw():
+                file_.write(self._table_row(problem, times) + "\n")
+        elif fmt in ("csv", "tsv"):
+            delimiter = "," if fmt == "csv" else "\t"
+            writer = csv.writer(file_, delimiter=delimiter, lineterminator="\n")
+            writer.writerow(["problem", *self.solvers])
+            for problem, times in self.raw():
+                writer.writerow([problem, *times])
+        elif fmt == "jsonl":
+            for problem, times in self.raw():
+                times = [
+                    time if time is not None and time < float("inf") else None
+                    for time in times
+                ]
+                record = {"problem": problem, "times": dict(zip(self.solvers, times))}
+                file_.write(json.dumps(record) + "\n")
+        else:
+            raise ValueError(_("ERROR: unexpected raw format {}").format(fmt))
+
+    def _table_header(self):
+        """Return the header of the raw table, with the solvers."""
+        return " " * 18 + "".join(f"{solver[-16:]:>16}  " for solver in self.solvers)
+
+    @staticmethod
+    def _table_row(problem, times):
+        """Return the line of a problem in the raw table."""
+        cells = [f"{problem:>16}  "]
+        for time in times:
+            if time is None:
+                cells.append(" " * 13 + "inf  ")
+            else:
+                cells.append(" " * 8 + f"{time:8.4} ")
+        return "".join(cells)
 
     def get_set_solvers(self):
         """Get the set of solvers to use.
@@ -91,58 +173,69 @@ class Pdata:
         return self.problems
 
     def scale(self):
-        """Scale time."""
-        times_set = set()
-        for problem in self.problems:
-            for solver in self.solvers:
-                try:
-                    self.data[solver][problem]["time"]
-                except (KeyError, TypeError):
-                    self.data[solver][problem] = {
-                        "time": float("inf"),
-                        "fval": float("inf"),
-                    }
-
-            min_fval = min(v[problem]["fval"] for v in self.data.values())
-            if min_fval < float("inf"):
-                min_time = min(
-                    v[problem]["time"]
-                    for v in self.data.values()
-                    if v[problem]["fval"] < min_fval + abs(min_fval) * 1e-3 + 1e-6
-                )
-            else:
-                min_time = min(v[problem]["time"] for v in self.data.values())
+        """Scale time.
 
-            for solver in self.solvers:
-                try:
-                    self.data[solver][problem]["time"] = (
-                        self.data[solver][problem]["time"] / min_time
-                    )
-                except ZeroDivisionError:
-                    self.data[solver][problem] = {"time": float("inf")}
-                if self.data[solver][problem]["time"] < float("inf"):
-                    times_set.add(self.data[solver][problem]["time"])
-        if not times_set:
+        The parsed data is converted to `solver_data.SolverData` and the profile is
+        computed by `profile_data.ProfileData`, stored in `profile`. The profile is
+        evaluated at every unique ratio, or on a grid of `grid` points up to `tau`
+        (see `profile_data.evaluation_grid`) if `grid` is set.
+        """
+        compare = "optimalvalues" if self.compare == "optimalvalues" else "exitflag"
+        self.profile = ProfileData(
+            *[self._solver_data(solver) for solver in self.solvers],
+            compare=compare,
+            grid=self.grid or None,
+            grid_scale=self.grid_scale,
+            tau=self.tau if self.grid else None,
+            max_memory=self.max_memory,
+        )
+        if len(self.profile.breakpoints) == 0:
             raise ValueError(_("ERROR: problem set is empty"))
 
-        self.times = sorted(times_set)
+        # Python floats, which the backends round and format as the legacy engine
+        self.times = self.profile.breakpoints.tolist()
         maxt = self.times[-1]
         self.times.append(maxt * 1.05)
 
         self.already_scaled = True
 
+    def _solver_data(self, solver):
+        """Convert the parsed data of a solver to SolverData.
+
+        Failures were parsed as infinite times, and with the optimal values
+        comparison only the feasible runs were kept, so every finite time is a
+        success.
+
+        Args:
+            solver (str): name of the solver
+
+        Returns:
+            solver_data.SolverData: the data of the solver
+        """
+        names = list(self.data[solver])
+        times = np.array([self.data[solver][p]["time"] for p in names], dtype=float)
+        fvals = np.array([self.data[solver][p]["fval"] for p in names], dtype=float)
+        data = pd.DataFrame(
+            {
+                "name": pd.Series(names, dtype=object),
+                "exit": np.where(times < float("inf"), "c", "d"),
+                "time": times,
+                "fval": fvals,
+            }
+        )
+        return SolverData(solver, data, success=["c"])
+
     def set_percent_problems_solved_by_time(self):
         """Set the percent of problems solved by time."""
         # ppsbt = Percent Problems Solved By Time
         self.ppsbt = {}
-        for solver in self.solvers:
-            self.ppsbt[solver] = []
-            for time in self.times:
-                aux = 0
-                for problem in self.problems:
-                    if time >= self.data[solver][problem]["time"]:
-                        aux += 1
-                self.ppsbt[solver].append(aux / self.number_problems)
+        cumulative = self.profile.cumulative
+        # The last time is past the breakpoints, e.g., of a grid up to tau
+        last = (self.profile.ratio <= self.times[-1]).sum(axis=0)
+        last = (last / self.profile.n_problems).tolist()
+        for j, solver in enumerate(self.solvers):
+            self.ppsbt[solver] = cumulative[:, j].tolist()
+            self.ppsbt[solver].append(last[j])
             if self.ppsbt[solver][-1] == 0:
                 raise ValueError(
                     _("ERROR:")
@@ -150,13 +243,8 @@ class Pdata:
                     + _(" has no solved problems. Verify the 'success' flag.")
                 )
 
-    def pre_plot(self):
-        """Run plot-related checks and processing."""
-        if self.force and self.output != sys.stdout and os.path.exists(self.output):
-            raise ValueError(
-                _("ERROR: File {} exists.\nUse `-f` to overwrite").format(self.output)
-            )
-
+    def compute(self):
+        """Compute the profile (`times` and `ppsbt`), if not computed yet."""
         if not self.already_scaled:
             self.scale()
 
@@ -165,19 +253,81 @@ class Pdata:
         except AttributeError:
             self.set_percent_problems_solved_by_time()
 
+    def save_profile(self, filename):
+        """Save the computed profile to a file.
+
+        The profile can be plotted by any backend without recomputation by
+        passing the file as the profiler option "load_profile". See
+        `profile_io` for the formats.
+
+        Args:
+            filename (str): name of the file, with extension .npz or .json.
+        """
+        self.compute()
+        if self.profile is not None:
+            self.profile.save(filename)
+            return
+        write_profile(
+            filename,
+            {
+                "algnames": self.solvers,
+                "problems": sorted(self.problems) or None,
+                "breakpoints": self.times[:-1],
+                "cumulative": np.array(
+                    [self.ppsbt[solver][:-1] for solver in self.solvers]
+                ).T,
+            },
+        )
+
+    def load_profile(self, filename):
+        """Load a profile saved by `save_profile` or `ProfileData.save`.
+
+        If the file has the ratios and the problem names, `profile` is set too, so
+        that the summary metrics and the problems of each ratio are available.
+
+        Args:
+            filename (str): name of the file, with extension .npz or .json.
+        """
+        profile = read_profile(filename)
+        if len(profile["breakpoints"]) == 0:
+            raise ValueError(_("ERROR: problem set is empty"))
+        if "ratio" in profile and profile.get("problems") is not None:
+            # Saved by ProfileData.save, with everything but the solver data
+            self.profile = ProfileData._from_content(  # pylint: disable=protected-access
+                profile
+            )
+        self.solvers = profile["algnames"]
+        self.problems = set(profile.get("problems", []))
+        self.number_problems = len(self.problems)
+        self.times = profile["breakpoints"].tolist()
+        self.times.append(self.times[-1] * 1.05)
+        last = profile["cumulative"][-1]
+        if "ratio" in profile:
+            # The last time may be past the breakpoints, e.g., of a grid up to tau
+            last = (profile["ratio"] <= self.times[-1]).sum(axis=0)
+            last = last / profile["ratio"].shape[0]
+        self.ppsbt = {}
+        for j, solver in enumerate(self.solvers):
+            self.ppsbt[solver] = profile["cumulative"][:, j].tolist()
+            self.ppsbt[solver].append(float(last[j]))
+        self.already_scaled = True
+
+    def pre_plot(self):
+        """Run plot-related checks and processing."""
+        if self.force and self.output != sys.stdout and os.path.exists(self.output):
+            raise ValueError(
+                _("ERROR: File {} exists.\nUse `-f` to overwrite").format(self.output)
+            )
+
+        self.compute()
+
     def plot(self):
         """Generate the plot."""
         raise NotImplementedError()
 
     def print_rob_eff_table(self):
         """Print table of robustness and efficiency."""
-        if not self.already_scaled:
-            self.scale()
-
-        try:
-            self.ppsbt
-        except AttributeError:
-            self.set_percent_problems_solved_by_time()
+        self.compute()
 
         if self.tablename is None:
             output = sys.stdout
@@ -204,3 +354,42 @@ class Pdata:
 
             with open(output, "w", encoding="utf-8") as file_:
                 file_.write("\n".join(str2output))
+
+    def summary(self, levels=(0.5, 0.9)):
+        """Compute summary metrics of each solver.
+
+        See `summary.summary_metrics` for the metrics. The area under the profile
+        goes up to `tau`, if given.
+
+        Args:
+            levels (Iterable[float]): Fractions of problems solved of the
+                `ratio_at_X` columns.
+
+        Returns:
+            pandas.DataFrame: One row per solver, indexed by the solver names.
+
+        Raises:
+            ValueError: If the profile was loaded from a file.
+        """
+        self.compute()
+        if self.profile is None:
+            raise ValueError(_("ERROR: summary metrics need the input files"))
+        return self.profile.summary(tau=self.tau, levels=levels)
+
+    def print_summary_table(self, fmt):
+        """Print the table of summary metrics.
+
+        The table is written to the standard output, or to the output file with
+        the extension of the format.
+
+        Args:
+            fmt (str): "text", "csv" or "tex" (see `summary.format_summary`).
+        """
+        table = format_summary(self.summary(), fmt)
+        if self.tablename is None:
+            print(table)
+        else:
+            extension = "txt" if fmt == "text" else fmt
+            output = os.path.abspath(f"{self.tablename}.{extension}")
+            with open(output, "w", encoding="utf-8") as file_:
+                file_.write(table)
@@ -2,13 +2,35 @@
 
 from __future__ import annotations
 
+import copy
+import logging
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 import numpy as np
 import pandas as pd
 
-from .solver_data import SolverData, read_table
+from .drilldown import DrillDownIndex
+from .profile_io import read_profile, write_profile
+from .selection import ProblemSelection, as_selection
+from .solver_data import (
+    ARROW_FORMATS,
+    OPTIONAL_COLUMNS,
+    SolverData,
+    read_arrow,
+    read_table,
+)
+from .summary import summary_metrics
+
+if TYPE_CHECKING:
+    from .partial_profile import PartialProfile
+    from .sketch import SketchProfile
+
+LOGGER = logging.getLogger("perprof.profile_data")
+
+# Smallest chunk of rows of the low-memory computation of `max_memory`
+MIN_CHUNK_ROWS = 1024
 
 
 class ProfileData:
@@ -21,18 +43,77 @@ class ProfileData:
     Attributes:
         solvers (list[SolverData]):
             List of solver_data.SolverData objects associated with this performance profile.
-        subset (list[str]):
+            Empty for profiles loaded from a file.
+        algnames (list[str]):
+            Names of the solvers, in the order of the columns of `ratio` and `cumulative`.
+        subset (list[str] | ProblemSelection):
             If not None, used to restrict the problems in which the profile is created.
+        cost (str):
+            Column of the solver data that is profiled, "time" by default.
+        compare (str):
+            How successful runs are found: "exitflag" (by the exit flag) or
+            "optimalvalues" (by feasibility and objective function value).
+        infeas_tol (float):
+            Tolerance for the primal and dual infeasibilities, with "optimalvalues".
+        unconstrained (bool):
+            If True, the primal infeasibility is not checked, with "optimalvalues".
+        problems (pandas.Index):
+            Names of the problems in the profile, in order of first appearance.
+            The row `i` of `ratio` corresponds to `problems[i]`.
         ratio (numpy.array):
             Ratio matrix computed using the best time for each problem.
             Shape: (n_problems, n_solvers). Entry [i,j] = time[i,j] / min_time[i]
         breakpoints (numpy.array):
-            Array of unique ratio values sorted in ascending order.
+            Array of unique ratio values sorted in ascending order, or the evaluation
+            grid if `grid` is given. Only values up to `tau` are kept, if given.
             Used as x-axis values for profile visualization.
+        grid (int | numpy.array):
+            If not None, the number of points of an automatic evaluation grid, or
+            the evaluation grid itself.
+        grid_scale (str):
+            Spacing of the automatic evaluation grid: "log" or "linear".
+        tau (float):
+            If not None, the largest ratio in which the profile is evaluated.
         cumulative (numpy.array):
             Matrix of cumulative distribution of problems solved.
             Shape: (len(breakpoints), n_solvers). Entry [i,j] = fraction of problems
             where solver j has ratio <= breakpoints[i].
+            If `cumulative_dtype` is "uint32", it is computed from `solved_counts`
+            on each access.
+        solved_counts (numpy.array):
+            Same as `cumulative`, but with the number of problems instead of the
+            fraction.
+        n_problems (int):
+            Number of problems in the profile.
+        ratio_dtype (str):
+            Floating point type of `ratio`: "float64" or "float32".
+        cumulative_dtype (str):
+            Storage type of the cumulative distribution: "float64" (fractions) or
+            "uint32" (counts of solved problems).
+        max_memory (int):
+            If not None, the memory budget of the computation, in bytes.
+
+    Note:
+        With `ratio_dtype="float32"`, the times and ratios use half the memory.
+        Times are rounded to float32 and divided in float32, so each ratio has a
+        relative error of at most 3 * 2**-24 (about 1.8e-7) with respect to the
+        float64 computation, and the best ratio of each problem is still exactly 1.
+        Hence, every breakpoint is within a relative 1.8e-7 of an exact breakpoint,
+        exact breakpoints closer than that may merge into one, and the cumulative
+        distribution at a ratio tau can only differ by problems whose ratio is
+        within a relative 1.8e-7 of tau.
+        With `cumulative_dtype="uint32"`, the cumulative distribution is stored as
+        counts, using half the memory (a quarter with respect to float64 fractions
+        and ratios when combined with float32 ratios), and is exact.
+        Without a grid and `tau`, the cumulative distribution is computed by
+        comparing all the ratios with all the breakpoints at once (the "dense"
+        engine), which needs n_breakpoints * n_problems * n_solvers bytes, and
+        otherwise by sorting each column of ratios and searching the breakpoints
+        (the "sorted" engine). With `max_memory`, the dense engine is only used if
+        its estimated peak fits in the budget, and if the aligned arrays do not fit
+        either, the ratios are computed in place of the times, and the best times,
+        breakpoints and counts in chunks of rows (the "chunked" engine), so only the
+        ratio matrix and one chunk are held at a time.
 
     Example:
         >>> import pandas as pd
@@ -64,7 +145,20 @@ class ProfileData:
     """
 
     def __init__(
-        self, *solvers: Union[str, Path, SolverData], subset: list[str] | None = None
+        self,
+        *solvers: Union[str, Path, SolverData],
+        subset: list[str] | ProblemSelection | None = None,
+        cost: str = "time",
+        columns: Iterable[str] | None = None,
+        compare: str = "exitflag",
+        infeas_tol: float = 1e-4,
+        unconstrained: bool = False,
+        grid: int | Iterable[float] | None = None,
+        grid_scale: str = "log",
+        tau: float | None = None,
+        ratio_dtype: str = "float64",
+        cumulative_dtype: str = "float64",
+        max_memory: int | None = None,
     ) -> None:
         """Initialize performance profile with solver data or file paths.
 
@@ -72,11 +166,58 @@ class ProfileData:
             *solvers (Union[str, Path, SolverData]):
                 Solver data sources. Can be:
                 - File paths (str/Path) to YAML files with solver results
+                - File paths (str/Path) to Parquet or Arrow/Feather files written
+                  by `SolverData.write_arrow` (only the needed columns and the
+                  problems in `subset` are read)
                 - SolverData objects with pre-loaded data
                 At least 2 solvers are required for comparison.
-            subset (list[str], optional):
-                If provided, restricts the analysis to only these problem names.
+            subset (list[str] | ProblemSelection, optional):
+                If provided, restricts the analysis to only these problem names, or
+                to the problems chosen by a `selection.ProblemSelection`.
                 Useful for focusing on specific problem subsets.
+            cost (str):
+                Numeric column of the solver data that is profiled. Defaults to
+                "time". Profiles of other columns of the same solvers are computed
+                with `for_cost` or `for_costs`.
+            columns (Iterable[str], optional):
+                Other cost columns to read from Parquet and Arrow/Feather files, to
+                be profiled later with `for_cost` or `for_costs`.
+            compare (str):
+                "exitflag" (default): a run is successful if its exit flag is in
+                the success flags of its solver.
+                "optimalvalues": the exit flag is ignored, and a run is successful
+                if its primal and dual infeasibilities are at most `infeas_tol`
+                (missing values count as feasible). The best cost of a problem is
+                then the smallest cost among the runs whose objective value "fval"
+                is within a relative 1e-3 (plus 1e-6) of the best one, and every
+                successful run is compared to it, as in `perprof.prof.Pdata.scale`.
+            infeas_tol (float):
+                Tolerance for the infeasibilities with "optimalvalues".
+            unconstrained (bool):
+                If True, the primal infeasibility is ignored with "optimalvalues".
+            grid (int | Iterable[float], optional):
+                If provided, the profile is evaluated only on a grid instead of at
+                every unique ratio. If an integer, the grid has this many points
+                from 1 to `tau` (or to the largest finite ratio) spaced according to
+                `grid_scale`. Otherwise, the grid points themselves.
+                Output size and evaluation time then depend on the grid size only.
+            grid_scale (str):
+                Spacing of the automatic grid: "log" (default) or "linear".
+            tau (float, optional):
+                If provided, the profile is only evaluated for ratios up to `tau`.
+            ratio_dtype (str):
+                Floating point type of the times and ratios: "float64" (default) or
+                "float32". See the note in `ProfileData` for the effect of float32.
+            cumulative_dtype (str):
+                Storage of the cumulative distribution: "float64" (default) for
+                fractions, or "uint32" for counts of solved problems, which are
+                normalized only when `cumulative` is accessed.
+            max_memory (int, optional):
+                Memory budget in bytes. The footprint of the aligned arrays is
+                estimated before they are allocated, and the engine of the
+                cumulative distribution is chosen to fit in the budget (see the
+                note in `ProfileData`). The chosen engine and its estimated peak
+                are logged.
 
         Raises:
             ValueError: If solver input type is not supported or fewer than 2 solvers provided.
@@ -95,35 +236,92 @@ class ProfileData:
             >>>
             >>> # With problem subset
             >>> profile_subset = ProfileData(solver1, solver2, subset=["prob1"])
-            >>> len(profile_subset._solvers_data)
-            1
+            >>> list(profile_subset.problems)
+            ['prob1']
         """
         self.solvers = []
+        selection = as_selection(subset)
+        read_columns = [cost, *(columns or [])]
+        if compare == "optimalvalues":
+            read_columns += OPTIONAL_COLUMNS
         for solver in solvers:
-            if isinstance(solver, (str, Path)):
+            if isinstance(solver, (str, Path)) and Path(solver).suffix in ARROW_FORMATS:
+                names = None
+                if selection is not None and selection.names_only():
+                    names = selection.names
+                self.solvers.append(
+                    read_arrow(solver, columns=read_columns, subset=names)
+                )
+            elif isinstance(solver, (str, Path)):
                 self.solvers.append(read_table(solver))
             elif isinstance(solver, SolverData):
                 self.solvers.append(solver)
             else:
                 raise ValueError(f"Unexpected type for solver input: {type(solver)}")
+        self.algnames = [solver.algname for solver in self.solvers]
         self.subset = subset
+        self.cost = cost
+        if compare not in ["exitflag", "optimalvalues"]:
+            raise ValueError(f"Unexpected comparison: {compare}")
+        self.compare = compare
+        self.infeas_tol = infeas_tol
+        self.unconstrained = unconstrained
+        if grid is not None and not isinstance(grid, (int, np.integer)):
+            grid = np.sort(np.asarray(grid, dtype=float))
+        self.grid = grid
+        if grid_scale not in ["log", "linear"]:
+            raise ValueError(f"Unexpected grid scale: {grid_scale}")
+        self.grid_scale = grid_scale
+        self.tau = tau
+        if ratio_dtype not in ["float64", "float32"]:
+            raise ValueError(f"Unexpected ratio dtype: {ratio_dtype}")
+        self.ratio_dtype = ratio_dtype
+        if cumulative_dtype not in ["float64", "uint32"]:
+            raise ValueError(f"Unexpected cumulative dtype: {cumulative_dtype}")
+        self.cumulative_dtype = cumulative_dtype
+        self.max_memory = max_memory
 
         # Variables that will be filled by self.process()
-        self._solvers_data: pd.DataFrame | None = None
+        self.problems: pd.Index | None = None
+        self._rows: list[np.ndarray] | None = None
+        self._failed: list[np.ndarray] | None = None
+        self._optimal: np.ndarray | None = None
+        self._times: np.ndarray | None = None
         self.ratio: np.ndarray | None = None
         self._best_times: np.ndarray | None = None
         self.breakpoints: np.ndarray | None = None
-        self.cumulative: np.ndarray | None = None
+        self.n_problems: int | None = None
+        self._cumulative: np.ndarray | None = None
+        self._drilldown: DrillDownIndex | None = None
+        self._chunk_rows: int | None = None
         self.process()
 
+    @property
+    def cumulative(self) -> np.ndarray | None:
+        """Cumulative distribution of problems solved, as fractions."""
+        if self._cumulative is None or self._cumulative.dtype.kind == "f":
+            return self._cumulative
+        return self._cumulative / self.n_problems
+
+    @cumulative.setter
+    def cumulative(self, value: np.ndarray | None) -> None:
+        self._cumulative = value
+
+    @property
+    def solved_counts(self) -> np.ndarray | None:
+        """Cumulative distribution of problems solved, as counts."""
+        if self._cumulative is None or self._cumulative.dtype.kind == "u":
+            return self._cumulative
+        return np.rint(self._cumulative * self.n_problems).astype(np.int64)
+
     def process(self) -> None:
         """Process solver data to compute performance profile.
 
         Computes ratio matrix, breakpoints, and cumulative distribution:
-        1. Merge solver data into unified DataFrame
-        2. Set failed convergence times to infinity
+        1. Align the solver data into a problems x solvers array of times
+        2. Set failed convergence and missing times to infinity
         3. Compute ratio matrix: time[solver,problem] / min_time[problem]
-        4. Generate breakpoints from unique ratio values
+        4. Generate breakpoints from unique ratio values (or from the grid), up to tau
         5. Compute cumulative distribution
 
         Raises:
@@ -151,43 +349,916 @@ class ProfileData:
             raise ValueError("A Profile needs two solvers, at least")
 
         # create the reduced dataset: |subset| x |solvers|
-        cols = ["name", "time"]
-        self._solvers_data = self.solvers[0].data[cols].copy()
-        for solver in self.solvers[1:]:
-            self._solvers_data = self._solvers_data.join(
-                solver.data[cols].set_index("name"),
-                on="name",
-                rsuffix="_" + solver.algname,
-            )
-        self._solvers_data = self._solvers_data.rename(
-            columns={"time": "time_" + self.solvers[0].algname}
+        self._align()
+        self._check_memory()
+        if self.compare == "optimalvalues":
+            self._optimal = self._optimal_mask()
+        self._times = self._gather(self.cost)
+        self._compute()
+
+    def _check_memory(self) -> None:
+        """Check that the aligned arrays fit in `max_memory`, before allocating them.
+
+        The times and the ratios take one float per problem and solver each, and
+        the division and the masks of failures take as much again. If that does
+        not fit, the ratios are computed in place of the times, in chunks of rows
+        sized to fit in what the ratio matrix leaves of the budget.
+        """
+        self._chunk_rows = None
+        row_size = len(self.solvers) * np.dtype(self.ratio_dtype).itemsize
+        peak = 4 * len(self.problems) * row_size
+        LOGGER.debug(
+            "Aligned %d problems and %d solvers, estimated peak %s",
+            len(self.problems),
+            len(self.solvers),
+            _format_bytes(peak),
         )
+        if self.max_memory is None or peak <= self.max_memory:
+            return
+        free = self.max_memory - len(self.problems) * row_size
+        self._chunk_rows = max(MIN_CHUNK_ROWS, free // (4 * row_size))
+        if free < MIN_CHUNK_ROWS * 4 * row_size:
+            LOGGER.warning(
+                "The ratio matrix of %d problems and %d solvers takes %s, "
+                "the profile will exceed max_memory (%s)",
+                len(self.problems),
+                len(self.solvers),
+                _format_bytes(len(self.problems) * row_size),
+                _format_bytes(self.max_memory),
+            )
+
+    def _row_chunks_of(self, n_rows: int) -> Iterator[slice]:
+        """Iterate over the chunks of rows of the low-memory computation."""
+        chunk_rows = self._chunk_rows or max(n_rows, 1)
+        for start in range(0, n_rows, chunk_rows):
+            yield slice(start, start + chunk_rows)
 
-        # set to inf the ones that fail convergence
-        for solver in self.solvers:
-            mask = ~solver.data.exit.isin(solver.success)
-            if np.any(mask):
-                self._solvers_data.loc[mask, "time_" + solver.algname] = float("inf")
+    def _optimal_mask(self, columns: list[int] | None = None) -> np.ndarray:
+        """Find the runs whose objective value is close to the best of the problem.
 
-        self._solvers_data.fillna(float("inf"))
-        if self.subset:
-            self._solvers_data = self._solvers_data[
-                self._solvers_data.name.isin(self.subset)
-            ]
+        Args:
+            columns (list[int], optional): If given, only these solvers are
+                compared.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape (n_problems, n_solvers). For
+                problems without any finite objective value, all the runs.
+        """
+        fvals = self._gather("fval")
+        if columns is not None:
+            fvals = fvals[:, columns]
+        best = fvals.min(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore"):
+            optimal = fvals < best + np.abs(best) * 1e-3 + 1e-6
+        return optimal | ~np.isfinite(best)
 
-        # Compute the minimum time
-        self._best_times = self._solvers_data.iloc[:, 1:].min(axis=1).values
+    def _compute(self) -> None:
+        """Compute the ratios and the cumulative distribution from `_times`."""
+        if self._chunk_rows is not None:
+            self._compute_in_place()
+            return
+        # Compute the minimum time, only among the optimal runs if comparing values
+        if self._optimal is None:
+            self._best_times = self._times.min(axis=1)
+        else:
+            self._best_times = np.where(self._optimal, self._times, np.inf).min(axis=1)
 
         # Compute the cumulative distribution
-        self.ratio = (
-            self._solvers_data.iloc[:, 1:] / self._best_times[:, np.newaxis]
-        ).values
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.ratio = self._times / self._best_times[:, np.newaxis]
         self.ratio[np.isnan(self.ratio)] = float("inf")
-        self.breakpoints = np.sort(np.unique(self.ratio.reshape(-1)))
-        # This removes inf and nan
-        self.breakpoints = self.breakpoints[self.breakpoints < float("inf")]
-        # self
-        self.cumulative = (
-            self.ratio[np.newaxis, :, :] <= self.breakpoints[:, np.newaxis, np.newaxis]
+        self._compute_cumulative()
+
+    def _compute_in_place(self) -> None:
+        """Compute the ratios in place of `_times`, in chunks of rows.
+
+        The times are not kept, and are recovered from the ratios and the best
+        times when needed (see `_solver_times`).
+        """
+        times, self._times = self._times, None
+        self._best_times = np.empty(len(times), dtype=times.dtype)
+        for rows in self._row_chunks_of(len(times)):
+            block = times[rows]
+            if self._optimal is None:
+                best = block.min(axis=1)
+            else:
+                best = np.where(self._optimal[rows], block, np.inf).min(axis=1)
+            self._best_times[rows] = best
+            with np.errstate(invalid="ignore", divide="ignore"):
+                np.divide(block, best[:, np.newaxis], out=block)
+            block[np.isnan(block)] = float("inf")
+        self.ratio = times
+        self._compute_cumulative()
+
+    def _compute_cumulative(self) -> None:
+        """Compute the breakpoints and the cumulative distribution from `ratio`."""
+        self._drilldown = None
+        chunks = list(self._row_chunks_of(self.ratio.shape[0]))
+        if self.grid is None:
+            self.breakpoints = np.empty(0, dtype=self.ratio.dtype)
+            for rows in chunks:
+                block = self.ratio[rows]
+                # This removes inf and nan
+                self.breakpoints = np.union1d(
+                    self.breakpoints, block[block < float("inf")]
+                )
+        elif isinstance(self.grid, (int, np.integer)):
+            max_ratio = 1.0
+            for rows in chunks:
+                block = self.ratio[rows]
+                finite = block[block < float("inf")]
+                if finite.size > 0:
+                    max_ratio = max(max_ratio, finite.max())
+            self.breakpoints = evaluation_grid(
+                max_ratio, self.grid, self.grid_scale, self.tau
+            )
+        else:
+            self.breakpoints = self.grid
+        if self.tau is not None:
+            self.breakpoints = self.breakpoints[self.breakpoints <= self.tau]
+
+        self.n_problems = self.ratio.shape[0]
+        engine = self._cumulative_engine()
+        if engine == "dense":
+            counts = (
+                self.ratio[np.newaxis, :, :]
+                <= self.breakpoints[:, np.newaxis, np.newaxis]
+            ).sum(axis=1)
+        elif engine == "sorted":
+            counts = cumulative_counts(self.ratio, self.breakpoints)
+        else:
+            counts = np.zeros((len(self.breakpoints), self.ratio.shape[1]), np.int64)
+            for rows in chunks:
+                counts += cumulative_counts(self.ratio[rows], self.breakpoints)
+        if self.cumulative_dtype == "uint32":
+            self.cumulative = counts.astype(np.uint32)
+        else:
+            self.cumulative = counts / self.n_problems
+
+    def _cumulative_engine(self) -> str:
+        """Choose how the cumulative distribution is computed, and log it.
+
+        Returns:
+            str: "dense" to compare all the ratios with all the breakpoints at once,
+                "sorted" to search the breakpoints in the sorted ratios, or
+                "chunked" to do so in chunks of rows (see `_check_memory`).
+        """
+        n_points = len(self.breakpoints)
+        n_solvers = self.ratio.shape[1]
+        counts = n_points * n_solvers * np.dtype(np.int64).itemsize
+        peaks = {
+            "dense": n_points * self.ratio.size + counts,
+            "sorted": self.ratio.nbytes + counts,
+        }
+        engine = "sorted"
+        if self._chunk_rows is not None:
+            engine = "chunked"
+            chunk = min(self._chunk_rows, self.n_problems) * n_solvers
+            peaks[engine] = self.ratio.nbytes + 4 * chunk * self.ratio.itemsize + counts
+        elif self.grid is None and self.tau is None:
+            if self.max_memory is None or peaks["dense"] <= self.max_memory:
+                engine = "dense"
+        LOGGER.info(
+            "Profile of %d problems, %d solvers and %d breakpoints: "
+            "%s engine, estimated peak %s",
+            self.n_problems,
+            n_solvers,
+            n_points,
+            engine,
+            _format_bytes(peaks[engine]),
+        )
+        return engine
+
+    def _align(self) -> None:
+        """Align the solvers' times into a single problems x solvers array.
+
+        The problem names of all solvers are interned once into integer codes
+        (stored in `problems`), and the times of each solver are scattered into a
+        preallocated array using these codes. The cost is linear in the total
+        number of rows, independently of the number of solvers.
+
+        The subset, if any, is evaluated once over the unique problem names, and
+        the problems outside of it are dropped before the times are scattered. When
+        comparing optimal values, the problems without feasible runs are dropped.
+
+        The problem codes of each solver's rows and its failure mask are kept, so
+        that `_gather` can scatter any cost column without aligning again.
+        """
+        names = pd.concat(
+            [solver.data["name"] for solver in self.solvers], ignore_index=True
+        )
+        codes, self.problems = pd.factorize(names)
+        self._failed = [self._failure_mask(solver) for solver in self.solvers]
+        selection = as_selection(self.subset)
+        selected = np.ones(len(self.problems), dtype=bool)
+        if selection is not None:
+            selected &= selection.mask(self.problems)
+        if self.compare == "optimalvalues":
+            # As in the legacy parser, problems without feasible runs are dropped
+            selected &= np.bincount(
+                codes[~np.concatenate(self._failed)], minlength=len(self.problems)
+            ).astype(bool)
+        if not selected.all():
+            new_codes = np.cumsum(selected) - 1
+            new_codes[~selected] = -1
+            codes = new_codes[codes]
+            self.problems = self.problems[selected]
+        offsets = np.cumsum([0] + [len(solver.data) for solver in self.solvers])
+        self._rows = [codes[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def _failure_mask(self, solver: SolverData) -> np.ndarray:
+        """Return which rows of a solver failed, according to `compare`."""
+        if self.compare == "exitflag":
+            return ~solver.data["exit"].isin(solver.success).to_numpy()
+        infeasibility = solver.data["dual"].to_numpy(dtype=float)
+        if not self.unconstrained:
+            infeasibility = np.fmax(
+                infeasibility, solver.data["primal"].to_numpy(dtype=float)
+            )
+        # NaN (missing) infeasibilities are not > tol, so they count as feasible
+        return infeasibility > self.infeas_tol
+
+    def _gather(self, cost: str) -> np.ndarray:
+        """Scatter a cost column of the solvers into a problems x solvers array.
+
+        Uses the problem codes and failure masks computed once by `_align`.
+        Problems that are missing for a solver, failed, or have no cost are set to
+        infinity.
+
+        Raises:
+            ValueError: If a solver has no column `cost`.
+        """
+        values = np.full(
+            (len(self.problems), len(self.solvers)),
+            float("inf"),
+            dtype=self.ratio_dtype,
+        )
+        for j, (solver, rows, failed) in enumerate(
+            zip(self.solvers, self._rows, self._failed)
+        ):
+            if cost not in solver.data.columns:
+                raise ValueError(f"Missing column {cost} for {solver.algname}")
+            column = solver.data[cost].to_numpy(dtype=float)
+            column = np.where(failed | np.isnan(column), np.inf, column)
+            valid = rows >= 0
+            values[rows[valid], j] = column[valid]
+        return values
+
+    def for_cost(self, cost: str) -> ProfileData:
+        """Compute the profile of another cost column of the same solvers.
+
+        The problem alignment and the failure masks of this profile are reused, so
+        only the cost column is gathered, and all the options (subset, grid, tau
+        and dtypes) are the same.
+
+        Args:
+            cost (str): Numeric column of the solver data, e.g., "iter".
+
+        Returns:
+            ProfileData: The profile of `cost`.
+
+        Raises:
+            ValueError: If the profile has no solver data, or a solver has no
+                column `cost`.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0], "iter": [10, 40]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [2.0, 1.0], "iter": [20, 20]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> profile.for_cost("iter").ratio
+            array([[1., 2.],
+                   [2., 1.]])
+        """
+        if self._rows is None:
+            raise ValueError("The profile has no solver data")
+        profile = copy.copy(self)
+        profile.cost = cost
+        profile._times = self._gather(cost)  # pylint: disable=protected-access
+        profile._compute()  # pylint: disable=protected-access
+        return profile
+
+    def for_costs(self, costs: Iterable[str]) -> dict[str, ProfileData]:
+        """Compute the profiles of several cost columns of the same solvers.
+
+        See `for_cost`. The profile of the cost of this profile is itself.
+
+        Args:
+            costs (Iterable[str]): Numeric columns of the solver data.
+
+        Returns:
+            dict[str, ProfileData]: The profile of each cost.
+        """
+        return {
+            cost: self if cost == self.cost else self.for_cost(cost) for cost in costs
+        }
+
+    def restrict(self, problems: list[str] | ProblemSelection) -> ProfileData:
+        """Compute the profile of a subset of the problems of this profile.
+
+        The best time of a problem, and hence its ratios, only depend on its own
+        row, so the rows of the selected problems are taken from the ratio matrix
+        and only the breakpoints and the cumulative distribution are computed
+        again. The files are not read and the solvers are not aligned again, and
+        `for_cost` still works on the restricted profile.
+
+        Args:
+            problems (list[str] | ProblemSelection): The problems to keep, as in
+                the `subset` option. Problems that are not in this profile are
+                ignored.
+
+        Returns:
+            ProfileData: The profile of the selected problems, in the order of
+                this profile, with the same options.
+
+        Raises:
+            ValueError: If the profile has no ratio matrix or problem names.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2", "p3"], "exit": ["c", "c", "c"], "time": [1.0, 2.0, 4.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2", "p3"], "exit": ["c", "d", "c"], "time": [2.0, 1.0, 1.0]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> small = profile.restrict(["p1", "p2"])
+            >>> list(small.problems), small.breakpoints.tolist()
+            (['p1', 'p2'], [1.0, 2.0])
+            >>> small.cumulative.tolist()
+            [[1.0, 0.0], [1.0, 0.5]]
+        """
+        if self.ratio is None or self.problems is None:
+            raise ValueError("The profile has no ratios or problem names")
+        rows = np.flatnonzero(as_selection(problems).mask(self.problems))
+        profile = copy.copy(self)
+        profile.subset = list(self.problems[rows])
+        profile._take_rows(rows)  # pylint: disable=protected-access
+        profile._compute_cumulative()  # pylint: disable=protected-access
+        return profile
+
+    def _take_rows(self, rows: np.ndarray) -> None:
+        """Keep only some rows (problems) of the computed arrays, in place."""
+        old_problems = self.problems
+        self.problems = old_problems[rows]
+        self.ratio = self.ratio[rows]
+        if self._best_times is not None:
+            self._best_times = self._best_times[rows]
+        if self._times is not None:
+            self._times = self._times[rows]
+        if self._optimal is not None:
+            self._optimal = self._optimal[rows]
+        if self._rows is not None:
+            new_codes = np.full(len(old_problems) + 1, -1)
+            new_codes[rows] = np.arange(len(rows))
+            # Rows of problems outside of the profile have code -1, kept as -1
+            self._rows = [new_codes[codes] for codes in self._rows]
+
+    def for_solvers(self, algnames: Iterable[str]) -> ProfileData:
+        """Compute the profile of a subset of the solvers of this profile.
+
+        The best time of each problem is the smallest time among the selected
+        solvers, computed from the aligned times in O(n_problems * n_solvers),
+        without reading or aligning the solvers again. As in a new profile of
+        these solvers, the problems that none of them has (or, comparing optimal
+        values, that none of them solves) are dropped, and the optimal runs are
+        found among the selected solvers.
+
+        Args:
+            algnames (Iterable[str]): Names of the solvers, in the order of the
+                new profile.
+
+        Returns:
+            ProfileData: The profile of the selected solvers.
+
+        Raises:
+            KeyError: If a solver is not in the profile.
+            ValueError: If fewer than two solvers are selected, a solver is
+                repeated, or the profile has no times or ratios.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [2.0, 4.0]})
+            >>> data3 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [4.0, 1.0]})
+            >>> profile = ProfileData(*[SolverData(a, d) for a, d in zip("ABC", [data1, data2, data3])])
+            >>> profile.for_solvers(["B", "C"]).ratio
+            array([[1., 2.],
+                   [4., 1.]])
+        """
+        algnames = list(algnames)
+        columns = []
+        for algname in algnames:
+            if algname not in self.algnames:
+                raise KeyError(algname)
+            columns.append(self.algnames.index(algname))
+        if len(columns) <= 1:
+            raise ValueError("A Profile needs two solvers, at least")
+        if len(set(columns)) < len(columns):
+            raise ValueError("Repeated solver in the profile")
+        times = self._solver_times()[:, columns]
+        optimal = None
+        if self._optimal is not None:
+            optimal = self._optimal_mask(columns)
+            times = np.where(optimal, times, np.inf)
+        return self._for_columns(columns, times.min(axis=1), optimal)
+
+    def leave_one_out(self) -> dict[str, ProfileData]:
+        """Compute the profiles without each one of the solvers.
+
+        The smallest and second smallest times of each problem, and the solver
+        of the smallest one, are computed once. The best time of a problem
+        without a solver is then the second smallest time if that solver is the
+        fastest, and the smallest time otherwise, so all the profiles cost
+        O(n_problems * n_solvers) each. Comparing optimal values, the optimal
+        runs depend on the solvers, so each profile is computed by
+        `for_solvers`.
+
+        Returns:
+            dict[str, ProfileData]: The profile without each solver, by the name
+                of the solver that is left out.
+
+        Raises:
+            ValueError: If the profile has fewer than three solvers, or no times
+                or ratios.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [2.0, 4.0]})
+            >>> data3 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [4.0, 1.0]})
+            >>> profile = ProfileData(*[SolverData(a, d) for a, d in zip("ABC", [data1, data2, data3])])
+            >>> profiles = profile.leave_one_out()
+            >>> profiles["A"].algnames
+            ['B', 'C']
+            >>> profiles["A"].ratio
+            array([[1., 2.],
+                   [4., 1.]])
+        """
+        if len(self.algnames) <= 2:
+            raise ValueError("Leaving one solver out needs three solvers, at least")
+        if self._optimal is not None:
+            return {
+                algname: self.for_solvers(a for a in self.algnames if a != algname)
+                for algname in self.algnames
+            }
+        times = self._solver_times()
+        smallest = np.partition(times, 1, axis=1)
+        fastest = times.argmin(axis=1)
+        profiles = {}
+        for k, algname in enumerate(self.algnames):
+            columns = [j for j in range(len(self.algnames)) if j != k]
+            best_times = np.where(fastest == k, smallest[:, 1], smallest[:, 0])
+            profiles[algname] = self._for_columns(columns, best_times)
+        return profiles
+
+    def _solver_times(self) -> np.ndarray:
+        """Return the aligned times, or recover them from the ratios."""
+        if self._times is not None:
+            return self._times
+        if self.ratio is None or self._best_times is None:
+            raise ValueError("The profile has no times or ratios")
+        with np.errstate(invalid="ignore"):
+            times = self.ratio * self._best_times[:, np.newaxis]
+        times[np.isnan(times)] = np.inf
+        return times
+
+    def _for_columns(
+        self,
+        columns: list[int],
+        best_times: np.ndarray,
+        optimal: np.ndarray | None = None,
+    ) -> ProfileData:
+        """Create the profile of some solvers (columns), given their best times."""
+        profile = copy.copy(self)
+        profile.algnames = [self.algnames[j] for j in columns]
+        if self.solvers:
+            profile.solvers = [self.solvers[j] for j in columns]
+        times = self._solver_times()[:, columns]
+        if self._times is not None:
+            profile._times = times
+        profile._optimal = optimal
+        profile._best_times = best_times
+        with np.errstate(invalid="ignore", divide="ignore"):
+            profile.ratio = times / best_times[:, np.newaxis]
+        profile.ratio[np.isnan(profile.ratio)] = float("inf")
+        if self._rows is not None:
+            profile._rows = [self._rows[j] for j in columns]
+            profile._failed = [self._failed[j] for j in columns]
+            # As in a new profile, keep the problems of the selected solvers only
+            kept = np.zeros(len(self.problems), dtype=bool)
+            for rows, failed in zip(profile._rows, profile._failed):
+                if self.compare == "optimalvalues":
+                    rows = rows[~failed]
+                kept[rows[rows >= 0]] = True
+            if not kept.all():
+                profile._take_rows(np.flatnonzero(kept))
+        profile._compute_cumulative()
+        return profile
+
+    def partial(self) -> PartialProfile:
+        """Summarize the profile into a mergeable partial profile.
+
+        See `partial_profile` for how partial profiles of disjoint shards of
+        problems are merged into the profile of their union.
+
+        Returns:
+            PartialProfile: The summary of the ratios of each solver.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .partial_profile import PartialProfile
+
+        return PartialProfile.from_ratio(self.algnames, self.ratio)
+
+    def sketch(self, rank_error: float = 0.01) -> SketchProfile:
+        """Summarize the profile into mergeable quantile sketches.
+
+        See `sketch` for the guarantees of the approximate profile.
+
+        Args:
+            rank_error (float): Bound on the error of the cumulative distribution.
+
+        Returns:
+            SketchProfile: One sketch of the finite ratios of each solver.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .sketch import SketchProfile
+
+        sketch = SketchProfile(self.algnames, rank_error=rank_error)
+        sketch.update(self.ratio)
+        return sketch
+
+    def evaluate(self, tau: float | Iterable[float]) -> np.ndarray:
+        """Evaluate the profile of every solver at arbitrary ratios.
+
+        The profile is a step function, so its value at tau is the cumulative
+        distribution at the last breakpoint <= tau, found by binary search in
+        `breakpoints`, without recomputing anything. With a grid or `tau`, the
+        values between grid points and past the last breakpoint are the ones
+        of the previous breakpoint.
+
+        Args:
+            tau (float | Iterable[float]): The ratios.
+
+        Returns:
+            numpy.ndarray: The fractions of problems solved, of shape
+                (len(tau), n_solvers), or (n_solvers,) for a single ratio.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "d"], "time": [2.0, 1.0]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> profile.evaluate([0.5, 1.0, 1.5, 10.0]).tolist()
+            [[0.0, 0.0], [1.0, 0.0], [1.0, 0.0], [1.0, 0.5]]
+        """
+        index = np.searchsorted(self.breakpoints, tau, side="right")
+        cumulative = self.cumulative
+        values = cumulative[np.maximum(index - 1, 0)]
+        return np.where(np.expand_dims(index > 0, -1), values, 0.0)
+
+    def inverse(self, fractions: float | Iterable[float]) -> np.ndarray:
+        """Find the smallest ratio at which each solver solves fractions of problems.
+
+        The cumulative distribution of each solver is non-decreasing, so this is a
+        binary search in each of its columns, without recomputing anything.
+
+        Args:
+            fractions (float | Iterable[float]): Fractions of problems, in [0, 1].
+
+        Returns:
+            numpy.ndarray: The smallest breakpoints where the profile reaches each
+                fraction, or inf where it never does, of shape
+                (len(fractions), n_solvers), or (n_solvers,) for a single fraction.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "d"], "time": [2.0, 1.0]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> profile.inverse([0.5, 1.0]).tolist()
+            [[1.0, 2.0], [1.0, inf]]
+        """
+        fractions = np.asarray(fractions, dtype=float)
+        cumulative = self.cumulative
+        index = np.stack(
+            [
+                np.searchsorted(cumulative[:, j], fractions, side="left")
+                for j in range(cumulative.shape[1])
+            ],
+            axis=-1,
+        )
+        breakpoints = np.append(self.breakpoints, np.inf)
+        return breakpoints[index]
+
+    def drilldown(self) -> DrillDownIndex:
+        """Return the index from the ratios back to the problems.
+
+        The index is built on the first call, sorting the ratios of each solver
+        once, and answers which problems a solver solves within a ratio, or
+        between two ratios, in O(log(n_problems) + k) for k problems.
+
+        Returns:
+            DrillDownIndex: The index.
+
+        Raises:
+            ValueError: If the profile has no ratio matrix or problem names, e.g.,
+                if it was loaded from a file without them.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2", "p3"], "exit": ["c", "c", "c"], "time": [1.0, 2.0, 4.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2", "p3"], "exit": ["c", "d", "c"], "time": [2.0, 1.0, 1.0]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> index = profile.drilldown()
+            >>> index.problems_between("A", 1.0, 4.0).tolist()
+            ['p3']
+            >>> index.best_solvers("p2")
+            ['A']
+        """
+        if self._drilldown is None:
+            if self.ratio is None or self.problems is None:
+                raise ValueError("The profile has no ratios or problem names")
+            self._drilldown = DrillDownIndex(self.ratio, self.problems, self.algnames)
+        return self._drilldown
+
+    def summary(
+        self,
+        tau: float | None = None,
+        shift: float = 10.0,
+        levels: Iterable[float] = (0.5, 0.9),
+    ) -> pd.DataFrame:
+        """Compute summary metrics of each solver.
+
+        See `summary` for the metrics.
+
+        Args:
+            tau (float, optional): Upper limit of the area under the profile.
+                Defaults to the `tau` of the profile, or to the largest ratio.
+            shift (float): Shift of the geometric mean of the times.
+            levels (Iterable[float]): Fractions of problems solved of the
+                `ratio_at_X` columns.
+
+        Returns:
+            pandas.DataFrame: One row per solver, indexed by the solver names.
+
+        Raises:
+            ValueError: If the profile has no ratio matrix (e.g., a streaming
+                profile, or one loaded from a file without it).
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [2.0, 1.0]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> summary = profile.summary()
+            >>> summary["wins"].to_dict()
+            {'A': 1, 'B': 1}
+            >>> summary["sgm_time"].round(4).to_dict()
+            {'A': 1.4891, 'B': 1.4891}
+        """
+        if self.ratio is None:
+            raise ValueError("The summary needs the ratio matrix of the profile")
+        times = self._times
+        if times is None and self._best_times is not None:
+            with np.errstate(invalid="ignore"):
+                times = self.ratio * self._best_times[:, np.newaxis]
+        return summary_metrics(
+            self.ratio,
+            self.algnames,
+            times=times,
+            tau=self.tau if tau is None else tau,
+            shift=shift,
+            levels=list(levels),
+        )
+
+    def save(self, filename: Union[str, Path]) -> None:
+        """Save the computed profile to a file.
+
+        The file stores the solver names, problem names, ratio matrix, best times,
+        breakpoints and cumulative distribution, so that the profile can be reloaded
+        with `ProfileData.load` and plotted without recomputation. See
+        `profile_io` for the formats.
+
+        Args:
+            filename (Union[str, Path]): Path of the file, with extension .npz
+                (binary) or .json.
+
+        Example:
+            >>> import pandas as pd
+            >>> from perprof.profile_data import ProfileData
+            >>> from perprof.solver_data import SolverData
+            >>>
+            >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+            >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "d"], "time": [2.0, 1.0]})
+            >>> profile = ProfileData(SolverData("A", data1), SolverData("B", data2))
+            >>> # profile.save("profile.npz")
+            >>> # ProfileData.load("profile.npz").cumulative
+        """
+        write_profile(
+            filename,
+            {
+                "algnames": self.algnames,
+                "problems": None if self.problems is None else list(self.problems),
+                "ratio": self.ratio,
+                "best_times": self._best_times,
+                "breakpoints": self.breakpoints,
+                "cumulative": self.cumulative,
+            },
+        )
+
+    @classmethod
+    def load(cls, filename: Union[str, Path]) -> ProfileData:
+        """Load a profile saved with `ProfileData.save`.
+
+        The loaded profile has no solver data (`solvers` is empty), so it cannot be
+        processed again, but all the computed attributes are available.
+
+        Args:
+            filename (Union[str, Path]): Path of the file, with extension .npz or .json.
+
+        Returns:
+            ProfileData: The loaded profile.
+        """
+        return cls._from_content(read_profile(filename))
+
+    @classmethod
+    def _from_content(cls, content: dict) -> ProfileData:
+        """Create a profile from the content of a file (see `profile_io`)."""
+        problems = content.get("problems")
+        return cls._from_computed(
+            content["algnames"],
+            content["breakpoints"],
+            content["cumulative"],
+            problems=None if problems is None else pd.Index(problems, dtype=object),
+            ratio=content.get("ratio"),
+            best_times=content.get("best_times"),
         )
-        self.cumulative = self.cumulative.sum(axis=1) / self.ratio.shape[0]
+
+    @classmethod
+    def _from_computed(
+        cls,
+        algnames: list[str],
+        breakpoints: np.ndarray,
+        cumulative: np.ndarray,
+        problems: pd.Index | None = None,
+        ratio: np.ndarray | None = None,
+        best_times: np.ndarray | None = None,
+        n_problems: int | None = None,
+    ) -> ProfileData:
+        """Create a profile from already computed data, without solver data."""
+        profile = cls.__new__(cls)
+        profile.solvers = []
+        profile.algnames = list(algnames)
+        profile.subset = None
+        profile.cost = "time"
+        profile.compare = "exitflag"
+        profile.infeas_tol = 1e-4
+        profile.unconstrained = False
+        profile.grid = None
+        profile.grid_scale = "log"
+        profile.tau = None
+        profile.ratio_dtype = "float64" if ratio is None else str(ratio.dtype)
+        profile.cumulative_dtype = str(cumulative.dtype)
+        profile.max_memory = None
+        profile._chunk_rows = None
+        profile.n_problems = n_problems
+        if problems is not None:
+            profile.n_problems = len(problems)
+        elif ratio is not None:
+            profile.n_problems = ratio.shape[0]
+        profile.problems = problems
+        profile._rows = None
+        profile._failed = None
+        profile._optimal = None
+        profile._times = None
+        profile.ratio = ratio
+        profile._best_times = best_times
+        profile.breakpoints = breakpoints
+        profile.cumulative = cumulative
+        profile._drilldown = None
+        return profile
+
+    @classmethod
+    def _from_ratio(
+        cls,
+        algnames: list[str],
+        problems: pd.Index,
+        ratio: np.ndarray,
+        best_times: np.ndarray | None = None,
+        grid: int | Iterable[float] | None = None,
+        grid_scale: str = "log",
+        tau: float | None = None,
+        cumulative_dtype: str = "float64",
+    ) -> ProfileData:
+        """Create a profile from a ratio matrix computed elsewhere, e.g., in SQL."""
+        profile = cls._from_computed(
+            algnames,
+            np.empty(0),
+            np.empty((0, len(algnames)), dtype=cumulative_dtype),
+            problems=problems,
+            ratio=ratio,
+            best_times=best_times,
+        )
+        if grid is not None and not isinstance(grid, (int, np.integer)):
+            grid = np.sort(np.asarray(grid, dtype=float))
+        profile.grid = grid
+        if grid_scale not in ["log", "linear"]:
+            raise ValueError(f"Unexpected grid scale: {grid_scale}")
+        profile.grid_scale = grid_scale
+        profile.tau = tau
+        if cumulative_dtype not in ["float64", "uint32"]:
+            raise ValueError(f"Unexpected cumulative dtype: {cumulative_dtype}")
+        profile.cumulative_dtype = cumulative_dtype
+        profile._compute_cumulative()  # pylint: disable=protected-access
+        return profile
+
+
+def _format_bytes(size: float) -> str:
+    """Format a number of bytes for the log, e.g., "1.5 MiB"."""
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def evaluation_grid(
+    max_ratio: float, points: int, scale: str = "log", tau: float | None = None
+) -> np.ndarray:
+    """Create an evaluation grid for a performance profile.
+
+    Args:
+        max_ratio (float): Largest finite ratio of the profile.
+        points (int): Number of points of the grid.
+        scale (str): Spacing of the grid: "log" or "linear".
+        tau (float, optional): If given, the grid goes up to `tau` instead of
+            `max_ratio`.
+
+    Returns:
+        numpy.ndarray: The grid, from 1 to `tau` or `max_ratio`.
+
+    Example:
+        >>> from perprof.profile_data import evaluation_grid
+        >>> evaluation_grid(8.0, 4)
+        array([1., 2., 4., 8.])
+        >>> evaluation_grid(8.0, 3, scale="linear", tau=3.0)
+        array([1., 2., 3.])
+    """
+    upper = max_ratio if tau is None else tau
+    if upper <= 1.0:
+        return np.array([1.0])
+    if scale == "log":
+        return np.geomspace(1.0, upper, points)
+    return np.linspace(1.0, upper, points)
+
+
+def cumulative_counts(ratio: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Count the problems with ratio up to each point, for each solver.
+
+    Each column of `ratio` is sorted once, and the points are located with a
+    binary search, so the cost is O(P log P + T log P) per solver, for P problems
+    and T points, and no (T, P, S) intermediate array is created.
+
+    Args:
+        ratio (numpy.ndarray): Ratio matrix of shape (n_problems, n_solvers).
+        points (numpy.ndarray): Sorted points of shape (n_points,).
+
+    Returns:
+        numpy.ndarray: Array of shape (n_points, n_solvers) with the number of
+            problems where the ratio of each solver is <= each point.
+
+    Example:
+        >>> import numpy as np
+        >>> from perprof.profile_data import cumulative_counts
+        >>> ratio = np.array([[1.0, 2.0], [3.0, 1.0], [np.inf, 1.0]])
+        >>> cumulative_counts(ratio, np.array([1.0, 2.5]))
+        array([[1, 2],
+               [1, 3]])
+    """
+    sorted_ratio = np.sort(ratio, axis=0)
+    counts = np.empty((len(points), ratio.shape[1]), dtype=np.int64)
+    for j in range(ratio.shape[1]):
+        counts[:, j] = np.searchsorted(sorted_ratio[:, j], points, side="right")
+    return counts
@@ -0,0 +1,112 @@
+"""Files storing computed performance profiles.
+
+A profile file stores the names of the solvers, the breakpoints and the
+cumulative distribution of a profile, and optionally the problem names, the
+ratio matrix and the best time of each problem. Two formats are supported,
+chosen by the extension of the file name:
+
+- `.npz`: compressed NumPy arrays (compact and exact);
+- `.json`: plain JSON, with infinite values stored as `null`.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+PROFILE_FORMAT = "perprof-profile"
+PROFILE_VERSION = 1
+PROFILE_EXTENSIONS = [".npz", ".json"]
+
+# Arrays that may contain infinite values
+_ARRAYS = ["breakpoints", "cumulative", "ratio", "best_times"]
+
+
+def write_profile(filename: Union[str, Path], profile: dict) -> None:
+    """Write a computed profile to a file.
+
+    Args:
+        filename (Union[str, Path]): Path of the file, with extension .npz or .json.
+        profile (dict):
+            Dictionary with the keys "algnames" (list[str]), "breakpoints"
+            (array of shape (n_breakpoints,)) and "cumulative" (array of shape
+            (n_breakpoints, n_solvers)), and optionally "problems" (list[str]),
+            "ratio" (array of shape (n_problems, n_solvers)) and "best_times"
+            (array of shape (n_problems,)). Keys with None values are not written.
+
+    Raises:
+        ValueError: If the extension of `filename` is not supported.
+    """
+    suffix = Path(filename).suffix
+    profile = {key: value for key, value in profile.items() if value is not None}
+    if suffix == ".npz":
+        arrays = {
+            "format": np.array(PROFILE_FORMAT),
+            "version": np.array(PROFILE_VERSION),
+        }
+        for key, value in profile.items():
+            if key in _ARRAYS:
+                arrays[key] = np.asarray(value)
+            else:
+                arrays[key] = np.asarray(list(value), dtype=str)
+        with open(filename, "wb") as file_:
+            np.savez_compressed(file_, **arrays)
+    elif suffix == ".json":
+        content = {"format": PROFILE_FORMAT, "version": PROFILE_VERSION}
+        for key, value in profile.items():
+            if key in _ARRAYS:
+                value = np.asarray(value, dtype=float)
+                value = np.where(np.isfinite(value), value, None).tolist()
+            else:
+                value = [str(x) for x in value]
+            content[key] = value
+        with open(filename, "w", encoding="utf-8") as file_:
+            json.dump(content, file_, allow_nan=False)
+    else:
+        raise ValueError(f"Unsupported extension for profile file: {suffix}")
+
+
+def read_profile(filename: Union[str, Path]) -> dict:
+    """Read a computed profile from a file written by `write_profile`.
+
+    Args:
+        filename (Union[str, Path]): Path of the file, with extension .npz or .json.
+
+    Returns:
+        dict: The profile, with the keys described in `write_profile`. Arrays are
+            returned as numpy arrays and names as lists of strings.
+
+    Raises:
+        ValueError: If the extension is not supported or the file is not a profile.
+    """
+    suffix = Path(filename).suffix
+    if suffix == ".npz":
+        with np.load(filename, allow_pickle=False) as arrays:
+            content = {key: arrays[key] for key in arrays.files}
+        content["format"] = str(content.get("format", ""))
+    elif suffix == ".json":
+        with open(filename, encoding="utf-8") as file_:
+            content = json.load(file_)
+    else:
+        raise ValueError(f"Unsupported extension for profile file: {suffix}")
+
+    if content.pop("format", None) != PROFILE_FORMAT:
+        raise ValueError(f"{filename} is not a perprof profile file")
+    content.pop("version", None)
+
+    profile = {}
+    for key, value in content.items():
+        if key in _ARRAYS:
+            value = np.array(value, dtype=float)
+            value[np.isnan(value)] = float("inf")
+        else:
+            value = [str(x) for x in value]
+        profile[key] = value
+    # Ensure the shape of cumulative even when there are no breakpoints
+    profile["cumulative"] = profile["cumulative"].reshape(
+        len(profile["breakpoints"]), len(profile["algnames"])
+    )
+    return profile
@@ -0,0 +1,223 @@
+"""Render one or many performance profiles in parallel.
+
+Each render job runs a backend (`bokeh`, `mp` or `tikz`) in a worker process of a
+pool, so matplotlib state is isolated per process and pdflatex compilations run
+concurrently, bounded by the number of workers. The results are collected in the
+order of the jobs, and the error of a failed job is reported in its result
+instead of stopping the other jobs.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from .prof import Pdata
+
+LOGGER = logging.getLogger("perprof.render")
+
+BACKEND_FORMATS = {
+    "bokeh": ["html"],
+    "mp": ["eps", "pdf", "png", "ps", "svg"],
+    "tikz": ["tex", "pdf"],
+}
+
+
+class RenderJob(NamedTuple):
+    """A backend and its options, rendering one output file."""
+
+    backend: str
+    parser_options: dict
+    profiler_options: dict
+
+    @property
+    def target(self) -> str:
+        """The output file the job is expected to write."""
+        options = self.profiler_options
+        output = options.get("output") or "performance-profile"
+        return f"{output}.{options['output_format']}"
+
+
+class RenderResult(NamedTuple):
+    """The output file of a render job, or the error that stopped it."""
+
+    job: RenderJob
+    output: str | None
+    error: str | None
+
+
+def _profiler_class(backend: str) -> type[Pdata]:
+    """Import the profiler of a backend."""
+    # pylint: disable=import-outside-toplevel
+    if backend == "bokeh":
+        from .bokeh import Profiler
+    elif backend == "mp":
+        from .matplotlib import Profiler
+    elif backend == "tikz":
+        from .tikz import Profiler
+    else:
+        raise ValueError(f"Unexpected backend: {backend}")
+    return Profiler
+
+
+def render(job: RenderJob) -> str:
+    """Run a render job in this process.
+
+    Args:
+        job (RenderJob): The job.
+
+    Returns:
+        str: The output file.
+    """
+    profiler = _profiler_class(job.backend)(job.parser_options, job.profiler_options)
+    profiler.plot()
+    output = profiler.output
+    if job.backend == "tikz" and profiler.output_format == "pdf":
+        output = os.path.splitext(output)[0] + ".pdf"
+    return str(output)
+
+
+def _render_safely(job: RenderJob) -> RenderResult:
+    """Run a render job, catching its error."""
+    # A backend can fail in many ways (pdflatex, matplotlib, bokeh, bad options),
+    # and a failing format must not stop the others, so any error is reported
+    try:
+        return RenderResult(job, render(job), None)
+    except Exception as error:  # noqa: BLE001 # pylint: disable=broad-exception-caught
+        return RenderResult(job, None, f"{type(error).__name__}: {error}")
+
+
+def render_all(
+    jobs: Iterable[RenderJob],
+    processes: int | None = None,
+    pdf_timeout: float | None = None,
+) -> list[RenderResult]:
+    """Run render jobs in a pool of worker processes.
+
+    Args:
+        jobs (Iterable[RenderJob]): The jobs.
+        processes (int, optional): Maximum number of jobs, and hence of pdflatex
+            compilations, running at the same time. Defaults to the number of
+            CPUs. With 1, the jobs run in this process.
+        pdf_timeout (float, optional): Time limit for each pdflatex compilation,
+            in seconds.
+
+    Returns:
+        list[RenderResult]: The result of each job, in the order of the jobs.
+    """
+    jobs = list(jobs)
+    if pdf_timeout is not None:
+        jobs = [
+            job._replace(
+                profiler_options={**job.profiler_options, "pdf_timeout": pdf_timeout}
+            )
+            for job in jobs
+        ]
+    if processes == 1 or len(jobs) <= 1:
+        results = [_render_safely(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_render_safely, jobs))
+    for result in results:
+        if result.error is None:
+            LOGGER.info("Rendered %s with %s", result.output, result.job.backend)
+        else:
+            LOGGER.error(
+                "Failed to render %s with %s: %s",
+                result.job.target,
+                result.job.backend,
+                result.error,
+            )
+    return results
+
+
+def output_jobs(
+    backend: str,
+    formats: Sequence[str],
+    parser_options: dict,
+    profiler_options: dict,
+) -> list[RenderJob]:
+    """Create the jobs that render one profile in several formats.
+
+    Each format is rendered by `backend` if it supports the format, or else by the
+    first of matplotlib, TikZ and bokeh that does. TikZ writes `<output>.tex` for
+    both "tex" and "pdf", so when it renders both they are folded into one "pdf"
+    job, which writes the standalone `.tex` file once and then compiles it.
+
+    Args:
+        backend (str): The preferred backend: "bokeh", "mp" or "tikz".
+        formats (Sequence[str]): The output formats, e.g., ["png", "svg", "tex"].
+        parser_options (dict): The parser options of the profile.
+        profiler_options (dict): The profiler options of the profile.
+
+    Returns:
+        list[RenderJob]: One job per output file.
+
+    Raises:
+        NotImplementedError: If no backend supports a format.
+
+    Example:
+        >>> from perprof.render import output_jobs
+        >>> jobs = output_jobs("mp", ["png", "tex", "html"], {}, {"output": "pp"})
+        >>> [(job.backend, job.profiler_options["output_format"]) for job in jobs]
+        [('mp', 'png'), ('tikz', 'tex'), ('bokeh', 'html')]
+        >>> jobs = output_jobs("tikz", ["tex", "pdf"], {}, {"output": "pp"})
+        >>> [(job.backend, job.target) for job in jobs]
+        [('tikz', 'pp.pdf')]
+    """
+    candidates = [backend] + [b for b in ["mp", "tikz", "bokeh"] if b != backend]
+    backends = {}
+    for fmt in formats:
+        supporting = [b for b in candidates if fmt in BACKEND_FORMATS[b]]
+        if not supporting:
+            raise NotImplementedError(f"Output format {fmt} is not supported")
+        backends[fmt] = supporting[0]
+    tikz_formats = [fmt for fmt in backends if backends[fmt] == "tikz"]
+    jobs = []
+    for fmt, fmt_backend in backends.items():
+        options = {**profiler_options, "output_format": fmt}
+        if len(tikz_formats) > 1 and fmt_backend == "tikz":
+            if fmt != tikz_formats[0]:
+                continue
+            options.update(output_format="pdf", standalone=True)
+        jobs.append(RenderJob(fmt_backend, parser_options, options))
+    return jobs
+
+
+def render_outputs(
+    backend: str,
+    formats: Sequence[str],
+    parser_options: dict,
+    profiler_options: dict,
+    processes: int | None = None,
+    pdf_timeout: float | None = None,
+) -> list[RenderResult]:
+    """Render one profile in several formats in parallel.
+
+    The profile is computed once, saved to a temporary profile file, and each
+    job plots it with the "load_profile" option, so the input files are not
+    parsed again by every worker.
+
+    Args:
+        backend (str): The preferred backend, see `output_jobs`.
+        formats (Sequence[str]): The output formats.
+        parser_options (dict): The parser options.
+        profiler_options (dict): The profiler options.
+        processes (int, optional): See `render_all`.
+        pdf_timeout (float, optional): See `render_all`.
+
+    Returns:
+        list[RenderResult]: The result of each job of `output_jobs`, in the order
+            of `formats`.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if not profiler_options.get("load_profile"):
+            profile_file = os.path.join(tmpdir, "profile.npz")
+            Pdata(parser_options, profiler_options).save_profile(profile_file)
+            profiler_options = {**profiler_options, "load_profile": profile_file}
+        jobs = output_jobs(backend, formats, parser_options, profiler_options)
+        return render_all(jobs, processes=processes, pdf_timeout=pdf_timeout)
@@ -0,0 +1,211 @@
+"""Selection of the problems used in a performance profile."""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+class ProblemSelection:
+    """Select problems by exact name, by pattern, or by their attributes.
+
+    A problem is selected if it matches any of the names or patterns (or if no
+    names and patterns are given), and if it satisfies all the filters.
+    Filters are expressions evaluated over a table of problem attributes, such
+    as the number of variables, the constraint type, or the CUTEst
+    classification. Problems missing from the attribute table never satisfy a
+    filter.
+
+    Selections are evaluated as a vectorized mask over the unique problem names,
+    so the cost does not depend on the number of names in the selection.
+
+    Attributes:
+        names (set[str]):
+            Exact problem names.
+        patterns (list[str]):
+            Regular expressions that must match the whole problem name.
+        attributes (pandas.DataFrame):
+            Table of problem attributes indexed by the problem name.
+        filters (list[str]):
+            Expressions over the columns of `attributes`, evaluated with
+            `pandas.DataFrame.eval`.
+
+    Example:
+        >>> import pandas as pd
+        >>> from perprof.selection import ProblemSelection
+        >>>
+        >>> problems = pd.Index(["HS1", "HS2", "ROSENBR", "BROWNAL"])
+        >>> attributes = pd.DataFrame({
+        ...     "name": ["HS1", "HS2", "ROSENBR", "BROWNAL"],
+        ...     "nvar": [2, 2, 2, 200],
+        ... })
+        >>> selection = ProblemSelection(names=["BROWNAL"], globs=["HS*"])
+        >>> selection.mask(problems)
+        array([ True,  True, False,  True])
+        >>> selection = ProblemSelection(attributes=attributes, filters=["nvar > 10"])
+        >>> "BROWNAL" in selection, "HS1" in selection
+        (True, False)
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] | None = None,
+        patterns: Iterable[str] | None = None,
+        globs: Iterable[str] | None = None,
+        attributes: pd.DataFrame | None = None,
+        filters: Iterable[str] | None = None,
+    ) -> None:
+        """Initialize the selection.
+
+        Args:
+            names (Iterable[str], optional):
+                Exact problem names.
+            patterns (Iterable[str], optional):
+                Regular expressions that must match the whole problem name.
+            globs (Iterable[str], optional):
+                Shell-style patterns, e.g., `HS*`, converted to regular expressions.
+            attributes (pandas.DataFrame, optional):
+                Table of problem attributes with a "name" column.
+            filters (Iterable[str], optional):
+                Expressions over the columns of `attributes`, e.g., `nvar <= 100`.
+
+        Raises:
+            ValueError: If filters are given without attributes, or if the
+                attributes have no "name" column.
+        """
+        self.names = set(names or [])
+        self.patterns = list(patterns or [])
+        self.patterns += [fnmatch.translate(glob) for glob in globs or []]
+        self.filters = list(filters or [])
+        self.attributes = None
+        if attributes is not None:
+            if "name" not in attributes.columns:
+                raise ValueError("Missing column name in the problem attributes")
+            self.attributes = attributes.set_index("name")
+        if self.filters and self.attributes is None:
+            raise ValueError("Filters need a table of problem attributes")
+
+        self._regex = None
+        if self.patterns:
+            self._regex = re.compile("|".join(f"(?:{p})" for p in self.patterns))
+        self._filtered: set[str] | None = None
+
+    @classmethod
+    def from_file(
+        cls,
+        filename: Union[str, Path],
+        attributes: pd.DataFrame | None = None,
+        filters: Iterable[str] | None = None,
+    ) -> ProblemSelection:
+        """Read a selection from a subset file.
+
+        Each line of the file holds one entry. Lines starting with `re:` are
+        regular expressions, lines starting with `glob:` are shell-style patterns,
+        empty lines are ignored, and any other line is an exact problem name, as in
+        the legacy subset files (so `FOO[1]` and `#FOO` are names).
+
+        Args:
+            filename (Union[str, Path]): Path to the subset file.
+            attributes (pandas.DataFrame, optional): See `ProblemSelection`.
+            filters (Iterable[str], optional): See `ProblemSelection`.
+
+        Returns:
+            ProblemSelection: The selection described by the file.
+        """
+        names, patterns, globs = [], [], []
+        with open(filename, encoding="utf-8") as file_:
+            for line in file_:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("re:"):
+                    patterns.append(line[3:])
+                elif line.startswith("glob:"):
+                    globs.append(line[5:])
+                else:
+                    names.append(line)
+        return cls(names, patterns, globs, attributes, filters)
+
+    def is_empty(self) -> bool:
+        """Return whether the selection has no criteria at all."""
+        return not (self.names or self.patterns or self.filters)
+
+    def names_only(self) -> bool:
+        """Return whether the selection is given by exact names only."""
+        return bool(self.names) and not (self.patterns or self.filters)
+
+    def mask(self, problems: Iterable[str]) -> np.ndarray:
+        """Compute which of the problems are selected.
+
+        Args:
+            problems (Iterable[str]): Problem names, ideally unique.
+
+        Returns:
+            numpy.ndarray: Boolean array with one entry per problem.
+        """
+        problems = pd.Index(problems, dtype=object)
+        if self.names or self.patterns:
+            selected = problems.isin(self.names)
+            if self._regex is not None:
+                selected |= np.asarray(
+                    [self._regex.fullmatch(name) is not None for name in problems],
+                    dtype=bool,
+                )
+        else:
+            selected = np.ones(len(problems), dtype=bool)
+        if self.filters:
+            selected &= problems.isin(self._filtered_names())
+        return selected
+
+    def _filtered_names(self) -> set[str]:
+        """Return the names in the attribute table that satisfy all the filters."""
+        if self._filtered is None:
+            keep = np.ones(len(self.attributes), dtype=bool)
+            for expr in self.filters:
+                keep &= np.asarray(self.attributes.eval(expr), dtype=bool)
+            self._filtered = set(self.attributes.index[keep])
+        return self._filtered
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether the problem `name` is selected."""
+        if self.filters and name not in self._filtered_names():
+            return False
+        if not (self.names or self.patterns) or name in self.names:
+            return True
+        return self._regex is not None and self._regex.fullmatch(name) is not None
+
+
+def as_selection(
+    subset: ProblemSelection | Iterable[str] | None,
+) -> ProblemSelection | None:
+    """Convert a subset specification into a ProblemSelection.
+
+    Args:
+        subset (ProblemSelection | Iterable[str] | None):
+            A selection, an iterable of exact problem names, or None.
+
+    Returns:
+        ProblemSelection | None: None if `subset` is None or empty, `subset` itself
+            if it is already a selection, and a selection by names otherwise.
+
+    Example:
+        >>> from perprof.selection import as_selection
+        >>> as_selection([]) is None
+        True
+        >>> sorted(as_selection(["p1", "p2"]).names)
+        ['p1', 'p2']
+    """
+    if isinstance(subset, ProblemSelection):
+        return subset
+    if subset is None:
+        return None
+    subset = list(subset)
+    if not subset:
+        return None
+    return ProblemSelection(names=subset)
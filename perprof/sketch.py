@@ -0,0 +1,364 @@
+"""Approximate performance profiles from mergeable quantile sketches.
+
+A `QuantileSketch` summarizes a stream of values in a bounded number of items,
+in the style of the KLL and MRL sketches: items are kept in levels, and the
+items of level h stand for 2**h values each. When a level is full, it is sorted
+and every other item is promoted to the next level. Each such compaction moves
+the estimated rank of any value by at most 2**h, and the sketch only compacts
+while the accumulated error stays within `rank_error * n`. Hence, for every x,
+
+    |estimated rank(x) - rank(x)| <= rank_error * n,
+
+deterministically, where n is the number of values, and this also holds after
+merging sketches. The capacity of the levels grows with the logarithm of n, so
+the memory is O(log(n)**2 / rank_error), independent of n for practical purposes.
+
+A `SketchProfile` keeps one sketch per solver over its finite ratios, plus the
+exact number of problems, and computes the profile from the sketches.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from .profile_data import ProfileData, evaluation_grid
+
+SKETCH_FORMAT = "perprof-sketch-profile"
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a deterministic rank error guarantee.
+
+    Attributes:
+        rank_error (float):
+            Guaranteed bound on the rank error, relative to the number of values.
+        n (int):
+            Number of values summarized.
+        levels (list[numpy.ndarray]):
+            Items of each level. Items of level h have weight 2**h.
+        error_weight (int):
+            Accumulated bound on the absolute rank error.
+
+    Example:
+        >>> import numpy as np
+        >>> from perprof.sketch import QuantileSketch
+        >>>
+        >>> values = np.random.default_rng(0).uniform(size=100_000)
+        >>> sketch = QuantileSketch(rank_error=0.01)
+        >>> sketch.update(values)
+        >>> sketch.size() < 10_000
+        True
+        >>> exact = np.searchsorted(np.sort(values), [0.25, 0.5], side="right")
+        >>> bool(np.all(np.abs(sketch.rank([0.25, 0.5]) - exact) <= 0.01 * 100_000))
+        True
+    """
+
+    def __init__(self, rank_error: float = 0.01) -> None:
+        """Initialize an empty sketch.
+
+        Args:
+            rank_error (float): Bound on the rank error relative to the number of
+                values, in (0, 1).
+
+        Raises:
+            ValueError: If `rank_error` is not in (0, 1).
+        """
+        if not 0 < rank_error < 1:
+            raise ValueError("The rank error must be in (0, 1)")
+        self.rank_error = rank_error
+        self.n = 0
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self.error_weight = 0
+
+    def _capacity(self) -> int:
+        """Return the capacity of each level, which grows with the number of levels."""
+        return 2 * math.ceil((len(self.levels) + 1) / self.rank_error / 2) + 2
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add values to the sketch.
+
+        Args:
+            values (Iterable[float]): The values. NaN values are ignored.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self) -> None:
+        """Compact the full levels, while the error budget allows."""
+        h = 0
+        while h < len(self.levels):
+            capacity = self._capacity()
+            level = self.levels[h]
+            weight = 2**h
+            if len(level) > capacity and (
+                self.error_weight + weight <= self.rank_error * self.n
+            ):
+                level = np.sort(level)
+                even = len(level) - len(level) % 2
+                # Alternate the kept items to avoid a systematic bias
+                offset = (self.error_weight // weight) % 2
+                promoted = level[offset:even:2]
+                self.levels[h] = level[even:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.error_weight += weight
+            h += 1
+
+    def merge(self, *others: QuantileSketch) -> QuantileSketch:
+        """Merge sketches into a new sketch.
+
+        Args:
+            *others (QuantileSketch): Sketches with the same rank error.
+
+        Returns:
+            QuantileSketch: A sketch of all the values.
+
+        Raises:
+            ValueError: If the rank errors differ.
+        """
+        merged = QuantileSketch(self.rank_error)
+        merged.n = self.n
+        merged.error_weight = self.error_weight
+        merged.levels = list(self.levels)
+        for other in others:
+            if other.rank_error != self.rank_error:
+                raise ValueError("Sketches must have the same rank error")
+            merged.n += other.n
+            merged.error_weight += other.error_weight
+            for h, level in enumerate(other.levels):
+                if h == len(merged.levels):
+                    merged.levels.append(np.empty(0))
+                merged.levels[h] = np.concatenate([merged.levels[h], level])
+        merged._compress()
+        return merged
+
+    def size(self) -> int:
+        """Return the number of items stored."""
+        return sum(len(level) for level in self.levels)
+
+    def items(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the sorted items and the cumulative weights up to each of them."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(len(level), 2**h, dtype=np.int64)
+                for h, level in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def rank(self, points: Iterable[float]) -> np.ndarray:
+        """Estimate the number of values <= each point.
+
+        Args:
+            points (Iterable[float]): The points.
+
+        Returns:
+            numpy.ndarray: The estimated ranks, within `rank_error * n` of the
+                exact ones.
+        """
+        items, cumulative = self.items()
+        cumulative = np.concatenate([[0], cumulative])
+        return cumulative[np.searchsorted(items, points, side="right")]
+
+    def quantile(self, fractions: Iterable[float]) -> np.ndarray:
+        """Estimate the smallest values whose rank reaches each fraction of n.
+
+        Args:
+            fractions (Iterable[float]): Fractions in [0, 1].
+
+        Returns:
+            numpy.ndarray: The estimated quantiles (inf if not reached).
+        """
+        items, cumulative = self.items()
+        targets = np.asarray(fractions, dtype=float) * self.n
+        idx = np.searchsorted(cumulative, targets, side="left")
+        return np.where(
+            idx < len(items), items[np.minimum(idx, len(items) - 1)], np.inf
+        )
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable representation of the sketch."""
+        return {
+            "rank_error": self.rank_error,
+            "n": self.n,
+            "error_weight": self.error_weight,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, content: dict) -> QuantileSketch:
+        """Create a sketch from the output of `to_dict`."""
+        sketch = cls(content["rank_error"])
+        sketch.n = int(content["n"])
+        sketch.error_weight = int(content["error_weight"])
+        sketch.levels = [np.asarray(level, dtype=float) for level in content["levels"]]
+        return sketch
+
+
+class SketchProfile:
+    """Approximate performance profile from one quantile sketch per solver.
+
+    The sketches summarize the finite ratios of each solver, and the number of
+    problems is exact, so the robustness (fraction of problems solved) is exact,
+    and the cumulative distribution at any ratio is within `rank_error` of the
+    exact one.
+
+    Attributes:
+        algnames (list[str]): Names of the solvers.
+        n_problems (int): Number of problems.
+        sketches (list[QuantileSketch]): Sketch of the finite ratios of each solver.
+    """
+
+    def __init__(
+        self,
+        algnames: Sequence[str],
+        rank_error: float = 0.01,
+        n_problems: int = 0,
+        sketches: Sequence[QuantileSketch] | None = None,
+    ) -> None:
+        """Initialize the profile.
+
+        Args:
+            algnames (Sequence[str]): Names of the solvers.
+            rank_error (float): Rank error of new sketches.
+            n_problems (int): Number of problems already summarized.
+            sketches (Sequence[QuantileSketch], optional): Sketches of each solver.
+                Defaults to empty sketches.
+        """
+        self.algnames = list(algnames)
+        self.n_problems = n_problems
+        if sketches is None:
+            sketches = [QuantileSketch(rank_error) for _ in self.algnames]
+        self.sketches = list(sketches)
+
+    @property
+    def rank_error(self) -> float:
+        """Guaranteed bound on the error of the cumulative distribution."""
+        return self.sketches[0].rank_error
+
+    def update(self, ratio: np.ndarray) -> None:
+        """Add the ratios of more problems.
+
+        Args:
+            ratio (numpy.ndarray): Ratio matrix of shape (n_problems, n_solvers).
+        """
+        self.n_problems += ratio.shape[0]
+        for j, sketch in enumerate(self.sketches):
+            column = ratio[:, j]
+            sketch.update(column[column < float("inf")])
+
+    def merge(self, *others: SketchProfile) -> SketchProfile:
+        """Merge with profiles of disjoint sets of problems.
+
+        Raises:
+            ValueError: If the solvers or the rank errors do not match.
+        """
+        sketches = [[sketch] for sketch in self.sketches]
+        n_problems = self.n_problems
+        for other in others:
+            if sorted(other.algnames) != sorted(self.algnames):
+                raise ValueError("Sketch profiles must have the same solvers")
+            n_problems += other.n_problems
+            for j, algname in enumerate(self.algnames):
+                sketches[j].append(other.sketches[other.algnames.index(algname)])
+        return SketchProfile(
+            self.algnames,
+            n_problems=n_problems,
+            sketches=[s[0].merge(*s[1:]) for s in sketches],
+        )
+
+    def evaluate(self, tau: Iterable[float]) -> np.ndarray:
+        """Estimate the fraction of problems solved within each ratio.
+
+        Args:
+            tau (Iterable[float]): Ratios.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(tau), n_solvers).
+        """
+        tau = np.asarray(tau, dtype=float)
+        counts = np.stack([sketch.rank(tau) for sketch in self.sketches], axis=1)
+        return counts / self.n_problems
+
+    def robustness(self) -> np.ndarray:
+        """Return the exact fraction of problems solved by each solver."""
+        return np.array([sketch.n for sketch in self.sketches]) / self.n_problems
+
+    def efficiency(self) -> np.ndarray:
+        """Estimate the fraction of problems where each solver is the fastest."""
+        return self.evaluate([1.0])[0]
+
+    def to_profile(
+        self,
+        grid: int | Iterable[float] | None = None,
+        grid_scale: str = "log",
+        tau: float | None = None,
+    ) -> ProfileData:
+        """Compute the approximate profile.
+
+        Args:
+            grid (int | Iterable[float], optional): See `ProfileData`. Defaults to
+                the items of the sketches, whose number is bounded.
+            grid_scale (str): See `ProfileData`.
+            tau (float, optional): See `ProfileData`.
+
+        Returns:
+            ProfileData: The profile, without solver data, ratio matrix or
+                problem names.
+        """
+        items = np.concatenate([sketch.items()[0] for sketch in self.sketches])
+        if grid is None:
+            breakpoints = np.unique(items)
+        elif isinstance(grid, (int, np.integer)):
+            max_ratio = items.max() if items.size > 0 else 1.0
+            breakpoints = evaluation_grid(max_ratio, grid, grid_scale, tau)
+        else:
+            breakpoints = np.sort(np.asarray(grid, dtype=float))
+        if tau is not None:
+            breakpoints = breakpoints[breakpoints <= tau]
+        return ProfileData._from_computed(  # pylint: disable=protected-access
+            self.algnames,
+            breakpoints,
+            self.evaluate(breakpoints),
+            n_problems=self.n_problems,
+        )
+
+    def save(self, filename: Union[str, Path]) -> None:
+        """Save the sketch profile to a JSON file."""
+        content = {
+            "format": SKETCH_FORMAT,
+            "algnames": self.algnames,
+            "n_problems": self.n_problems,
+            "sketches": [sketch.to_dict() for sketch in self.sketches],
+        }
+        with open(filename, "w", encoding="utf-8") as file_:
+            json.dump(content, file_)
+
+    @classmethod
+    def load(cls, filename: Union[str, Path]) -> SketchProfile:
+        """Load a sketch profile saved with `save`.
+
+        Raises:
+            ValueError: If the file is not a sketch profile.
+        """
+        with open(filename, encoding="utf-8") as file_:
+            content = json.load(file_)
+        if content.get("format") != SKETCH_FORMAT:
+            raise ValueError(f"{filename} is not a perprof sketch profile")
+        return cls(
+            content["algnames"],
+            n_problems=content["n_problems"],
+            sketches=[QuantileSketch.from_dict(s) for s in content["sketches"]],
+        )
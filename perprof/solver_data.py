@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+from collections.abc import Iterable, Iterator
 from io import StringIO
 from pathlib import Path
 from typing import TypedDict, Union
@@ -9,7 +11,14 @@ from typing import TypedDict, Union
 import numpy as np
 import pandas as pd
 
-from .parse import _parse_yaml
+from .parse import METADATA_OPTIONS, _parse_yaml
+
+# pylint: disable=import-outside-toplevel
+
+# File extensions read and written with pyarrow, and their pyarrow.dataset format
+ARROW_FORMATS = {".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+REQUIRED_COLUMNS = ["name", "exit", "time"]
+OPTIONAL_COLUMNS = ["fval", "primal", "dual"]
 
 
 class _ParseOptions(TypedDict):
@@ -24,6 +33,10 @@ class _ParseOptions(TypedDict):
     col_fval: int
     col_primal: int
     col_dual: int
+    columns: str | list[str] | None
+    version: str | None
+    machine: str | None
+    date: str | None
 
 
 class SolverData:
@@ -46,6 +59,10 @@ class SolverData:
         success (list[str]):
             List of exit flag values considered successful termination.
             Default: ["c", "converged", "solved", "success"]
+        metadata (dict[str, str]):
+            Description of the run, e.g., the "version" of the solver, the
+            "machine" and the "date", as given in the YAML header of a table file.
+            Empty by default.
 
     Example:
         >>> import pandas as pd
@@ -71,26 +88,36 @@ class SolverData:
 
     def __init__(
         self,
-        algname: str,
+        algname: str | None,
         data: Union[str, Path, pd.DataFrame],
         success: list[str] | None = None,
         read_csv_args: dict | None = None,
+        metadata: dict | None = None,
     ) -> None:
         """Initialize SolverData from file or DataFrame.
 
         Args:
             algname (str):
-                Name of the algorithm/solver for identification.
+                Name of the algorithm/solver for identification. May be None for
+                a Parquet or Arrow/Feather file, to use the stored name.
             data (Union[str, Path, pd.DataFrame]):
                 Source of performance data. Can be:
                 - File path (str/Path) to CSV file with solver results
+                - File path (str/Path) to Parquet (.parquet) or Arrow/Feather
+                  (.feather, .arrow) file with solver results (requires pyarrow).
+                  All its columns are read, and the algorithm name, success
+                  flags and run metadata stored by `write_arrow` are used
+                  unless given.
                 - Pre-loaded pandas DataFrame with required columns
             success (list[str], optional):
                 Exit flag values considered successful termination.
                 If None, defaults to ["c", "converged", "solved", "success"].
             read_csv_args (dict, optional):
-                Additional arguments passed to pandas.read_csv when loading files.
+                Additional arguments passed to pandas.read_csv when loading CSV files.
                 Useful for custom separators, encoding, etc.
+            metadata (dict, optional):
+                Description of the run. Values are converted to strings, and
+                None values are dropped.
 
         Raises:
             TypeError: If data is not a supported type (str, Path, or DataFrame).
@@ -114,10 +141,21 @@ class SolverData:
             >>> solver2.success
             ['optimal', 'feasible']
         """
+        if isinstance(data, (str, Path)) and Path(data).suffix in ARROW_FORMATS:
+            stored = read_arrow(data, columns=_arrow_columns(data))
+            algname = algname or stored.algname
+            success = success or stored.success
+            metadata = stored.metadata if metadata is None else metadata
+            data = stored.data
         self.algname = algname
         if not success:
             success = ["c", "converged", "solved", "success"]
         self.success = success
+        self.metadata = {
+            key: str(value)
+            for key, value in (metadata or {}).items()
+            if value is not None
+        }
         if isinstance(data, (str, Path)):
             if not read_csv_args:
                 read_csv_args = {}
@@ -128,13 +166,173 @@ class SolverData:
             raise TypeError("Unexpected type for data input")
 
         # Make sure that a columns name, time and exit exist
-        for col in ["name", "exit", "time"]:
+        for col in REQUIRED_COLUMNS:
             if col not in self.data.columns:
                 raise ValueError(f"Missing column {col}")
-        for col in ["fval", "primal", "dual"]:
+        for col in OPTIONAL_COLUMNS:
             if col not in self.data:
                 self.data[col] = np.nan
 
+    def write_arrow(self, filename: Union[str, Path]) -> None:
+        """Write the solver data to a Parquet or Arrow/Feather file.
+
+        The format is chosen by the extension of `filename` (.parquet, .feather or
+        .arrow). The algorithm name and success flags are stored in the file
+        metadata, as well as the run metadata, so `read_arrow` recovers the same
+        SolverData.
+
+        Args:
+            filename (Union[str, Path]): Path of the output file.
+
+        Raises:
+            ValueError: If the extension of `filename` is not supported.
+            ImportError: If pyarrow is not installed.
+
+        Example:
+            >>> # Not run, since pyarrow is an optional dependency:
+            >>> # solver.write_arrow("results/newton.parquet")
+            >>> # read_arrow("results/newton.parquet").algname
+            >>> # 'Newton'
+            >>> pass
+        """
+        file_format = _arrow_format(filename)
+        pa = _import_pyarrow()
+        table = pa.Table.from_pandas(self.data, preserve_index=False)
+        perprof_metadata = {
+            "algname": self.algname,
+            "success": self.success,
+            "metadata": self.metadata,
+        }
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                b"perprof": json.dumps(perprof_metadata).encode(),
+            }
+        )
+        if file_format == "parquet":
+            import pyarrow.parquet
+
+            pyarrow.parquet.write_table(table, filename)
+        else:
+            import pyarrow.feather
+
+            pyarrow.feather.write_feather(table, filename)
+
+
+def _import_pyarrow():
+    """Import pyarrow, with a helpful message if it is missing."""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet and Arrow files require pyarrow. "
+            "Install it with `pip install perprof-py[arrow]`"
+        ) from exc
+    return pyarrow
+
+
+def _arrow_format(filename: Union[str, Path]) -> str:
+    """Return the pyarrow.dataset format associated with the extension of filename."""
+    suffix = Path(filename).suffix
+    if suffix not in ARROW_FORMATS:
+        raise ValueError(f"Unsupported extension for Parquet/Arrow file: {suffix}")
+    return ARROW_FORMATS[suffix]
+
+
+def _arrow_columns(filename: Union[str, Path]) -> list[str]:
+    """Return the names of the columns of a Parquet or Arrow/Feather file."""
+    file_format = _arrow_format(filename)
+    _import_pyarrow()
+    import pyarrow.dataset
+
+    return pyarrow.dataset.dataset(filename, format=file_format).schema.names
+
+
+def _read_arrow(
+    filename: Union[str, Path],
+    columns: Iterable[str] | None = None,
+    names: Iterable[str] | None = None,
+) -> tuple[pd.DataFrame, dict]:
+    """Read the columns of a Parquet or Arrow/Feather file into a DataFrame.
+
+    Args:
+        filename (Union[str, Path]): Path of the file.
+        columns (Iterable[str], optional):
+            Columns to read. Columns that are not in the file are skipped.
+            Defaults to the required and optional columns of SolverData.
+        names (Iterable[str], optional):
+            If given, only the rows of these problems are read. The filter is
+            pushed down to the reader.
+
+    Returns:
+        tuple[pandas.DataFrame, dict]: The data and the perprof metadata of the
+            file (empty if the file was not written by perprof).
+    """
+    file_format = _arrow_format(filename)
+    _import_pyarrow()
+    import pyarrow.dataset
+
+    dataset = pyarrow.dataset.dataset(filename, format=file_format)
+    if columns is None:
+        columns = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+    columns = [col for col in columns if col in dataset.schema.names]
+    row_filter = None
+    if names is not None:
+        row_filter = pyarrow.dataset.field("name").isin(list(names))
+    table = dataset.to_table(columns=columns, filter=row_filter)
+
+    metadata = dataset.schema.metadata or {}
+    perprof_metadata = json.loads(metadata.get(b"perprof", b"{}"))
+    return table.to_pandas(), perprof_metadata
+
+
+def read_arrow(
+    filename: Union[str, Path],
+    algname: str | None = None,
+    columns: Iterable[str] | None = None,
+    subset: Iterable[str] | None = None,
+) -> SolverData:
+    """Read solver data from a Parquet or Arrow/Feather file.
+
+    Only the requested columns are read from the file (column projection), and a
+    subset of problem names is applied while reading (predicate pushdown), so
+    wide result files are cheap to load.
+
+    Args:
+        filename (Union[str, Path]):
+            Path of the file, with extension .parquet, .feather or .arrow.
+        algname (str, optional):
+            Name of the algorithm. Defaults to the name stored by
+            `SolverData.write_arrow`, or to the stem of the file name.
+        columns (Iterable[str], optional):
+            Columns to read, besides "name", "exit" and "time". Defaults to all of
+            "fval", "primal" and "dual" that are present in the file.
+        subset (Iterable[str], optional):
+            If given, only the rows of these problems are read.
+
+    Returns:
+        SolverData: The solver data. The success flags and run metadata are the
+            ones stored by `SolverData.write_arrow`, or the default ones.
+
+    Raises:
+        ValueError: If the extension is not supported or required columns are missing.
+        ImportError: If pyarrow is not installed.
+
+    Example:
+        >>> # Not run, since pyarrow is an optional dependency:
+        >>> # solver = read_arrow("warehouse/newton.parquet", subset=["HS1", "HS2"])
+        >>> pass
+    """
+    if columns is not None:
+        columns = REQUIRED_COLUMNS + [c for c in columns if c not in REQUIRED_COLUMNS]
+    data, metadata = _read_arrow(filename, columns=columns, names=subset)
+    return SolverData(
+        algname or metadata.get("algname") or Path(filename).stem,
+        data,
+        success=metadata.get("success"),
+        metadata=metadata.get("metadata"),
+    )
+
 
 def read_table(filename: Union[str, Path]) -> SolverData:
     """Read solver data from YAML-formatted table file.
@@ -153,6 +351,9 @@ def read_table(filename: Union[str, Path]) -> SolverData:
         problem3 converged 2.45 0.01
         ```
 
+        The option `columns` (e.g. `columns: name exit time iter nfev`) names the
+        columns of the data, so that any numeric cost column can be profiled.
+
     Args:
         filename (Union[str, Path]):
             Path to the table file with YAML header and data rows.
@@ -172,6 +373,103 @@ def read_table(filename: Union[str, Path]) -> SolverData:
         >>> # problem2 failed 5.67 0.1
         >>> pass  # Placeholder since file operations can't be tested in doctest
     """
+    with open(filename, encoding="utf-8") as file_:
+        lines = file_.readlines()
+    options, data_header, start = _parse_table_header(lines)
+    data = pd.read_csv(
+        StringIO("".join([" ".join(data_header) + "\n"] + lines[start:])),
+        delim_whitespace=True,
+    )
+
+    return SolverData(
+        options["algname"] or "Unknown",
+        data,
+        success=options["success"].split(","),
+        metadata=_run_metadata(options),
+    )
+
+
+def read_table_chunks(
+    filename: Union[str, Path], chunk_size: int
+) -> Iterator[SolverData]:
+    """Read solver data from a YAML-formatted table file in chunks of rows.
+
+    Only one chunk is in memory at a time, so arbitrarily large files can be
+    processed. See `read_table` for the file format.
+
+    Args:
+        filename (Union[str, Path]):
+            Path to the table file with YAML header and data rows.
+        chunk_size (int):
+            Maximum number of rows of each chunk.
+
+    Yields:
+        SolverData: The solver data of consecutive rows of the file.
+    """
+    header = []
+    with open(filename, encoding="utf-8") as file_:
+        for line in file_:
+            header.append(line)
+            if line.strip() == "---" and len(header) > 1:
+                break
+    options, data_header, start = _parse_table_header(header)
+    chunks = pd.read_csv(
+        filename,
+        skiprows=start,
+        header=None,
+        names=data_header,
+        sep=r"\s+",
+        chunksize=chunk_size,
+    )
+    for chunk in chunks:
+        yield SolverData(
+            options["algname"] or "Unknown",
+            chunk,
+            success=options["success"].split(","),
+            metadata=_run_metadata(options),
+        )
+
+
+def table_columns(columns: str | list[str]) -> list[str]:
+    """Return the column names given by the `columns` option of a table file.
+
+    Args:
+        columns (str | list[str]): Column names, as a list or as a string
+            separated by spaces or commas.
+
+    Returns:
+        list[str]: The column names.
+
+    Raises:
+        ValueError: If "name", "exit" or "time" is missing.
+
+    Example:
+        >>> from perprof.solver_data import table_columns
+        >>> table_columns("name exit time iter, nfev")
+        ['name', 'exit', 'time', 'iter', 'nfev']
+    """
+    if isinstance(columns, str):
+        columns = columns.replace(",", " ").split()
+    columns = [str(col) for col in columns]
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            raise ValueError(f"Missing column {col} in the columns option")
+    return columns
+
+
+def _parse_table_header(lines: list[str]) -> tuple[_ParseOptions, list[str], int]:
+    """Parse the YAML header of a table file.
+
+    Args:
+        lines (list[str]): Lines of the file, at least up to the end of the header.
+
+    Returns:
+        tuple[_ParseOptions, list[str], int]: The options of the header, the column
+            names of the data, and the index of the first data line.
+
+    Raises:
+        ValueError: If the lines have no YAML header.
+    """
     options: _ParseOptions = {
         "algname": None,
         "success": "c,converged,solved,success",
@@ -182,22 +480,27 @@ def read_table(filename: Union[str, Path]) -> SolverData:
         "col_fval": 4,
         "col_primal": 5,
         "col_dual": 6,
+        "columns": None,
+        "version": None,
+        "machine": None,
+        "date": None,
     }
 
-    with open(filename, encoding="utf-8") as file_:
-        lines = file_.readlines()
-
-        in_yaml = False
-        for i, line in enumerate(lines):
-            if line.strip() == "---":
-                if in_yaml:
-                    yaml_header = lines[0:i]
-                    data_lines = lines[i + 1 :]
-                    break
-                in_yaml = True
+    in_yaml = False
+    yaml_header = None
+    for i, line in enumerate(lines):
+        if line.strip() == "---":
+            if in_yaml:
+                yaml_header = lines[0:i]
+                start = i + 1
+                break
+            in_yaml = True
+    if yaml_header is None:
+        raise ValueError("Missing YAML header in table file")
 
     _parse_yaml(options, "".join(yaml_header))
-    success_list = options["success"].split(",")
+    if options["columns"]:
+        return options, table_columns(options["columns"]), start
     data_header = ["name", "exit", "time", "fval", "primal", "dual"]
     header_order = [
         options["col_name"],
@@ -208,13 +511,9 @@ def read_table(filename: Union[str, Path]) -> SolverData:
         options["col_dual"],
     ]
     data_header = [data_header[i - 1] for i in header_order]
-    data = pd.read_csv(
-        StringIO("".join([" ".join(data_header) + "\n"] + data_lines)),
-        delim_whitespace=True,
-    )
+    return options, data_header, start
 
-    return SolverData(
-        options["algname"] or "Unknown",
-        data,
-        success=success_list,
-    )
+
+def _run_metadata(options: _ParseOptions) -> dict:
+    """Return the options of a table header that describe the run."""
+    return {key: options[key] for key in METADATA_OPTIONS}
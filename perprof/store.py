@@ -0,0 +1,385 @@
+"""Local SQLite store of solver results across runs.
+
+A `ResultsStore` keeps the results of many runs of the solvers in one SQLite
+file, with the run metadata of the YAML header of each table file (solver
+version, machine and date). Problem names are interned once in their own table,
+and the results are indexed by run and by problem, so comparing historical runs
+needs no text parsing.
+
+Profiles are built straight from queries: the join of the selected runs on the
+problems, the best time of each problem and the ratios are computed by SQLite,
+and only the finite ratios are read back to fill the ratio matrix.
+
+Only the columns "exit", "time", "fval", "primal" and "dual" are stored, and
+successful runs are found by the exit flag (the "exitflag" comparison of
+`ProfileData`) when the results are added.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .profile_data import ProfileData
+from .selection import ProblemSelection, as_selection
+from .solver_data import OPTIONAL_COLUMNS, SolverData, read_table
+
+LOGGER = logging.getLogger("perprof.store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    solver TEXT NOT NULL,
+    version TEXT,
+    machine TEXT,
+    date TEXT,
+    success TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS problems (
+    problem_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    problem_id INTEGER NOT NULL REFERENCES problems (problem_id),
+    exit TEXT,
+    time REAL,
+    fval REAL,
+    primal REAL,
+    dual REAL,
+    solved INTEGER NOT NULL,
+    PRIMARY KEY (run_id, problem_id)
+);
+CREATE INDEX IF NOT EXISTS results_problem
+    ON results (problem_id, run_id, solved, time);
+CREATE INDEX IF NOT EXISTS runs_solver ON runs (solver, run_id);
+CREATE TEMP TABLE IF NOT EXISTS staging (
+    name TEXT, exit TEXT, time REAL, fval REAL, primal REAL, dual REAL
+);
+CREATE TEMP TABLE IF NOT EXISTS selected_runs (
+    run_id INTEGER PRIMARY KEY, position INTEGER NOT NULL
+);
+CREATE TEMP TABLE IF NOT EXISTS selected_problems (
+    problem_id INTEGER PRIMARY KEY, row INTEGER NOT NULL
+);
+"""
+
+# The time of each successful run, and the best time of its problem, in SQL
+_RATIO_QUERY = """
+SELECT sp.row, s.position, x.time / MIN(x.time) OVER (PARTITION BY sp.row),
+       MIN(x.time) OVER (PARTITION BY sp.row)
+FROM results AS x
+JOIN temp.selected_runs AS s ON s.run_id = x.run_id
+JOIN temp.selected_problems AS sp ON sp.problem_id = x.problem_id
+WHERE x.solved
+"""
+
+
+class ResultsStore:
+    """SQLite store of the results of solver runs.
+
+    Attributes:
+        path (str): Path of the database file, or ":memory:".
+        connection (sqlite3.Connection): Connection to the database.
+
+    Example:
+        >>> import pandas as pd
+        >>> from perprof.solver_data import SolverData
+        >>> from perprof.store import ResultsStore
+        >>>
+        >>> data1 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "c"], "time": [1.0, 2.0]})
+        >>> data2 = pd.DataFrame({"name": ["p1", "p2"], "exit": ["c", "d"], "time": [2.0, 1.0]})
+        >>> store = ResultsStore()
+        >>> store.add(SolverData("A", data1, metadata={"version": "1.0"}))
+        1
+        >>> store.add(SolverData("B", data2))
+        2
+        >>> runs = store.runs()
+        >>> runs["version"].tolist(), runs["solved"].tolist()
+        (['1.0', None], [2, 1])
+        >>> store.profile(["A", "B"]).ratio
+        array([[ 1.,  2.],
+               [ 1., inf]])
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        """Open a store, creating its tables and indexes if needed.
+
+        Args:
+            path (Union[str, Path]): Path of the database file. Defaults to an
+                in-memory database.
+        """
+        self.path = str(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        self.connection.close()
+
+    def __enter__(self) -> ResultsStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, solver: SolverData, **metadata: str) -> int:
+        """Add the results of a run of a solver.
+
+        The rows are staged in a temporary table, and the problem names are
+        interned and the results inserted by SQLite.
+
+        Args:
+            solver (SolverData): The results of the run.
+            **metadata (str): Description of the run, e.g., `version`, `machine`
+                and `date`, overriding the ones of `solver.metadata`.
+
+        Returns:
+            int: The id of the new run.
+
+        Raises:
+            ValueError: If a problem is repeated in the results.
+        """
+        metadata = {**solver.metadata, **metadata}
+        data = solver.data
+        columns = ["exit", "time", *OPTIONAL_COLUMNS]
+        rows = zip(
+            data["name"].astype(str).tolist(),
+            data["exit"].astype(str).tolist(),
+            # NaN values are stored by SQLite as NULL
+            *[data[col].to_numpy(dtype=float).tolist() for col in columns[1:]],
+        )
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (solver, version, machine, date, success, metadata)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    solver.algname,
+                    metadata.get("version"),
+                    metadata.get("machine"),
+                    metadata.get("date"),
+                    json.dumps(solver.success),
+                    json.dumps(metadata),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self.connection.execute("DELETE FROM temp.staging")
+            self.connection.executemany(
+                "INSERT INTO temp.staging VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.execute(
+                "INSERT OR IGNORE INTO problems (name)"
+                " SELECT name FROM temp.staging ORDER BY rowid"
+            )
+            success = ", ".join("?" * len(solver.success))
+            try:
+                self.connection.execute(
+                    f"""
+                    INSERT INTO results
+                    SELECT ?, p.problem_id, s.exit, s.time, s.fval, s.primal, s.dual,
+                           s.exit IN ({success}) AND s.time IS NOT NULL
+                    FROM temp.staging AS s JOIN problems AS p ON p.name = s.name
+                    ORDER BY s.rowid
+                    """,
+                    (run_id, *solver.success),
+                )
+            except sqlite3.IntegrityError as exc:
+                raise ValueError(f"Repeated problem in {solver.algname}") from exc
+        LOGGER.debug(
+            "Added %d results of %s as run %d", len(data), solver.algname, run_id
+        )
+        return run_id
+
+    def add_table(self, filename: Union[str, Path], **metadata: str) -> int:
+        """Add the results of a table file, with the metadata of its YAML header.
+
+        See `solver_data.read_table` for the file format, and `add`.
+
+        Returns:
+            int: The id of the new run.
+        """
+        return self.add(read_table(filename), **metadata)
+
+    def runs(self, solver: str | None = None) -> pd.DataFrame:
+        """List the runs in the store.
+
+        Args:
+            solver (str, optional): If given, only the runs of this solver.
+
+        Returns:
+            pandas.DataFrame: One row per run, indexed by the run id, with the
+                solver name, "version", "machine" and "date", and the number of
+                "problems" and of "solved" problems.
+        """
+        where = "" if solver is None else "WHERE r.solver = ?"
+        return pd.read_sql_query(
+            f"""
+            SELECT r.run_id, r.solver, r.version, r.machine, r.date,
+                   COUNT(x.problem_id) AS problems,
+                   COALESCE(SUM(x.solved), 0) AS solved
+            FROM runs AS r LEFT JOIN results AS x ON x.run_id = r.run_id
+            {where}
+            GROUP BY r.run_id
+            ORDER BY r.run_id
+            """,
+            self.connection,
+            params=() if solver is None else (solver,),
+            index_col="run_id",
+        )
+
+    def latest_run(self, solver: str) -> int:
+        """Return the id of the run of a solver that was added last.
+
+        Raises:
+            KeyError: If the store has no run of the solver.
+        """
+        row = self.connection.execute(
+            "SELECT MAX(run_id) FROM runs WHERE solver = ?", (solver,)
+        ).fetchone()
+        if row[0] is None:
+            raise KeyError(solver)
+        return row[0]
+
+    def solver_data(self, run_id: int) -> SolverData:
+        """Read the results of a run back as solver data.
+
+        Args:
+            run_id (int): The id of the run.
+
+        Returns:
+            SolverData: The results, in the order in which they were added, with
+                the success flags and metadata of the run.
+
+        Raises:
+            KeyError: If there is no such run.
+        """
+        row = self.connection.execute(
+            "SELECT solver, success, metadata FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        data = pd.read_sql_query(
+            """
+            SELECT p.name, x.exit, x.time, x.fval, x.primal, x.dual
+            FROM results AS x JOIN problems AS p ON p.problem_id = x.problem_id
+            WHERE x.run_id = ?
+            ORDER BY x.rowid
+            """,
+            self.connection,
+            params=(run_id,),
+        ).astype({col: float for col in ["time", *OPTIONAL_COLUMNS]})
+        return SolverData(
+            row[0], data, success=json.loads(row[1]), metadata=json.loads(row[2])
+        )
+
+    def profile(
+        self,
+        runs: Iterable[int | str],
+        algnames: Iterable[str] | None = None,
+        subset: list[str] | ProblemSelection | None = None,
+        grid: int | Iterable[float] | None = None,
+        grid_scale: str = "log",
+        tau: float | None = None,
+        cumulative_dtype: str = "float64",
+    ) -> ProfileData:
+        """Compute the time profile of some runs with SQL queries.
+
+        The problems are the ones of any of the runs, in the order in which they
+        were first added to the store, and the problems missing from a run count
+        as failures, as in `ProfileData`. The best time of each problem and the
+        ratios are computed by SQLite.
+
+        Args:
+            runs (Iterable[int | str]): Ids of the runs, or names of solvers, for
+                their latest run.
+            algnames (Iterable[str], optional): Names of the runs in the profile.
+                Defaults to the solver names, followed by the run id for solvers
+                with more than one run in the profile.
+            subset (list[str] | ProblemSelection, optional): If given, only these
+                problems are in the profile.
+            grid (int | Iterable[float], optional): See `ProfileData`.
+            grid_scale (str): See `ProfileData`.
+            tau (float, optional): See `ProfileData`.
+            cumulative_dtype (str): See `ProfileData`.
+
+        Returns:
+            ProfileData: The profile, without solver data.
+
+        Raises:
+            ValueError: If there are fewer than two runs, or a run is repeated.
+            KeyError: If a run or a solver is not in the store.
+        """
+        run_ids = [
+            self.latest_run(run) if isinstance(run, str) else int(run) for run in runs
+        ]
+        if len(run_ids) <= 1:
+            raise ValueError("A Profile needs two solvers, at least")
+        if len(set(run_ids)) < len(run_ids):
+            raise ValueError("Repeated run in the profile")
+        solvers = []
+        for run_id in run_ids:
+            row = self.connection.execute(
+                "SELECT solver FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(run_id)
+            solvers.append(row[0])
+        if algnames is None:
+            algnames = [
+                f"{solver} #{run_id}" if solvers.count(solver) > 1 else solver
+                for solver, run_id in zip(solvers, run_ids)
+            ]
+
+        with self.connection:
+            self.connection.execute("DELETE FROM temp.selected_runs")
+            self.connection.executemany(
+                "INSERT INTO temp.selected_runs VALUES (?, ?)",
+                [(run_id, j) for j, run_id in enumerate(run_ids)],
+            )
+            problems = pd.read_sql_query(
+                """
+                SELECT DISTINCT x.problem_id, p.name
+                FROM results AS x
+                JOIN temp.selected_runs AS s ON s.run_id = x.run_id
+                JOIN problems AS p ON p.problem_id = x.problem_id
+                ORDER BY x.problem_id
+                """,
+                self.connection,
+            )
+            selection = as_selection(subset)
+            if selection is not None:
+                problems = problems[selection.mask(pd.Index(problems["name"]))]
+            self.connection.execute("DELETE FROM temp.selected_problems")
+            self.connection.executemany(
+                "INSERT INTO temp.selected_problems (row, problem_id) VALUES (?, ?)",
+                enumerate(problems["problem_id"].tolist()),
+            )
+            result = np.array(
+                self.connection.execute(_RATIO_QUERY).fetchall(), dtype=float
+            ).reshape(-1, 4)
+
+        ratio = np.full((len(problems), len(run_ids)), np.inf)
+        best_times = np.full(len(problems), np.inf)
+        rows = result[:, 0].astype(np.int64)
+        ratio[rows, result[:, 1].astype(np.int64)] = result[:, 2]
+        best_times[rows] = result[:, 3]
+        # Ratios of zero times are NULL in SQL, read as NaN
+        ratio[np.isnan(ratio)] = np.inf
+        return ProfileData._from_ratio(  # pylint: disable=protected-access
+            list(algnames),
+            pd.Index(problems["name"], dtype=object),
+            ratio,
+            best_times=best_times,
+            grid=grid,
+            grid_scale=grid_scale,
+            tau=tau,
+            cumulative_dtype=cumulative_dtype,
+        )
@@ -0,0 +1,309 @@
+"""Out-of-core computation of performance profiles.
+
+The functions in this module compute a performance profile on a fixed grid of
+ratios without holding the whole benchmark in memory. The problems are split
+into partitions by a hash of their names: the input files are streamed once in
+chunks of rows, and the rows of each partition are spilled to a temporary file.
+Each partition is then read back, aligned and profiled independently, since the
+best time of a problem only depends on its own row, and the number of problems
+solved at each grid point is accumulated over the partitions.
+
+Peak memory is bounded by the size of a partition (about `chunk_size` problems)
+and by the grid, not by the number of problems in the suite.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import pickle
+import tempfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .profile_data import ProfileData, evaluation_grid
+from .selection import ProblemSelection
+from .sketch import SketchProfile
+from .solver_data import (
+    ARROW_FORMATS,
+    REQUIRED_COLUMNS,
+    SolverData,
+    _import_pyarrow,
+    read_table_chunks,
+)
+
+LOGGER = logging.getLogger("perprof.streaming")
+
+Source = Union[str, Path, SolverData]
+
+
+def iter_chunks(
+    source: Source, chunk_size: int, columns: Iterable[str] | None = None
+) -> Iterator[SolverData]:
+    """Iterate over the rows of a solver source in chunks.
+
+    Args:
+        source (Union[str, Path, SolverData]):
+            A YAML table file, a CSV file (.csv), a Parquet or Arrow/Feather file,
+            or a SolverData.
+        chunk_size (int): Maximum number of rows of each chunk.
+        columns (Iterable[str], optional):
+            Columns to read from CSV, Parquet and Arrow/Feather files, besides
+            "name", "exit" and "time".
+
+    Yields:
+        SolverData: The solver data of consecutive rows of the source.
+    """
+    columns = REQUIRED_COLUMNS + [c for c in columns or [] if c not in REQUIRED_COLUMNS]
+    if isinstance(source, SolverData):
+        for start in range(0, len(source.data), chunk_size):
+            chunk = source.data.iloc[start : start + chunk_size]
+            yield SolverData(source.algname, chunk, success=source.success)
+    elif Path(source).suffix in ARROW_FORMATS:
+        yield from _iter_arrow_chunks(source, chunk_size, columns)
+    elif Path(source).suffix == ".csv":
+        for chunk in pd.read_csv(
+            source, chunksize=chunk_size, usecols=lambda col: col in columns
+        ):
+            yield SolverData(Path(source).stem, chunk)
+    else:
+        yield from read_table_chunks(source, chunk_size)
+
+
+def _iter_arrow_chunks(
+    filename: Union[str, Path], chunk_size: int, columns: list[str]
+) -> Iterator[SolverData]:
+    """Iterate over the rows of a Parquet or Arrow/Feather file in chunks."""
+    _import_pyarrow()
+    import pyarrow.dataset  # pylint: disable=import-outside-toplevel
+
+    dataset = pyarrow.dataset.dataset(
+        filename, format=ARROW_FORMATS[Path(filename).suffix]
+    )
+    metadata = json.loads((dataset.schema.metadata or {}).get(b"perprof", b"{}"))
+    columns = [col for col in columns if col in dataset.schema.names]
+    for batch in dataset.to_batches(columns=columns, batch_size=chunk_size):
+        yield SolverData(
+            metadata.get("algname") or Path(filename).stem,
+            batch.to_pandas(),
+            success=metadata.get("success"),
+        )
+
+
+def count_rows(source: Source) -> int:
+    """Count the rows of a solver source without loading it in memory.
+
+    For text files, this counts the non-empty lines, including the header, which
+    is an upper bound on the number of rows.
+
+    Args:
+        source (Union[str, Path, SolverData]): See `iter_chunks`.
+
+    Returns:
+        int: The number of rows.
+    """
+    if isinstance(source, SolverData):
+        return len(source.data)
+    if Path(source).suffix in ARROW_FORMATS:
+        _import_pyarrow()
+        import pyarrow.dataset  # pylint: disable=import-outside-toplevel
+
+        dataset = pyarrow.dataset.dataset(
+            source, format=ARROW_FORMATS[Path(source).suffix]
+        )
+        return dataset.count_rows()
+    with open(source, encoding="utf-8") as file_:
+        return sum(1 for line in file_ if line.strip())
+
+
+def _partition(names: pd.Series, n_partitions: int) -> np.ndarray:
+    """Return the partition of each problem name, using a stable hash."""
+    hashes = pd.util.hash_pandas_object(names, index=False).to_numpy()
+    return (hashes % np.uint64(n_partitions)).astype(np.int64)
+
+
+def _read_source(source: Source, chunk_size: int) -> SolverData:
+    """Read the required columns of a whole source, in chunks."""
+    algname, success, pieces = None, None, []
+    for chunk in iter_chunks(source, chunk_size):
+        algname, success = chunk.algname, chunk.success
+        pieces.append(chunk.data[REQUIRED_COLUMNS])
+    return SolverData(algname, _concat(pieces), success=success)
+
+
+def _spill(
+    sources: tuple[Source, ...], n_partitions: int, chunk_size: int, directory: Path
+) -> list[tuple[str | None, list[str] | None]]:
+    """Scatter the rows of the sources to one spill file per partition and source.
+
+    Each source is read once, in chunks, and the rows of each partition are
+    appended to `<directory>/<partition>-<source>.pkl` as pickled data frames.
+
+    Returns:
+        list[tuple]: The algname and success values of each source.
+    """
+    headers = []
+    for j, source in enumerate(sources):
+        algname, success = None, None
+        for chunk in iter_chunks(source, chunk_size):
+            algname, success = chunk.algname, chunk.success
+            parts = _partition(chunk.data["name"], n_partitions)
+            for part, data in chunk.data[REQUIRED_COLUMNS].groupby(parts):
+                with open(directory / f"{part}-{j}.pkl", "ab") as file_:
+                    pickle.dump(data, file_)
+        headers.append((algname, success))
+    return headers
+
+
+def _read_spill(filename: Path) -> pd.DataFrame:
+    """Read the data frames appended to a spill file, if it exists."""
+    pieces = []
+    if filename.exists():
+        with open(filename, "rb") as file_:
+            while True:
+                try:
+                    pieces.append(pickle.load(file_))
+                except EOFError:
+                    break
+    return _concat(pieces)
+
+
+def _concat(pieces: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate pieces of solver data, which may be none."""
+    if pieces:
+        return pd.concat(pieces, ignore_index=True)
+    return pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def streaming_profile(
+    *sources: Source,
+    grid: int | Iterable[float] = 200,
+    grid_scale: str = "log",
+    tau: float | None = None,
+    chunk_size: int = 1_000_000,
+    subset: list[str] | ProblemSelection | None = None,
+    ratio_dtype: str = "float64",
+    rank_error: float | None = None,
+) -> ProfileData:
+    """Compute a performance profile on a grid, processing problems in partitions.
+
+    The result is the same as `ProfileData(*sources, grid=..., tau=...)`, but the
+    sources are never fully loaded: each one is read once, in chunks of
+    `chunk_size` rows, and its rows are spilled to one temporary file per
+    partition, so only about `chunk_size` problems are aligned at a time. The
+    number of partitions is estimated with `count_rows` on the first source.
+
+    Args:
+        *sources (Union[str, Path, SolverData]):
+            Solver sources, see `iter_chunks`. At least 2 are required.
+        grid (int | Iterable[float]):
+            The evaluation grid, or its number of points. An automatic grid goes
+            from 1 to `tau`, so `tau` is required in this case, since the largest
+            ratio is only known at the end.
+        grid_scale (str): Spacing of the automatic grid: "log" or "linear".
+        tau (float, optional): Largest ratio of the grid. Points of an explicit
+            grid beyond `tau` are dropped, as in `ProfileData`.
+        chunk_size (int): Number of rows read at a time, and target number of
+            problems in each partition.
+        subset (list[str] | ProblemSelection, optional): See `ProfileData`.
+        ratio_dtype (str): See `ProfileData`.
+        rank_error (float, optional): If given, the ratios are accumulated in one
+            `sketch.QuantileSketch` per solver instead of on the grid, and the
+            cumulative distribution is within `rank_error` of the exact one. The
+            grid may then be None, to evaluate the profile at the items of the
+            sketches, and an automatic grid does not need `tau`.
+
+    Returns:
+        ProfileData: The profile, with `breakpoints` equal to the grid and the
+            cumulative distribution stored as counts (as fractions with
+            `rank_error`). It has no solver data, ratio matrix or problem names.
+
+    Raises:
+        ValueError: If fewer than 2 sources are given, or if `grid` is an integer
+            and both `tau` and `rank_error` are None.
+
+    Example:
+        >>> import pandas as pd
+        >>> from perprof.solver_data import SolverData
+        >>> from perprof.streaming import streaming_profile
+        >>>
+        >>> data1 = pd.DataFrame({"name": ["p1", "p2", "p3"], "exit": ["c", "c", "c"], "time": [1.0, 2.0, 4.0]})
+        >>> data2 = pd.DataFrame({"name": ["p3", "p2", "p1"], "exit": ["c", "c", "d"], "time": [1.0, 1.0, 1.0]})
+        >>> profile = streaming_profile(
+        ...     SolverData("A", data1), SolverData("B", data2),
+        ...     grid=[1.0, 2.0, 4.0], chunk_size=1,
+        ... )
+        >>> profile.solved_counts
+        array([[1, 2],
+               [2, 2],
+               [3, 2]], dtype=uint32)
+    """
+    if len(sources) <= 1:
+        raise ValueError("A Profile needs two solvers, at least")
+    if rank_error is not None:
+        # The grid is only applied to the sketches at the end
+        points = np.empty(0)
+    elif isinstance(grid, (int, np.integer)):
+        if tau is None:
+            raise ValueError("An automatic grid for streaming profiles needs tau")
+        points = evaluation_grid(tau, grid, grid_scale, tau)
+    else:
+        points = np.sort(np.asarray(grid, dtype=float))
+        if tau is not None:
+            points = points[points <= tau]
+
+    n_partitions = max(1, math.ceil(count_rows(sources[0]) / chunk_size))
+    LOGGER.info(
+        "Streaming profile with %d partitions of about %d problems",
+        n_partitions,
+        chunk_size,
+    )
+
+    algnames, sketch = None, None
+    counts = np.zeros((len(points), len(sources)), dtype=np.int64)
+    n_problems = 0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if n_partitions > 1:
+            headers = _spill(sources, n_partitions, chunk_size, Path(tmpdir))
+        for part in range(n_partitions):
+            if n_partitions > 1:
+                solvers = [
+                    SolverData(
+                        algname,
+                        _read_spill(Path(tmpdir) / f"{part}-{j}.pkl"),
+                        success=success,
+                    )
+                    for j, (algname, success) in enumerate(headers)
+                ]
+            else:
+                solvers = [_read_source(source, chunk_size) for source in sources]
+            profile = ProfileData(
+                *solvers,
+                subset=subset,
+                grid=points,
+                ratio_dtype=ratio_dtype,
+                cumulative_dtype="uint32",
+            )
+            algnames = profile.algnames
+            counts += profile.solved_counts
+            if rank_error is not None:
+                if sketch is None:
+                    sketch = SketchProfile(algnames, rank_error=rank_error)
+                sketch.update(profile.ratio)
+            n_problems += profile.n_problems
+            LOGGER.debug("Partition %d: %d problems", part, profile.n_problems)
+
+    if sketch is not None:
+        return sketch.to_profile(grid=grid, grid_scale=grid_scale, tau=tau)
+    return ProfileData._from_computed(  # pylint: disable=protected-access
+        algnames,
+        points,
+        counts.astype(np.uint32),
+        n_problems=n_problems,
+    )
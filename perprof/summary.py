@@ -0,0 +1,146 @@
+"""Summary metrics of performance profiles.
+
+All the metrics are computed for every solver in a few vectorized passes over
+the ratio matrix (and the matrix of times), so they are cheap even for hundreds
+of solvers:
+
+- `robustness`: fraction of problems solved;
+- `efficiency`: fraction of problems where the solver is the fastest;
+- `auc`: area under the profile from 1 to `tau`, divided by `tau - 1`, so that 1
+  means that every problem is solved with ratio 1;
+- `sgm_time`: shifted geometric mean of the times over the problems solved by
+  every solver;
+- `wins` and `ties`: number of problems where the solver is the only fastest,
+  and where it is the fastest together with other solvers;
+- `ratio_at_X`: smallest ratio at which the solver solves X% of the problems
+  (infinite if it never does).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_FORMATS = ["text", "csv", "tex"]
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def summary_metrics(
+    ratio: np.ndarray,
+    algnames: Sequence[str],
+    times: np.ndarray | None = None,
+    tau: float | None = None,
+    shift: float = 10.0,
+    levels: Sequence[float] = (0.5, 0.9),
+) -> pd.DataFrame:
+    """Compute the summary metrics of each solver.
+
+    Args:
+        ratio (numpy.ndarray): Ratio matrix of shape (n_problems, n_solvers), with
+            infinite values for the problems not solved.
+        algnames (Sequence[str]): Names of the solvers.
+        times (numpy.ndarray, optional): Times with the shape of `ratio`. Without
+            them, `sgm_time` is NaN.
+        tau (float, optional): Upper limit of the area under the profile. Defaults
+            to the largest finite ratio.
+        shift (float): Shift of the geometric mean of the times.
+        levels (Sequence[float]): Fractions of problems solved of the `ratio_at_X`
+            columns.
+
+    Returns:
+        pandas.DataFrame: One row per solver, indexed by the solver names.
+
+    Example:
+        >>> import numpy as np
+        >>> from perprof.summary import summary_metrics
+        >>> ratio = np.array([[1.0, 2.0], [1.0, 1.0], [np.inf, 1.0], [3.0, 1.0]])
+        >>> summary = summary_metrics(ratio, ["A", "B"], levels=[0.5])
+        >>> summary[["robustness", "efficiency", "wins", "ties"]].to_dict("list")
+        {'robustness': [0.75, 1.0], 'efficiency': [0.5, 0.75], 'wins': [1, 2], 'ties': [1, 1]}
+        >>> summary["ratio_at_50"].tolist()
+        [1.0, 1.0]
+        >>> summary["auc"].round(3).tolist()
+        [0.5, 0.875]
+    """
+    n_problems, n_solvers = ratio.shape
+    finite = ratio < float("inf")
+    columns = {
+        "robustness": finite.sum(axis=0) / n_problems,
+        "efficiency": (ratio <= 1).sum(axis=0) / n_problems,
+    }
+
+    if tau is None:
+        tau = ratio[finite].max() if finite.any() else 1.0
+    if tau > 1:
+        # Each problem solved with ratio r <= tau adds (tau - r) to the area
+        area = np.where(ratio <= tau, tau - ratio, 0.0).sum(axis=0)
+        columns["auc"] = area / (tau - 1) / n_problems
+    else:
+        columns["auc"] = columns["efficiency"]
+
+    if times is None:
+        columns["sgm_time"] = np.full(n_solvers, np.nan)
+    else:
+        solved_by_all = finite.all(axis=1)
+        if solved_by_all.any():
+            logs = np.log(times[solved_by_all] + shift)
+            columns["sgm_time"] = np.exp(logs.mean(axis=0)) - shift
+        else:
+            columns["sgm_time"] = np.full(n_solvers, np.nan)
+
+    fastest = ratio <= 1
+    n_fastest = fastest.sum(axis=1, keepdims=True)
+    columns["wins"] = (fastest & (n_fastest == 1)).sum(axis=0)
+    columns["ties"] = (fastest & (n_fastest > 1)).sum(axis=0)
+
+    sorted_ratio = np.sort(ratio, axis=0)
+    for level in levels:
+        index = max(int(np.ceil(level * n_problems)) - 1, 0)
+        columns[f"ratio_at_{100 * level:g}"] = (
+            sorted_ratio[index] if n_problems > 0 else np.full(n_solvers, np.inf)
+        )
+
+    return pd.DataFrame(columns, index=pd.Index(list(algnames), name="solver"))
+
+
+def format_summary(summary: pd.DataFrame, fmt: str = "text") -> str:
+    """Format a summary table.
+
+    Args:
+        summary (pandas.DataFrame): The output of `summary_metrics`.
+        fmt (str): "text" (aligned columns), "csv" or "tex" (LaTeX tabular).
+
+    Returns:
+        str: The formatted table.
+
+    Raises:
+        ValueError: If the format is not supported.
+
+    Example:
+        >>> import pandas as pd
+        >>> from perprof.summary import format_summary
+        >>> summary = pd.DataFrame({"wins": [2, 1]}, index=pd.Index(["A", "B"], name="solver"))
+        >>> print(format_summary(summary, "csv"))
+        solver,wins
+        A,2
+        B,1
+        <BLANKLINE>
+    """
+    if fmt == "text":
+        return summary.to_string(float_format=lambda x: f"{x:.4g}")
+    if fmt == "csv":
+        return summary.to_csv()
+    if fmt == "tex":
+        header = ["Solver"] + [col.replace("_", "\\_") for col in summary.columns]
+        lines = [
+            "\\begin{tabular}{|c|" + "r|" * len(summary.columns) + "} \\hline",
+            " & ".join(header) + " \\\\ \\hline",
+        ]
+        for solver, row in summary.iterrows():
+            values = [f"{x:.4g}" if isinstance(x, float) else str(x) for x in row]
+            lines.append(" & ".join([str(solver)] + values) + " \\\\ \\hline")
+        lines.append("\\end{tabular}")
+        return "\n".join(lines)
+    raise ValueError(f"Unexpected summary format: {fmt}")
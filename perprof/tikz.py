@@ -2,8 +2,10 @@
 
 import gettext
 import os.path
+import shutil
 import subprocess
 import sys
+import tempfile
 
 from . import prof
 
@@ -12,6 +14,78 @@ THIS_TRANSLATION = gettext.translation("perprof", os.path.join(THIS_DIR, "locale
 _ = THIS_TRANSLATION.gettext
 
 
+def compile_pdf(tex_file, verbose=False, timeout=None):
+    """Compile a LaTeX file to PDF with pdflatex, in the directory of the file.
+
+    Args:
+        tex_file (str): absolute path of the .tex file
+        verbose (bool): if True, pdflatex runs in nonstop mode, printing its output
+        timeout (float): if given, pdflatex is killed after this many seconds
+
+    Raises:
+        subprocess.CalledProcessError: If pdflatex fails.
+        subprocess.TimeoutExpired: If pdflatex does not finish in time.
+    """
+    if verbose:
+        mode = "nonstopmode"
+    else:
+        mode = "batchmode"
+    subprocess.run(
+        [
+            "pdflatex",
+            "-interaction",
+            mode,
+            "-output-directory",
+            os.path.dirname(tex_file),
+            tex_file,
+        ],
+        check=True,
+        timeout=timeout,
+    )
+
+
+def split_pdf(pdf_file, outputs):
+    """Split a PDF into one file per page.
+
+    Uses pypdf, if installed (`pip install perprof-py[pdf]`), or else the `qpdf`
+    or `pdfseparate` command line tools.
+
+    Args:
+        pdf_file (str): the PDF file
+        outputs (list[str]): the file of each page, in order
+
+    Raises:
+        RuntimeError: If neither pypdf, qpdf nor pdfseparate is available.
+    """
+    try:
+        import pypdf  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        pypdf = None
+
+    if pypdf is not None:
+        reader = pypdf.PdfReader(pdf_file)
+        for page, output in zip(reader.pages, outputs):
+            writer = pypdf.PdfWriter()
+            writer.add_page(page)
+            with open(output, "wb") as file_:
+                writer.write(file_)
+    elif shutil.which("qpdf"):
+        for k, output in enumerate(outputs, start=1):
+            subprocess.run(
+                ["qpdf", pdf_file, "--pages", ".", str(k), "--", output], check=True
+            )
+    elif shutil.which("pdfseparate"):
+        for k, output in enumerate(outputs, start=1):
+            subprocess.run(
+                ["pdfseparate", "-f", str(k), "-l", str(k), pdf_file, output],
+                check=True,
+            )
+    else:
+        raise RuntimeError(
+            _("ERROR: splitting the PDF requires pypdf, qpdf or pdfseparate")
+        )
+
+
 class Profiler(prof.Pdata):
     """Performance profile generator using TikZ/PGFPlots for LaTeX integration.
 
@@ -77,6 +151,7 @@ class Profiler(prof.Pdata):
                 - lang: Language for plot labels
                 - title/xlabel/ylabel: Plot text customization
                 - pgfplot_version: PGFPlots compatibility version
+                - pdf_timeout: Optional time limit for pdflatex, in seconds
                 - background/page_background: Color customization
 
         Note:
@@ -99,6 +174,7 @@ class Profiler(prof.Pdata):
             self.output = os.path.abspath(self.output)
         self.standalone = profiler_options["standalone"]
         self.output_format = profiler_options["output_format"]
+        self.pdf_timeout = profiler_options.get("pdf_timeout")
 
         # Language for the plot
         translation = gettext.translation(
@@ -108,40 +184,48 @@ class Profiler(prof.Pdata):
 
         prof.Pdata.__init__(self, parser_options, profiler_options)
 
-    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-    def plot(self):
-        r"""Generate and save the TikZ/PGFPlots performance profile.
+    def tex_preamble(self):
+        """Return the lines of the standalone document up to `\\begin{document}`.
 
-        Creates LaTeX code for performance profiles using TikZ and PGFPlots.
-        Output can be standalone LaTeX document or TikZ code for embedding.
+        The preamble depends only on the page options, so profiles with the same
+        options can share one document (see `compile_batch`).
 
-        Process:
-        1. Document structure (if standalone)
-        2. Color and line style definitions
-        3. PGFPlots axis environment with scaling and labels
-        4. Data plots using step functions
-        5. Legend and finalization
-        6. Optional PDF compilation
+        Returns:
+            list[str]: The lines of the preamble.
+        """
+        str2output = [
+            "\\documentclass{standalone}",
+            "\\usepackage[utf8]{inputenc}",
+            "\\usepackage[T1]{fontenc}",
+            "\\usepackage{tikz}",
+            "\\usepackage{pgfplots}",
+        ]
+        if self.pgfplot_version is not None:
+            str2output.append(f"\\pgfplotsset{{compat={self.pgfplot_version}}}")
+        else:
+            str2output.append(
+                "\\pgfplotsset{compat=newest,compat/show suggested version=false}"
+            )
+        if self.page_background:
+            str2output.append(
+                "\\definecolor{pagebg}{RGB}{"
+                + ",".join(str(x) for x in self.page_background)
+                + "}"
+            )
+            str2output.append("\\pagecolor{pagebg}")
+        str2output.append("\\begin{document}")
+        return str2output
 
-        Features:
-        - Step plots using PGFPlots \\addplot commands
-        - Logarithmic x-axis scaling (if semilog=True)
-        - Color and line style combinations
-        - Automatic PDF compilation for PDF output
-        - Background color support
+    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+    def tex_figure(self):
+        """Return the lines of the tikzpicture of the profile.
 
-        Validates solver count limits (13 for B&W, 30 for color).
+        Returns:
+            list[str]: The lines from `\\begin{tikzpicture}` to
+                `\\end{tikzpicture}`.
 
         Raises:
             ValueError: If too many solvers for the chosen style (B&W vs color).
-            subprocess-related exceptions: If PDF compilation fails.
-
-        Example:
-            ```python
-            # After creating profiler instance (see __init__ example)
-            profiler.plot()  # Creates .tex file and optionally compiles to PDF
-            ```
-
         """
         self.pre_plot()
 
@@ -160,31 +244,7 @@ class Profiler(prof.Pdata):
         except (AttributeError, TypeError):
             self.tau = maxt
 
-        str2output = []
-
-        if self.standalone or self.output_format == "pdf":
-            str2output.append("\\documentclass{standalone}")
-            str2output.append("\\usepackage[utf8]{inputenc}")
-            str2output.append("\\usepackage[T1]{fontenc}")
-            str2output.append("\\usepackage{tikz}")
-            str2output.append("\\usepackage{pgfplots}")
-            if self.pgfplot_version is not None:
-                str2output.append(f"\\pgfplotsset{{compat={self.pgfplot_version}}}")
-            else:
-                str2output.append(
-                    "\\pgfplotsset{compat=newest,compat/show suggested version=false}"
-                )
-            if self.page_background:
-                str2output.append(
-                    "\\definecolor{pagebg}{RGB}{"
-                    + ",".join(str(x) for x in self.page_background)
-                    + "}"
-                )
-                str2output.append("\\pagecolor{pagebg}")
-            str2output.append("\\begin{document}")
-        else:
-            str2output.append("\\begin{center}")
-        str2output.append("\\begin{tikzpicture}")
+        str2output = ["\\begin{tikzpicture}"]
 
         if self.semilog:
             str2output.append("  \\begin{semilogxaxis}[const plot,")
@@ -278,30 +338,119 @@ class Profiler(prof.Pdata):
         else:
             str2output.append("  \\end{axis}")
         str2output.append("\\end{tikzpicture}")
+        return str2output
+
+    def plot(self):
+        r"""Generate and save the TikZ/PGFPlots performance profile.
+
+        Creates LaTeX code for performance profiles using TikZ and PGFPlots.
+        Output can be standalone LaTeX document or TikZ code for embedding.
+
+        Process:
+        1. Document structure (if standalone)
+        2. Color and line style definitions
+        3. PGFPlots axis environment with scaling and labels
+        4. Data plots using step functions
+        5. Legend and finalization
+        6. Optional PDF compilation
+
+        Features:
+        - Step plots using PGFPlots \\addplot commands
+        - Logarithmic x-axis scaling (if semilog=True)
+        - Color and line style combinations
+        - Automatic PDF compilation for PDF output
+        - Background color support
+
+        Validates solver count limits (13 for B&W, 30 for color).
+
+        Raises:
+            ValueError: If too many solvers for the chosen style (B&W vs color).
+            subprocess-related exceptions: If PDF compilation fails.
+
+        Example:
+            ```python
+            # After creating profiler instance (see __init__ example)
+            profiler.plot()  # Creates .tex file and optionally compiles to PDF
+            ```
+
+        """
+        figure = self.tex_figure()
         if self.standalone or self.output_format == "pdf":
-            str2output.append("\\end{document}")
+            str2output = self.tex_preamble() + figure + ["\\end{document}"]
         else:
-            str2output.append("\\end{center}\n")
+            str2output = ["\\begin{center}"] + figure + ["\\end{center}\n"]
 
         try:
             with open(self.output, "w", encoding="utf-8") as file_:
                 file_.write("\n".join(str2output))
 
             if self.output_format == "pdf":
-                if self.pdf_verbose:
-                    mode = "nonstopmode"
-                else:
-                    mode = "batchmode"
-                subprocess.check_call(
-                    [
-                        "pdflatex",
-                        "-interaction",
-                        mode,
-                        "-output-directory",
-                        os.path.dirname(self.output),
-                        self.output,
-                    ]
-                )
+                compile_pdf(self.output, self.pdf_verbose, self.pdf_timeout)
         except TypeError:
             # When using stdout
             print(str2output, file=self.output)
+
+
+def compile_batch(profilers, verbose=False, timeout=None):
+    """Compile the PDFs of many profiles with one pdflatex run per preamble.
+
+    Every pdflatex run loads TikZ and PGFPlots again, which takes most of the
+    time of a small figure. Instead, the profiles with the same preamble (the
+    same page options) are put in one standalone document, one tikzpicture per
+    page, which is compiled once and split into the PDF of each profile (see
+    `split_pdf`). The standalone .tex file of each profile is also written, as
+    by `Profiler.plot`.
+
+    Args:
+        profilers (Iterable[Profiler]): the profilers, with output files
+        verbose (bool): if True, pdflatex runs in nonstop mode, printing its output
+        timeout (float): if given, each pdflatex run is killed after this many
+            seconds
+
+    Returns:
+        list[str]: the PDF file of each profiler
+
+    Raises:
+        ValueError: If a profiler writes to the standard output.
+
+    Example:
+        ```python
+        from perprof.tikz import Profiler, compile_batch
+
+        profilers = [Profiler(opts, {**profiler_opts, "output": name}) for ...]
+        compile_batch(profilers)  # One pdflatex run for all the figures
+        ```
+    """
+    profilers = list(profilers)
+    groups = {}
+    for profiler in profilers:
+        if profiler.output == sys.stdout:
+            raise ValueError(_("ERROR: batch compilation requires output files"))
+        preamble = profiler.tex_preamble()
+        figure = profiler.tex_figure()
+        with open(profiler.output, "w", encoding="utf-8") as file_:
+            file_.write("\n".join(preamble + figure + ["\\end{document}"]))
+        # Every tikzpicture of the batch document is cropped to its own page
+        groups.setdefault(tuple(preamble[1:]), []).append((profiler, figure))
+
+    for preamble, members in groups.items():
+        str2output = ["\\documentclass[multi=tikzpicture]{standalone}", *preamble]
+        for _profiler, figure in members:
+            str2output.extend(figure)
+        str2output.append("\\end{document}")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tex_file = os.path.join(tmpdir, "batch.tex")
+            with open(tex_file, "w", encoding="utf-8") as file_:
+                file_.write("\n".join(str2output))
+            compile_pdf(tex_file, verbose, timeout)
+            split_pdf(
+                os.path.join(tmpdir, "batch.pdf"),
+                [_pdf_name(profiler) for profiler, _figure in members],
+            )
+
+    return [_pdf_name(profiler) for profiler in profilers]
+
+
+def _pdf_name(profiler):
+    """Return the PDF file of a profiler, next to its .tex file."""
+    return os.path.splitext(profiler.output)[0] + ".pdf"
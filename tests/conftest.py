@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from perprof.main import process_arguments, set_arguments
+from perprof.solver_data import SolverData
+
+
+@pytest.fixture(name="cli_options")
+def fixture_cli_options():
+    """Parse command-line arguments into the arguments and options of perprof."""
+
+    def cli_options(*argv):
+        args = set_arguments([str(arg) for arg in argv])
+        return args, *process_arguments(args)
+
+    return cli_options
+
+
+@pytest.fixture(name="random_solvers")
+def fixture_random_solvers():
+    """Create random solvers with shuffled, partially missing and failed problems."""
+
+    def random_solvers(seed, algnames="ABC", n_problems=60, n_rows=None):
+        """Each solver runs `n_rows` of the `n_problems` problems (all of them by
+        default) and fails 20% of its runs. The times have one decimal, so that
+        there are ties, and the solvers have the cost columns "iter" and "nfev" and
+        the columns of the optimal values comparison.
+        """
+        rng = np.random.default_rng(seed)
+        n_rows = n_problems if n_rows is None else n_rows
+        solvers = []
+        for algname in algnames:
+            names = [f"p{i}" for i in rng.permutation(n_problems)[:n_rows]]
+            data = pd.DataFrame(
+                {
+                    "name": names,
+                    "exit": rng.choice(["c", "d"], size=n_rows, p=[0.8, 0.2]),
+                    "time": rng.uniform(1, 5, size=n_rows).round(1),
+                    "iter": rng.integers(1, 50, size=n_rows),
+                    "nfev": rng.integers(1, 80, size=n_rows),
+                    "fval": rng.choice([0.0, 1.0, np.nan], size=n_rows),
+                    "primal": rng.choice([0.0, 1.0], size=n_rows, p=[0.8, 0.2]),
+                    "dual": np.zeros(n_rows),
+                }
+            )
+            solvers.append(SolverData(algname, data))
+        return solvers
+
+    return random_solvers
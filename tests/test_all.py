@@ -1,7 +1,13 @@
+import csv
+import io
+import json
+import sys
+
 import pytest
 
-from perprof import bokeh, matplotlib, prof, tikz
-from perprof.main import process_arguments, set_arguments
+from perprof import bokeh, matplotlib, parse, prof, tikz
+from perprof.main import main, process_arguments, set_arguments
+from perprof.profile_data import ProfileData
 
 goodfiles = " ".join(
     ["perprof/examples/" + s + ".table" for s in ["alpha", "beta", "gamma"]]
@@ -160,3 +166,218 @@ def test_repeated_problem():
         parser_options, profiler_options = process_arguments(args)
         with pytest.raises(ValueError):
             back_profilers[backend](parser_options, profiler_options)
+
+
+def test_problem_attributes(tmp_path):
+    attributes = tmp_path / "attributes.csv"
+    attributes.write_text("name,nvar\n3PK,30\nACOPP14,38\nAKIVA,2\n")
+    args = set_arguments(
+        ["--raw", "--demo", "--problem-attributes", str(attributes)]
+        + ["--filter", "nvar > 10"]
+    )
+    data = prof.Pdata(*process_arguments(args))
+    assert data.problems == {"3PK", "ACOPP14"}
+
+    with pytest.raises(SystemExit):
+        set_arguments(["--raw", "--demo", "--problem-attributes", str(attributes)])
+
+
+def test_pattern_subset():
+    for backend in backends:
+        args = "--" + backend + " --demo --subset tests/pattern.subset"
+        args = set_arguments(args.split())
+        parser_options, profiler_options = process_arguments(args)
+        data = back_profilers[backend](parser_options, profiler_options)
+        assert data.problems == {
+            "3PK",
+            "ACOPP118",
+            "ACOPP14",
+            "ACOPP30",
+            "ACOPP300",
+            "ACOPP57",
+        }
+
+
+@pytest.mark.parametrize("extension", ["npz", "json"])
+def test_save_load_profile(tmp_path, extension):
+    profile_file = str(tmp_path / f"profile.{extension}")
+    args = set_arguments(["--raw", "--demo"])
+    parser_options, profiler_options = process_arguments(args)
+    data = prof.Pdata(parser_options, profiler_options)
+    data.save_profile(profile_file)
+
+    for backend in ["bokeh", "tikz", "mp"]:
+        args = set_arguments(["--" + backend, "--load-profile", profile_file])
+        parser_options, profiler_options = process_arguments(args)
+        loaded = back_profilers[backend](parser_options, profiler_options)
+        loaded.compute()
+        assert loaded.solvers == data.solvers
+        assert loaded.problems == data.problems
+        assert loaded.times == pytest.approx(data.times)
+        for solver in data.solvers:
+            assert loaded.ppsbt[solver] == pytest.approx(data.ppsbt[solver])
+
+    with pytest.raises(NotImplementedError):
+        process_arguments(set_arguments(["--raw", "--load-profile", profile_file]))
+
+
+def test_grid():
+    args = set_arguments(["--raw", "--demo"])
+    parser_options, profiler_options = process_arguments(args)
+    exact = prof.Pdata(parser_options, profiler_options)
+    exact.compute()
+
+    args = set_arguments("--raw --demo --grid 50 --tau 10".split())
+    parser_options, profiler_options = process_arguments(args)
+    data = prof.Pdata(parser_options, profiler_options)
+    data.compute()
+    assert len(data.times) == 51
+    assert data.times[0] == 1.0
+    assert data.times[-2] == pytest.approx(10.0)
+    for solver in data.solvers:
+        for time, ppsbt in zip(data.times, data.ppsbt[solver]):
+            idx = max(i for i, t in enumerate(exact.times) if t <= time)
+            assert ppsbt == exact.ppsbt[solver][idx]
+
+
+@pytest.mark.parametrize("fmt", ["text", "csv", "tex"])
+def test_table_format(tmp_path, capsys, fmt):
+    args = set_arguments(["--table", "--demo", "--table-format", fmt])
+    parser_options, profiler_options = process_arguments(args)
+    data = prof.Pdata(parser_options, profiler_options)
+    summary = data.summary()
+    assert list(summary.index) == data.solvers
+    for solver in data.solvers:
+        assert summary.loc[solver, "robustness"] == pytest.approx(
+            data.ppsbt[solver][-1]
+        )
+        assert summary.loc[solver, "efficiency"] == pytest.approx(data.ppsbt[solver][0])
+    data.print_summary_table(fmt)
+    out = capsys.readouterr().out
+    assert all(solver in out for solver in data.solvers)
+
+    output = str(tmp_path / "table")
+    args = set_arguments(["--table", "--demo", "--table-format", fmt, "-o", output])
+    prof.Pdata(*process_arguments(args)).print_summary_table(fmt)
+    extension = "txt" if fmt == "text" else fmt
+    assert (tmp_path / f"table.{extension}").exists()
+
+    with pytest.raises(NotImplementedError):
+        process_arguments(set_arguments(["--raw", "--demo", "--table-format", fmt]))
+
+
+def test_max_memory(capsys, monkeypatch):
+    args = set_arguments(["--raw", "--demo", "--max-memory", "1M"])
+    data = prof.Pdata(*process_arguments(args))
+    assert data.max_memory == 1024**2
+    data.compute()
+    assert data.profile.max_memory == 1024**2
+    with pytest.raises(SystemExit):
+        set_arguments(["--raw", "--demo", "--max-memory", "lots"])
+
+    # Far below the budget, the profile is still computed, in chunks
+    for budget in [[], ["--max-memory", "1K"]]:
+        monkeypatch.setattr(sys, "argv", ["perprof", "--table", "--demo", *budget])
+        main()
+    full, chunked = capsys.readouterr().out.split("Solvers")[1:]
+    assert chunked == full
+
+
+@pytest.mark.parametrize("fmt", ["table", "csv", "tsv", "jsonl"])
+def test_raw_format(tmp_path, capsys, monkeypatch, fmt):
+    args = set_arguments(["--raw", "--demo"])
+    data = prof.Pdata(*process_arguments(args))
+    # A missing result
+    del data.data["Beta"]["3PK"]
+    output = tmp_path / "raw.txt"
+    with open(output, "w", encoding="utf-8", newline="") as file_:
+        data.write_raw(file_, fmt)
+    lines = output.read_text(encoding="utf-8").splitlines()
+    if fmt == "table":
+        assert "\n".join(lines) == repr(data) + " "
+        assert lines[0].split() == data.solvers
+        assert lines[1].split()[0] == "10FOLDTR"
+    elif fmt == "jsonl":
+        records = [json.loads(line) for line in lines]
+        assert len(records) == data.number_problems
+        three_pk = next(r for r in records if r["problem"] == "3PK")
+        assert three_pk["times"]["Beta"] is None
+        assert three_pk["times"]["Alpha"] == data.data["Alpha"]["3PK"]["time"]
+    else:
+        rows = list(csv.reader(lines, delimiter="," if fmt == "csv" else "\t"))
+        assert rows[0] == ["problem", *data.solvers]
+        assert len(rows) == data.number_problems + 1
+        three_pk = next(row for row in rows if row[0] == "3PK")
+        assert three_pk[2] == ""
+        assert float(three_pk[1]) == data.data["Alpha"]["3PK"]["time"]
+
+    main_args = ["perprof", "--raw", "--demo", "--raw-format", fmt]
+    profile = str(tmp_path / "profile.npz")
+    output_args = ["-o", str(tmp_path / "main"), "--save-profile", profile]
+    monkeypatch.setattr(sys, "argv", main_args + output_args)
+    main()
+    extension = prof.RAW_FORMATS[fmt]
+    assert (tmp_path / f"main.{extension}").exists()
+    assert ProfileData.load(profile).algnames == data.solvers
+    capsys.readouterr()
+    monkeypatch.setattr(sys, "argv", main_args)
+    main()
+    assert len(capsys.readouterr().out.splitlines()) == data.number_problems + (
+        0 if fmt == "jsonl" else 2 if fmt == "table" else 1
+    )
+
+    with pytest.raises(NotImplementedError):
+        process_arguments(set_arguments(["--mp", "--demo", "--raw-format", fmt]))
+    with pytest.raises(ValueError):
+        data.write_raw(io.StringIO(), "xml")
+
+
+def test_columns_option():
+    args = set_arguments(["--raw", "--demo"])
+    parser_options, _ = process_arguments(args)
+    data, _ = parse.parse_file("tests/test_data/multi_cost.table", parser_options)
+    assert data["p1"]["time"] == 1.0
+    assert data["p3"]["time"] == float("inf")
+    assert data["p4"]["time"] == 0.1
+
+
+@pytest.mark.parametrize("extra", [[], ["--compare", "optimalvalues"]])
+def test_profile_data_engine(tmp_path, extra):
+    files = [str(tmp_path / "a.sample"), str(tmp_path / "b.sample")]
+    (tmp_path / "a.sample").write_text(
+        "p1 c 2.0 1.0 0 0\np2 c 1.0 5.0 0 0\np3 c 3.0 2.0 0 1\np4 d 4.0 1.0 0 0\n"
+    )
+    (tmp_path / "b.sample").write_text(
+        "p1 c 1.0 1.0 0 0\np2 c 2.0 1.0 0 0\np3 c 1.5 1.0 0 0\np5 c 1.0 1.0 0 0\n"
+    )
+    args = set_arguments(["--raw", "--demo", *extra])
+    if extra:
+        args = set_arguments(["--raw", *extra, *files])
+    parser_options, profiler_options = process_arguments(args)
+    data = prof.Pdata(parser_options, profiler_options)
+    data.compute()
+    assert data.profile.algnames == data.solvers
+    assert data.profile.n_problems == data.number_problems
+
+    # Reference: ratios to the best time, counted at each breakpoint
+    missing = {"time": float("inf"), "fval": float("inf")}
+    ratios = {solver: [] for solver in data.solvers}
+    for problem in data.problems:
+        runs = [data.data[s].get(problem, missing) for s in data.solvers]
+        min_fval = min(run["fval"] for run in runs)
+        min_time = min(
+            run["time"]
+            for run in runs
+            if min_fval == float("inf")
+            or run["fval"] < min_fval + abs(min_fval) * 1e-3 + 1e-6
+        )
+        for solver, run in zip(data.solvers, runs):
+            if min_time > 0 and run["time"] / min_time < float("inf"):
+                ratios[solver].append(run["time"] / min_time)
+    assert data.times[:-1] == sorted({r for v in ratios.values() for r in v})
+    for solver in data.solvers:
+        expected = [
+            sum(r <= t for r in ratios[solver]) / data.number_problems
+            for t in data.times
+        ]
+        assert data.ppsbt[solver] == expected
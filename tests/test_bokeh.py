@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from bokeh.models import CheckboxGroup, CustomJS, Slider
+
+from perprof import bokeh, prof
+from perprof.main import process_arguments, set_arguments
+
+
+def profiler(*extra):
+    args = set_arguments(["--bokeh", "--interactive", *extra])
+    return bokeh.Profiler(*process_arguments(args))
+
+
+def test_interactive_report(tmp_path):
+    """The report embeds the ratios and recomputes the profiles in the browser"""
+    pdata = profiler("--demo", "--tau", "5", "-o", str(tmp_path / "pp"))
+    pdata.compute()
+    report = pdata.interactive_report()
+    slider = next(iter(report.select({"type": Slider})))
+    assert slider.value == 5.0
+    assert slider.end == pytest.approx(
+        pdata.profile.ratio[pdata.profile.ratio < np.inf].max()
+    )
+    solvers = next(iter(report.select({"type": CheckboxGroup})))
+    assert solvers.labels == pdata.solvers
+    callback = slider.js_property_callbacks["change:value"][0]
+    assert isinstance(callback, CustomJS)
+    data = callback.args["data"].data
+    assert list(data["name"]) == list(pdata.profile.problems)
+    for j in range(len(pdata.solvers)):
+        assert data[f"ratio{j}"].dtype == np.float32
+        assert np.allclose(data[f"ratio{j}"], pdata.profile.ratio[:, j])
+    assert "optimal0" not in data
+
+    pdata.plot()
+    assert "Problems (regular expression)" in (tmp_path / "pp.html").read_text()
+
+
+def test_interactive_loaded_profile(tmp_path):
+    """Profiles saved with the ratios can be explored, but not the others"""
+    args = set_arguments(["--raw", "--demo"])
+    data = prof.Pdata(*process_arguments(args))
+    data.save_profile(str(tmp_path / "profile.npz"))
+    pdata = profiler(
+        "--load-profile", str(tmp_path / "profile.npz"), "-o", str(tmp_path / "pp")
+    )
+    pdata.plot()
+    assert (tmp_path / "pp.html").exists()
+
+    pdata.profile = None
+    with pytest.raises(ValueError):
+        pdata.interactive_report()
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from perprof import bokeh
+from perprof.main import process_arguments, set_arguments
+from perprof.profile_data import ProfileData
+
+
+@pytest.fixture(name="profile")
+def fixture_profile(random_solvers):
+    """Random results of three solvers, with ties and failures."""
+    return ProfileData(*random_solvers(3, n_problems=300))
+
+
+def test_problems_between(profile):
+    """The queries match a scan of the ratio matrix"""
+    index = profile.drilldown()
+    assert profile.drilldown() is index
+    for j, solver in enumerate(profile.algnames):
+        ratio = profile.ratio[:, j]
+        for tau1, tau2 in [(-np.inf, 1.0), (1.0, 2.0), (1.5, 4.0), (4.0, np.inf)]:
+            expected = set(profile.problems[(ratio > tau1) & (ratio <= tau2)])
+            problems = index.problems_between(solver, tau1, tau2)
+            assert set(problems) == expected
+            assert len(problems) == len(expected)
+            ratios = index.ratios_between(solver, tau1, tau2)
+            assert ratios.is_monotonic_increasing
+        within = index.problems_within(solver, 2.0)
+        assert len(within) == profile.solved_counts[profile.breakpoints == 2.0, j][0]
+    with pytest.raises(KeyError):
+        index.problems_within("D", 1.0)
+
+
+def test_best_solvers(profile):
+    index = profile.drilldown()
+    for i, problem in enumerate(profile.problems):
+        expected = [
+            a for j, a in enumerate(profile.algnames) if profile.ratio[i, j] == 1
+        ]
+        assert index.best_solvers(problem) == expected
+    with pytest.raises(KeyError):
+        index.best_solvers("missing")
+
+
+def test_loaded_profile(profile, tmp_path):
+    profile.save(tmp_path / "profile.npz")
+    loaded = ProfileData.load(tmp_path / "profile.npz")
+    assert list(loaded.drilldown().problems_within("B", 1.5)) == list(
+        profile.drilldown().problems_within("B", 1.5)
+    )
+    without_ratio = ProfileData._from_computed(  # pylint: disable=protected-access
+        profile.algnames, profile.breakpoints, profile.cumulative
+    )
+    with pytest.raises(ValueError):
+        without_ratio.drilldown()
+
+
+def test_bokeh_hover(tmp_path):
+    """The tooltips list the problems solved at each point"""
+    args = set_arguments(["--bokeh", "--demo", "-o", str(tmp_path / "pp")])
+    pdata = bokeh.Profiler(*process_arguments(args))
+    pdata.plot()
+    index = pdata.profile.drilldown()
+    solver = pdata.solvers[0]
+    hover = pdata.hover_problems(solver)
+    assert len(hover) == len(pdata.times)
+    assert hover[1] == ", ".join(
+        index.problems_between(solver, pdata.times[0], pdata.times[1])
+    )
+    assert hover[0].endswith(")")
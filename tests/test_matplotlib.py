@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+
+from perprof import matplotlib
+
+
+@pytest.fixture(name="tables")
+def fixture_tables(tmp_path):
+    """Table files of ten solvers."""
+    rng = np.random.default_rng(9)
+    files = []
+    for k in range(10):
+        lines = ["---", f"algname: S{k}", "success: c", "---"]
+        for i in range(20):
+            exit_flag = "c" if rng.random() < 0.8 else "d"
+            lines.append(f"p{i} {exit_flag} {rng.uniform(1, 10):.3f}")
+        files.append(tmp_path / f"s{k}.table")
+        files[-1].write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return [str(f) for f in files]
+
+
+@pytest.fixture(name="profiler")
+def fixture_profiler(tmp_path, tables, cli_options):
+    """Create a matplotlib profiler of the ten solvers, written to `tmp_path`."""
+
+    def profiler(*extra):
+        argv = ["--mp", "--png", "-o", tmp_path / "pp", *extra, *tables]
+        return matplotlib.Profiler(*cli_options(*argv)[1:])
+
+    return profiler
+
+
+def test_more_solvers_than_styles(tmp_path, profiler):
+    """The line styles are repeated instead of running out"""
+    for extra in [[], ["--black-and-white"]]:
+        profiler(*extra).plot()
+        assert (tmp_path / "pp.png").exists()
+
+
+def test_many_solvers(profiler, monkeypatch):
+    """All the curves are drawn by one collection, and the highlighted by another"""
+    added = []
+    add_collection = matplotlib.plt.Axes.add_collection
+
+    def record(axes, collection, *args, **kwargs):
+        added.append(collection)
+        return add_collection(axes, collection, *args, **kwargs)
+
+    monkeypatch.setattr(matplotlib.plt.Axes, "add_collection", record)
+    pdata = profiler("--many-solvers")
+    pdata.plot()
+    assert len(added) == 1
+    assert isinstance(added[0], LineCollection)
+    assert len(added[0].get_segments()) == 10
+    vertices = added[0].get_segments()[3]
+    times = np.array(pdata.times)
+    ppsbt = np.array(pdata.ppsbt["S3"])
+    # The vertices are the corners of the steps: each level starts at a vertex
+    for x, y in vertices[::2]:
+        assert ppsbt[np.searchsorted(times, x, side="right") - 1] == y
+
+    added.clear()
+    pdata = profiler("--many-solvers", "--highlight", "S2,S7")
+    pdata.plot()
+    assert [len(c.get_segments()) for c in added] == [8, 2]
+    axes = matplotlib.plt.gcf().axes[0]
+    labels = [text.get_text() for text in axes.get_legend().get_texts()]
+    assert labels == ["8 other solvers", "S2", "S7"]
+
+    # The legend is in the language of the plot
+    pdata = profiler("--many-solvers")
+    pdata.plot_lang = lambda text: text.replace("solvers", "solveurs")
+    pdata.plot()
+    axes = matplotlib.plt.gcf().axes[0]
+    assert axes.get_legend().get_texts()[0].get_text() == "10 solveurs"
+
+    pdata = profiler("--many-solvers", "--highlight", "S2,X")
+    with pytest.raises(ValueError):
+        pdata.plot()
+    with pytest.raises(NotImplementedError):
+        profiler("--highlight", "S2")
+
+
+def test_vector_output_size(tmp_path, cli_options, monkeypatch):
+    """The curves are simplified and can be rasterized, keeping vector files small"""
+    rng = np.random.default_rng(10)
+    tables = []
+    for k in range(3):
+        lines = ["---", f"algname: S{k}", "success: c", "---"]
+        times = rng.lognormal(0, 1, size=2000)
+        lines += [f"p{i} c {time:.6f}" for i, time in enumerate(times)]
+        tables.append(tmp_path / f"s{k}.table")
+        tables[-1].write_text("\n".join(lines) + "\n", encoding="utf-8")
+    tables = [str(table) for table in tables]
+
+    def svg(*extra):
+        argv = ["--mp", "--svg", "-o", tmp_path / "pp", *extra, *tables]
+        matplotlib.Profiler(*cli_options(*argv)[1:]).plot()
+        return (tmp_path / "pp.svg").read_text(encoding="utf-8")
+
+    simplified = svg()
+    assert "<image" not in simplified
+    # Simplification does not depend on matplotlibrc
+    monkeypatch.setitem(matplotlib.matplotlib.rcParams, "path.simplify", False)
+    assert len(svg()) == len(simplified)
+    assert len(svg("--simplify-threshold", "0.01")) > len(simplified)
+
+    rasterized = svg("--rasterize", "100")
+    assert "<image" in rasterized
+    assert "Performance Profile" in rasterized
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from perprof.partial_profile import (
+    PartialProfile,
+    compute_partials,
+    merge_partials,
+)
+from perprof.profile_data import ProfileData
+from perprof.solver_data import SolverData
+
+
+@pytest.fixture(name="data")
+def fixture_data(random_solvers):
+    """Random results of three solvers, with ties, failures and missing problems."""
+    solvers = random_solvers(1, n_problems=120, n_rows=110)
+    return {solver.algname: solver.data for solver in solvers}
+
+
+def shards(data, n_shards):
+    """Split the results into disjoint shards of problems."""
+    result = []
+    for k in range(n_shards):
+        result.append(
+            [
+                SolverData(
+                    algname,
+                    df[df.name.str[1:].astype(int) % n_shards == k].reset_index(
+                        drop=True
+                    ),
+                )
+                for algname, df in data.items()
+            ]
+        )
+    return result
+
+
+def test_merge_is_exact(data):
+    """Test that merging partials gives exactly the profile of the union."""
+    expected = ProfileData(*[SolverData(a, df) for a, df in data.items()])
+    partials = [ProfileData(*shard).partial() for shard in shards(data, 4)]
+    merged = merge_partials(*partials)
+    assert merged.algnames == ["A", "B", "C"]
+    assert merged.n_problems == expected.n_problems
+    assert np.all(merged.breakpoints == expected.breakpoints)
+    assert np.all(merged.cumulative == expected.cumulative)
+
+    merged = merge_partials(*partials, grid=10, tau=3.0)
+    grid_expected = ProfileData(
+        *[SolverData(a, df) for a, df in data.items()], grid=10, tau=3.0
+    )
+    assert np.allclose(merged.breakpoints, grid_expected.breakpoints)
+    assert np.all(merged.cumulative == grid_expected.cumulative)
+
+
+def test_merge_solver_order(data):
+    """Test merging partials with solvers in different orders."""
+    shard1, shard2 = shards(data, 2)
+    partial1 = ProfileData(*shard1).partial()
+    partial2 = ProfileData(*shard2[::-1]).partial()
+    merged = merge_partials(partial1, partial2)
+    expected = ProfileData(*[SolverData(a, df) for a, df in data.items()])
+    assert np.all(merged.cumulative == expected.cumulative)
+
+    other = PartialProfile(["A", "D", "C"], 0, [[]] * 3, [[]] * 3)
+    with pytest.raises(ValueError):
+        partial1.merge(other)
+    with pytest.raises(ValueError):
+        merge_partials()
+
+
+def test_empty_partials(data):
+    """Partials without problems cannot be turned into a profile"""
+    solvers = [SolverData(a, df) for a, df in data.items()]
+    empty = ProfileData(*solvers, subset=["missing"]).partial()
+    assert empty.n_problems == 0
+    for grid in [None, 10]:
+        with pytest.raises(ValueError, match="problem set is empty"):
+            empty.to_profile(grid=grid)
+        with pytest.raises(ValueError, match="problem set is empty"):
+            merge_partials(empty, empty, grid=grid)
+    merged = merge_partials(empty, ProfileData(*solvers).partial())
+    assert merged.n_problems == ProfileData(*solvers).n_problems
+
+
+@pytest.mark.parametrize("extension", [".json", ".npz"])
+def test_save_load(data, tmp_path, extension):
+    """Test the serialization of partial profiles."""
+    partial = ProfileData(*shards(data, 1)[0]).partial()
+    partial.save(tmp_path / f"partial{extension}")
+    loaded = PartialProfile.load(tmp_path / f"partial{extension}")
+    assert loaded.algnames == partial.algnames
+    assert loaded.n_problems == partial.n_problems
+    for j in range(3):
+        assert np.all(loaded.values[j] == partial.values[j])
+        assert np.all(loaded.counts[j] == partial.counts[j])
+    assert PartialProfile.from_dict(partial.to_dict()).n_problems == partial.n_problems
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_compute_partials(data, processes):
+    """Test computing the partials of shards in a process pool."""
+    partials = compute_partials(shards(data, 3), processes=processes)
+    expected = ProfileData(*[SolverData(a, df) for a, df in data.items()])
+    assert np.all(merge_partials(*partials).cumulative == expected.cumulative)
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from perprof import profile_data
 from perprof.profile_data import ProfileData
 from perprof.solver_data import SolverData
 
@@ -107,3 +108,344 @@ def test_process(auxiliary_data):
     assert np.all(profile_data.ratio == auxiliary_data["ratio_subset"])
     assert np.all(profile_data.breakpoints == auxiliary_data["breakpoints_subset"])
     assert np.all(profile_data.cumulative == auxiliary_data["cumulative_subset"])
+
+
+def test_alignment():
+    """Test that problems are aligned by name, regardless of order and presence."""
+    solver_a = SolverData(
+        "A",
+        pd.DataFrame(
+            {"name": ["p2", "p1"], "exit": ["c", "d"], "time": [2.0, 1.0]},
+        ),
+    )
+    solver_b = SolverData(
+        "B",
+        pd.DataFrame(
+            {
+                "name": ["p1", "p3", "p2"],
+                "exit": ["c", "c", "c"],
+                "time": [4.0, 1.0, 1.0],
+            },
+        ),
+    )
+    profile_data = ProfileData(solver_a, solver_b)
+    assert list(profile_data.problems) == ["p2", "p1", "p3"]
+    assert np.all(
+        profile_data.ratio
+        == np.array([[2.0, 1.0], [float("inf"), 1.0], [float("inf"), 1.0]])
+    )
+    assert np.all(profile_data.cumulative == np.array([[0.0, 1.0], [1 / 3, 1.0]]))
+
+
+def test_arrow_input(auxiliary_data, tmp_path):
+    """Test ProfileData reading Parquet files."""
+    pytest.importorskip("pyarrow")
+    for algname in ["A", "B"]:
+        SolverData(algname, auxiliary_data[algname]).write_arrow(
+            tmp_path / f"{algname}.parquet"
+        )
+    profile_data = ProfileData(tmp_path / "A.parquet", tmp_path / "B.parquet")
+    assert [solver.algname for solver in profile_data.solvers] == ["A", "B"]
+    assert np.all(profile_data.ratio == auxiliary_data["ratio"])
+
+    profile_data = ProfileData(
+        tmp_path / "A.parquet", tmp_path / "B.parquet", subset=auxiliary_data["subset"]
+    )
+    assert len(profile_data.solvers[0].data) == 2
+    assert np.all(profile_data.ratio == auxiliary_data["ratio_subset"])
+
+
+@pytest.mark.parametrize("extension", [".npz", ".json"])
+def test_save_load(auxiliary_data, tmp_path, extension):
+    """Test saving and loading a computed profile."""
+    solvers = [SolverData(algname, auxiliary_data[algname]) for algname in ["A", "B"]]
+    profile_data = ProfileData(*solvers)
+    profile_data.save(tmp_path / f"profile{extension}")
+    loaded = ProfileData.load(tmp_path / f"profile{extension}")
+    assert loaded.solvers == []
+    assert loaded.algnames == ["A", "B"]
+    assert list(loaded.problems) == ["p1", "p2", "p3", "p4", "p5"]
+    assert np.all(loaded.ratio == auxiliary_data["ratio"])
+    assert np.all(loaded._best_times == profile_data._best_times)
+    assert np.all(loaded.breakpoints == auxiliary_data["breakpoints"])
+    assert np.all(loaded.cumulative == auxiliary_data["cumulative"])
+
+    with pytest.raises(ValueError):
+        profile_data.save(tmp_path / "profile.txt")
+
+
+def test_grid(auxiliary_data):
+    """Test the evaluation of the profile on a grid and up to tau."""
+    solvers = [SolverData(algname, auxiliary_data[algname]) for algname in ["A", "B"]]
+    exact = ProfileData(*solvers)
+
+    profile_data = ProfileData(*solvers, grid=3)
+    assert np.all(profile_data.breakpoints == np.array([1.0, 2.0, 4.0]))
+    assert np.all(profile_data.cumulative == auxiliary_data["cumulative"])
+
+    profile_data = ProfileData(*solvers, grid=4, grid_scale="linear", tau=2.5)
+    assert np.allclose(profile_data.breakpoints, [1.0, 1.5, 2.0, 2.5])
+    assert np.allclose(
+        profile_data.cumulative, [[0.2, 0.6], [0.2, 0.6], [0.6, 0.6], [0.6, 0.6]]
+    )
+
+    profile_data = ProfileData(*solvers, grid=[3.0, 1.0, 10.0])
+    assert np.all(profile_data.breakpoints == np.array([1.0, 3.0, 10.0]))
+    assert np.allclose(profile_data.cumulative, [[0.2, 0.6], [0.6, 0.6], [0.6, 0.8]])
+
+    profile_data = ProfileData(*solvers, tau=2.0)
+    assert np.all(profile_data.breakpoints == exact.breakpoints[:2])
+    assert np.all(profile_data.cumulative == exact.cumulative[:2])
+
+    with pytest.raises(ValueError):
+        ProfileData(*solvers, grid=3, grid_scale="quadratic")
+
+
+def test_evaluate_inverse(auxiliary_data):
+    """Test the evaluation of the profile at any ratio and its inverse."""
+    solvers = [SolverData(algname, auxiliary_data[algname]) for algname in ["A", "B"]]
+    profile_data = ProfileData(*solvers)
+    values = profile_data.evaluate([0.5, 1.0, 1.5, 2.0, 3.9, 4.0, 100.0])
+    assert np.allclose(
+        values,
+        [
+            [0, 0],
+            [0.2, 0.6],
+            [0.2, 0.6],
+            [0.6, 0.6],
+            [0.6, 0.6],
+            [0.6, 0.8],
+            [0.6, 0.8],
+        ],
+    )
+    assert np.allclose(profile_data.evaluate(2.0), [0.6, 0.6])
+
+    ratio = profile_data.inverse([0.0, 0.2, 0.5, 0.6, 0.8, 1.0])
+    assert np.all(
+        ratio == [[1, 1], [1, 1], [2, 1], [2, 1], [np.inf, 4], [np.inf, np.inf]]
+    )
+    assert np.all(profile_data.inverse(0.7) == [np.inf, 4.0])
+
+    # The inverse and the evaluation agree, also with counts and a grid
+    counts = ProfileData(*solvers, grid=20, cumulative_dtype="uint32")
+    fractions = np.linspace(0, 1, 11)
+    ratio = counts.inverse(fractions)
+    for j in range(2):
+        finite = ratio[:, j] < np.inf
+        reached = counts.evaluate(ratio[finite, j])[:, j]
+        assert np.all(reached >= fractions[finite])
+
+
+def test_dtypes(auxiliary_data):
+    """Test the reduced precision and count storage options."""
+    solvers = [SolverData(algname, auxiliary_data[algname]) for algname in ["A", "B"]]
+    profile_data = ProfileData(
+        *solvers, ratio_dtype="float32", cumulative_dtype="uint32"
+    )
+    assert profile_data.ratio.dtype == np.float32
+    assert profile_data.solved_counts.dtype == np.uint32
+    assert np.all(profile_data.solved_counts == np.array([[1, 3], [3, 3], [3, 4]]))
+    assert np.all(profile_data.ratio == auxiliary_data["ratio"])
+    assert np.all(profile_data.breakpoints == auxiliary_data["breakpoints"])
+    assert np.allclose(profile_data.cumulative, auxiliary_data["cumulative"])
+
+    profile_data = ProfileData(*solvers, grid=3, cumulative_dtype="uint32")
+    assert np.allclose(profile_data.cumulative, auxiliary_data["cumulative"])
+    assert np.all(ProfileData(*solvers).solved_counts == profile_data.solved_counts)
+
+    with pytest.raises(ValueError):
+        ProfileData(*solvers, ratio_dtype="float16")
+    with pytest.raises(ValueError):
+        ProfileData(*solvers, cumulative_dtype="int8")
+
+
+def test_costs(random_solvers):
+    """Profiles of several cost columns share the alignment"""
+    solvers = random_solvers(4, n_problems=40, n_rows=35)
+    subset = [f"p{i}" for i in range(30)]
+    profile = ProfileData(*solvers, subset=subset)
+    profiles = profile.for_costs(["time", "iter", "nfev"])
+    assert profiles["time"] is profile
+    for cost in ["iter", "nfev"]:
+        expected = ProfileData(*solvers, subset=subset, cost=cost)
+        assert profiles[cost].cost == cost
+        assert profiles[cost].problems.equals(expected.problems)
+        np.testing.assert_array_equal(profiles[cost].ratio, expected.ratio)
+        np.testing.assert_array_equal(profiles[cost].breakpoints, expected.breakpoints)
+        np.testing.assert_array_equal(profiles[cost].cumulative, expected.cumulative)
+    # Failures are shared by all costs
+    assert (np.isinf(profiles["iter"].ratio) == np.isinf(profile.ratio)).all()
+    assert profile.cost == "time"
+
+    with pytest.raises(ValueError):
+        profile.for_cost("missing")
+    with pytest.raises(ValueError):
+        ProfileData(*solvers, cost="missing")
+
+
+def test_restrict(random_solvers):
+    """Restricted profiles are the profiles of the subsets"""
+    solvers = random_solvers(6, n_rows=50)
+    for options in [{}, {"grid": 10}, {"tau": 3.0, "cumulative_dtype": "uint32"}]:
+        profile = ProfileData(*solvers, **options)
+        for subset in [[f"p{i}" for i in range(0, 60, 3)], ["p1", "missing"]]:
+            expected = ProfileData(*solvers, subset=subset, **options)
+            restricted = profile.restrict(subset)
+            assert set(restricted.problems) == set(expected.problems)
+            order = expected.problems.get_indexer(restricted.problems)
+            np.testing.assert_array_equal(restricted.ratio, expected.ratio[order])
+            np.testing.assert_array_equal(restricted.breakpoints, expected.breakpoints)
+            np.testing.assert_array_equal(
+                restricted.solved_counts, expected.solved_counts
+            )
+            np.testing.assert_array_equal(
+                restricted.for_cost("iter").ratio,
+                expected.for_cost("iter").ratio[order],
+            )
+        assert profile.n_problems == 60
+
+    loaded = ProfileData._from_computed(
+        profile.algnames,
+        profile.breakpoints,
+        profile.cumulative,
+        problems=profile.problems,
+        ratio=profile.ratio,
+    )
+    assert loaded.restrict(["p1", "p2"]).n_problems == 2
+    without_ratio = ProfileData._from_computed(
+        profile.algnames, profile.breakpoints, profile.cumulative
+    )
+    with pytest.raises(ValueError):
+        without_ratio.restrict(["p1"])
+
+
+@pytest.mark.parametrize("compare", ["exitflag", "optimalvalues"])
+def test_solver_subsets(random_solvers, compare):
+    """Profiles of subsets of the solvers are the profiles of these solvers"""
+    solvers = random_solvers(7, algnames="ABCD", n_rows=45)
+    profile = ProfileData(*solvers, compare=compare, grid=15)
+
+    def check(subprofile, subset, problems=None):
+        expected = ProfileData(*subset, subset=problems, compare=compare, grid=15)
+        assert subprofile.algnames == expected.algnames
+        assert set(subprofile.problems) == set(expected.problems)
+        order = expected.problems.get_indexer(subprofile.problems)
+        np.testing.assert_array_equal(subprofile.ratio, expected.ratio[order])
+        np.testing.assert_array_equal(subprofile.breakpoints, expected.breakpoints)
+        np.testing.assert_array_equal(subprofile.cumulative, expected.cumulative)
+
+    profiles = profile.leave_one_out()
+    assert list(profiles) == ["A", "B", "C", "D"]
+    for k, algname in enumerate(profile.algnames):
+        check(profiles[algname], solvers[:k] + solvers[k + 1 :])
+    check(profile.for_solvers(["D", "B"]), [solvers[3], solvers[1]])
+    problems = ["p1", "p2", "p3"]
+    check(profile.restrict(problems).for_solvers(["A", "C"]), solvers[::2], problems)
+    assert profile.algnames == ["A", "B", "C", "D"]
+
+    with pytest.raises(KeyError):
+        profile.for_solvers(["A", "E"])
+    with pytest.raises(ValueError):
+        profile.for_solvers(["A"])
+    with pytest.raises(ValueError):
+        profile.for_solvers(["A", "A"])
+    with pytest.raises(ValueError):
+        profile.for_solvers(["A", "B"]).leave_one_out()
+
+
+def test_costs_table():
+    """Cost columns named in table files"""
+    profile = ProfileData(
+        DATA_DIR / "multi_cost.table", DATA_DIR / "simple_solver_b.table"
+    )
+    np.testing.assert_array_equal(profile._times[:, 0], [1.0, 2.5, np.inf, 0.1])
+    with pytest.raises(ValueError):
+        profile.for_cost("iter")
+
+
+@pytest.mark.parametrize("unconstrained", [False, True])
+def test_optimal_values(tmp_path, unconstrained):
+    """The optimal values comparison matches the legacy parser and Pdata"""
+    from perprof import parse
+
+    rng = np.random.default_rng(5)
+    files = []
+    for algname in ["A", "B", "C"]:
+        names = [f"p{i}" for i in rng.permutation(50)[:45]]
+        lines = [f"---\nalgname: {algname}\n---\n"]
+        for name in names:
+            fval = rng.choice([1.0, 1.0005, 2.0, -3.0])
+            primal, dual = rng.choice([1e-6, 1e-2], size=2, p=[0.8, 0.2])
+            exit_flag = rng.choice(["c", "d"])
+            time = rng.uniform(0.5, 5.0)
+            lines.append(f"{name} {exit_flag} {time} {fval} {primal} {dual}\n")
+        files.append(tmp_path / f"{algname}.table")
+        files[-1].write_text("".join(lines))
+
+    profile = ProfileData(*files, compare="optimalvalues", unconstrained=unconstrained)
+    parser_options = {
+        "free_format": True,
+        "files": [str(f) for f in files],
+        "success": ["c"],
+        "maxtime": float("inf"),
+        "mintime": 0,
+        "compare": "optimalvalues",
+        "unc": unconstrained,
+        "infeas_tol": 1e-4,
+        "subset": None,
+    }
+    # Reference: the legacy parser and scaling of perprof.prof
+    data = {}
+    for filename in files:
+        solver_data, algname = parse.parse_file(str(filename), parser_options)
+        data[algname] = solver_data
+    problems = {p for solver_data in data.values() for p in solver_data}
+    assert set(profile.problems) == problems
+    missing = {"time": np.inf, "fval": np.inf}
+    for i, problem in enumerate(profile.problems):
+        runs = [data[algname].get(problem, missing) for algname in profile.algnames]
+        min_fval = min(run["fval"] for run in runs)
+        min_time = min(
+            run["time"]
+            for run in runs
+            if run["fval"] < min_fval + abs(min_fval) * 1e-3 + 1e-6
+        )
+        for j, run in enumerate(runs):
+            assert profile.ratio[i, j] == pytest.approx(run["time"] / min_time)
+    # The exit flag is ignored
+    assert (profile.ratio < np.inf).sum() > ProfileData(*files).n_problems
+
+    with pytest.raises(ValueError):
+        ProfileData(*files, compare="other")
+
+
+def test_max_memory(random_solvers, caplog, monkeypatch):
+    """The engine is chosen to fit in the memory budget, with the same result"""
+    solvers = random_solvers(8, n_problems=1000)
+    dense = ProfileData(*solvers)
+    with caplog.at_level("INFO", logger="perprof.profile_data"):
+        large = ProfileData(*solvers, max_memory=20 * 1024**2)
+        assert "dense engine" in caplog.text
+        caplog.clear()
+        small = ProfileData(*solvers, max_memory=200_000)
+        assert "sorted engine" in caplog.text
+    for profile in [large, small]:
+        np.testing.assert_array_equal(profile.breakpoints, dense.breakpoints)
+        np.testing.assert_array_equal(profile.cumulative, dense.cumulative)
+
+    # Below the aligned arrays, the ratios are computed in chunks of rows
+    monkeypatch.setattr(profile_data, "MIN_CHUNK_ROWS", 50)
+    for options in [{}, {"grid": 50, "tau": 5.0}, {"grid": 20}]:
+        full = ProfileData(*solvers, **options)
+        with caplog.at_level("INFO", logger="perprof.profile_data"):
+            chunked = ProfileData(*solvers, max_memory=30_000, **options)
+            assert "chunked engine" in caplog.text
+        assert chunked._chunk_rows == 62  # pylint: disable=protected-access
+        np.testing.assert_array_equal(chunked.ratio, full.ratio)
+        np.testing.assert_array_equal(chunked.breakpoints, full.breakpoints)
+        np.testing.assert_array_equal(chunked.cumulative, full.cumulative)
+        pd.testing.assert_frame_equal(chunked.summary(), full.summary())
+        subset = [f"p{i}" for i in range(300)]
+        np.testing.assert_array_equal(
+            chunked.restrict(subset).cumulative, full.restrict(subset).cumulative
+        )
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+
+from perprof import tikz
+from perprof.main import _render_formats
+from perprof.render import RenderJob, output_jobs, render_all, render_outputs
+
+
+@pytest.fixture(name="options")
+def fixture_options(tmp_path, cli_options):
+    """Options of the demo profile, written to `pp.*` in `tmp_path`."""
+    return lambda *extra: cli_options("--mp", "--demo", "-o", tmp_path / "pp", *extra)
+
+
+def test_render_outputs(options):
+    """Each format is rendered, in the order of the formats"""
+    _, parser_options, profiler_options = options()
+    results = render_outputs(
+        "mp",
+        ["svg", "png", "tex", "html"],
+        parser_options,
+        profiler_options,
+        processes=2,
+    )
+    assert [r.error for r in results] == [None] * 4
+    assert [Path(r.output).name for r in results] == [
+        "pp.svg",
+        "pp.png",
+        "pp.tex",
+        "pp.html",
+    ]
+    assert [r.job.backend for r in results] == ["mp", "mp", "tikz", "bokeh"]
+    for result in results:
+        assert Path(result.output).stat().st_size > 0
+
+
+def test_render_errors(options):
+    """Errors are reported in the results without stopping the other jobs"""
+    _, parser_options, profiler_options = options()
+    jobs = [
+        RenderJob("other", parser_options, profiler_options),
+        *output_jobs("mp", ["png"], parser_options, profiler_options),
+    ]
+    results = render_all(jobs, processes=2, pdf_timeout=10)
+    assert results[0].output is None
+    assert "Unexpected backend" in results[0].error
+    assert results[1].error is None
+    assert results[1].job.profiler_options["pdf_timeout"] == 10
+
+    with pytest.raises(NotImplementedError):
+        output_jobs("mp", ["docx"], parser_options, profiler_options)
+
+
+def test_formats_cli(tmp_path, options, cli_options, capsys):
+    """--formats renders every format, and saves the profile if asked"""
+    profile = str(tmp_path / "profile.npz")
+    args, parser_options, profiler_options = options(
+        "--formats", "png,eps", "--jobs", "1", "--save-profile", profile
+    )
+    _render_formats(args, parser_options, profiler_options)
+    assert (tmp_path / "pp.png").exists()
+    assert (tmp_path / "pp.eps").exists()
+    assert Path(profile).exists()
+    assert "pp.png" in capsys.readouterr().out
+
+    with pytest.raises(NotImplementedError):
+        cli_options("--raw", "--demo", "--formats", "png")
+
+
+def test_tex_and_pdf(tmp_path, cli_options, monkeypatch, capsys):
+    """TikZ writes the .tex file once for both tex and pdf, and failures exit"""
+    compiled = []
+
+    def compile_pdf(tex_file, verbose=False, timeout=None):
+        compiled.append(Path(tex_file).read_text(encoding="utf-8"))
+        Path(tex_file).with_suffix(".pdf").write_bytes(b"%PDF")
+
+    monkeypatch.setattr(tikz, "compile_pdf", compile_pdf)
+    args, parser_options, profiler_options = cli_options(
+        "--tikz", "--demo", "-o", tmp_path / "pp", "--formats", "tex,png,pdf", "-j", "1"
+    )
+    jobs = output_jobs("tikz", args.formats, parser_options, profiler_options)
+    assert [(job.backend, Path(job.target).name) for job in jobs] == [
+        ("tikz", "pp.pdf"),
+        ("mp", "pp.png"),
+    ]
+    _render_formats(args, parser_options, profiler_options)
+    assert len(compiled) == 1
+    assert compiled[0].startswith("\\documentclass{standalone}")
+    assert (tmp_path / "pp.tex").read_text(encoding="utf-8") == compiled[0]
+    assert (tmp_path / "pp.pdf").exists()
+    assert (tmp_path / "pp.png").exists()
+    capsys.readouterr()
+
+    def fail(tex_file, verbose=False, timeout=None):
+        raise RuntimeError("pdflatex failed")
+
+    monkeypatch.setattr(tikz, "compile_pdf", fail)
+    with pytest.raises(SystemExit) as error:
+        _render_formats(args, parser_options, profiler_options)
+    assert error.value.code == 1
+    out = capsys.readouterr().out
+    assert "1 outputs could not be rendered" in out
+    assert f"{tmp_path / 'pp.pdf'}: RuntimeError: pdflatex failed" in out
+    assert "pp.png" in out
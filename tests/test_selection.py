@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from perprof.profile_data import ProfileData
+from perprof.selection import ProblemSelection, as_selection
+from perprof.solver_data import SolverData
+
+TESTS_DIR = Path(__file__).resolve().parent
+
+
+@pytest.fixture(name="attributes")
+def fixture_attributes():
+    """Table of problem attributes."""
+    return pd.DataFrame(
+        {
+            "name": ["HS1", "HS2", "HS10", "ROSENBR", "BROWNAL"],
+            "nvar": [2, 2, 2, 2, 200],
+            "ctype": ["bounds", "bounds", "general", "none", "none"],
+        }
+    )
+
+
+def test_names_and_patterns():
+    """Test the selection by exact names and patterns."""
+    problems = ["HS1", "HS2", "HS10", "ROSENBR", "BROWNAL"]
+    selection = ProblemSelection(names=["ROSENBR"], globs=["HS?"])
+    assert np.all(selection.mask(problems) == [True, True, False, True, False])
+    selection = ProblemSelection(patterns=[r"HS\d+"])
+    assert np.all(selection.mask(problems) == [True, True, True, False, False])
+    for problem, expected in zip(problems, selection.mask(problems)):
+        assert (problem in selection) == expected
+    assert ProblemSelection().mask(problems).all()
+
+
+def test_filters(attributes):
+    """Test the selection by problem attributes."""
+    problems = ["HS1", "HS2", "HS10", "ROSENBR", "BROWNAL", "UNKNOWN"]
+    selection = ProblemSelection(
+        attributes=attributes, filters=["nvar < 10", "ctype != 'general'"]
+    )
+    assert np.all(selection.mask(problems) == [True, True, False, True, False, False])
+    selection = ProblemSelection(
+        globs=["HS*"], attributes=attributes, filters=["ctype == 'bounds'"]
+    )
+    assert np.all(selection.mask(problems) == [True, True, False, False, False, False])
+    assert "HS1" in selection
+    assert "HS10" not in selection
+
+    with pytest.raises(ValueError):
+        ProblemSelection(filters=["nvar < 10"])
+    with pytest.raises(ValueError):
+        ProblemSelection(attributes=attributes.drop(columns="name"))
+
+
+def test_from_file():
+    """Test reading a selection from a subset file."""
+    selection = ProblemSelection.from_file(TESTS_DIR / "pattern.subset")
+    assert selection.names == {"3PK"}
+    assert "ACOPP14" in selection
+    assert "ACOPR14" not in selection
+    assert ProblemSelection.from_file(TESTS_DIR / "empty.subset").is_empty()
+
+
+def test_from_file_names(tmp_path):
+    """Lines without a prefix are exact names, even with pattern characters"""
+    subset = tmp_path / "names.subset"
+    subset.write_text("FOO[1]\n#BAR\nHS?\nglob:HS1?\n", encoding="utf-8")
+    selection = ProblemSelection.from_file(subset)
+    assert selection.names == {"FOO[1]", "#BAR", "HS?"}
+    problems = ["FOO[1]", "FOO1", "#BAR", "HS?", "HS2", "HS10"]
+    assert np.all(selection.mask(problems) == [True, False, True, True, False, True])
+
+
+def test_as_selection():
+    """Test the conversion of subset specifications."""
+    assert as_selection(None) is None
+    assert as_selection([]) is None
+    selection = ProblemSelection(names=["p1"])
+    assert as_selection(selection) is selection
+    assert as_selection(("p1", "p2")).names == {"p1", "p2"}
+
+
+def test_profile_data_selection(attributes):
+    """Test ProfileData with a ProblemSelection."""
+    solvers = [
+        SolverData(
+            algname,
+            pd.DataFrame(
+                {
+                    "name": ["HS1", "HS2", "HS10", "ROSENBR", "BROWNAL"],
+                    "exit": ["c"] * 5,
+                    "time": times,
+                }
+            ),
+        )
+        for algname, times in [
+            ("A", [1.0, 2.0, 3.0, 4.0, 5.0]),
+            ("B", [2.0, 1.0, 3.0, 8.0, 1.0]),
+        ]
+    ]
+    selection = ProblemSelection(attributes=attributes, filters=["nvar < 10"])
+    profile_data = ProfileData(*solvers, subset=selection)
+    assert list(profile_data.problems) == ["HS1", "HS2", "HS10", "ROSENBR"]
+    assert np.all(
+        profile_data.ratio == np.array([[1.0, 2.0], [2.0, 1.0], [1.0, 1.0], [1.0, 2.0]])
+    )
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from perprof.profile_data import ProfileData
+from perprof.sketch import QuantileSketch, SketchProfile
+from perprof.streaming import streaming_profile
+
+
+def exact_rank(values, points):
+    return np.searchsorted(np.sort(values), points, side="right")
+
+
+@pytest.fixture(name="solvers")
+def fixture_solvers(random_solvers):
+    """Random solvers over many problems, with failures."""
+    return random_solvers(2, n_problems=5000)
+
+
+@pytest.mark.parametrize("rank_error", [0.05, 0.01, 0.002])
+def test_rank_error_guarantee(rank_error):
+    """The rank error is bounded for any point, also with small batches"""
+    rng = np.random.default_rng(0)
+    values = rng.exponential(size=200_000)
+    sketch = QuantileSketch(rank_error)
+    for batch in np.array_split(values, 400):
+        sketch.update(batch)
+    points = np.quantile(values, np.linspace(0, 1, 101))
+    error = np.abs(sketch.rank(points) - exact_rank(values, points))
+    assert error.max() <= rank_error * len(values)
+    assert sketch.error_weight <= rank_error * len(values)
+    assert sketch.n == len(values)
+    assert sketch.size() < len(values) / 10
+
+
+def test_merge():
+    """Merged sketches keep the guarantee over the union of the values"""
+    rng = np.random.default_rng(1)
+    parts = [rng.normal(loc, size=30_000) for loc in range(4)]
+    sketches = []
+    for part in parts:
+        sketch = QuantileSketch(0.01)
+        sketch.update(part)
+        sketches.append(sketch)
+    merged = sketches[0].merge(*sketches[1:])
+    values = np.concatenate(parts)
+    points = np.linspace(-3, 6, 50)
+    error = np.abs(merged.rank(points) - exact_rank(values, points))
+    assert merged.n == len(values)
+    assert error.max() <= 0.01 * len(values)
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(0.02))
+
+
+def test_quantile():
+    """Quantiles are within the rank error"""
+    values = np.arange(10_000, dtype=float)
+    sketch = QuantileSketch(0.01)
+    sketch.update(values)
+    quantiles = sketch.quantile([0.1, 0.5, 0.9])
+    assert np.all(np.abs(quantiles - [1000, 5000, 9000]) <= 0.01 * 10_000 + 1)
+    assert sketch.quantile([2.0])[0] == float("inf")
+
+
+def test_invalid_rank_error():
+    """The rank error must be in (0, 1)"""
+    with pytest.raises(ValueError):
+        QuantileSketch(0)
+
+
+def test_sketch_profile(solvers):
+    """The approximate profile is within the rank error of the exact one"""
+    exact = ProfileData(*solvers)
+    sketch = exact.sketch(rank_error=0.01)
+    approx = sketch.to_profile()
+    assert approx.n_problems == exact.n_problems
+    assert approx.algnames == exact.algnames
+    cumulative = exact.cumulative[
+        np.searchsorted(exact.breakpoints, approx.breakpoints, side="right") - 1
+    ]
+    assert np.abs(approx.cumulative - cumulative).max() <= 0.01
+    np.testing.assert_allclose(sketch.robustness(), exact.cumulative[-1])
+    np.testing.assert_allclose(sketch.efficiency(), exact.cumulative[0], atol=0.01)
+    assert len(approx.breakpoints) < len(exact.breakpoints)
+
+    grid = sketch.to_profile(grid=20, tau=4.0)
+    assert len(grid.breakpoints) == 20
+    assert grid.breakpoints[-1] == 4.0
+
+
+def test_sketch_profile_merge(solvers, tmp_path):
+    """Sketch profiles of disjoint problems merge, also from files"""
+    first = ProfileData(*solvers, subset=[f"p{i}" for i in range(2000)])
+    second = ProfileData(*solvers[::-1], subset=[f"p{i}" for i in range(2000, 5000)])
+    first.sketch(0.01).save(tmp_path / "first.json")
+    second.sketch(0.01).save(tmp_path / "second.json")
+    merged = SketchProfile.load(tmp_path / "first.json").merge(
+        SketchProfile.load(tmp_path / "second.json")
+    )
+    exact = ProfileData(*solvers)
+    assert merged.n_problems == 5000
+    points = np.array([1.0, 1.5, 2.0, 5.0])
+    cumulative = exact.cumulative[
+        np.searchsorted(exact.breakpoints, points, side="right") - 1
+    ]
+    assert np.abs(merged.evaluate(points) - cumulative).max() <= 0.01
+
+    with pytest.raises(ValueError):
+        merged.merge(SketchProfile(["A", "B"]))
+    (tmp_path / "other.json").write_text('{"format": "other"}')
+    with pytest.raises(ValueError):
+        SketchProfile.load(tmp_path / "other.json")
+
+
+def test_streaming_sketch(solvers):
+    """Streaming profiles can accumulate sketches instead of grid counts"""
+    exact = ProfileData(*solvers)
+    approx = streaming_profile(*solvers, grid=None, chunk_size=1000, rank_error=0.01)
+    assert approx.n_problems == exact.n_problems
+    cumulative = exact.cumulative[
+        np.searchsorted(exact.breakpoints, approx.breakpoints, side="right") - 1
+    ]
+    assert np.abs(approx.cumulative - cumulative).max() <= 0.01
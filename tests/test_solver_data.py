@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from perprof.solver_data import SolverData, read_table
+from perprof.solver_data import SolverData, read_arrow, read_table
 
 DATA_DIR = Path(__file__).resolve().parent / "test_data/"
 
@@ -50,3 +50,69 @@ def test_read_table(auxiliary_data):
     """Test function read_table."""
     solver = read_table(DATA_DIR / "simple_solver_a.table")
     assert solver.data.equals(auxiliary_data)
+
+
+def test_read_table_columns(tmp_path):
+    """Test the columns option of table files."""
+    solver = read_table(DATA_DIR / "multi_cost.table")
+    assert list(solver.data.columns[:5]) == ["name", "exit", "iter", "time", "nfev"]
+    assert solver.data["iter"].tolist() == [10, 25, 100, 3]
+    assert solver.data["time"].tolist() == [1.0, 2.5, 9.0, 0.1]
+
+    filename = tmp_path / "bad.table"
+    filename.write_text("---\ncolumns: name time iter\n---\np1 1.0 2\n")
+    with pytest.raises(ValueError):
+        read_table(filename)
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".feather", ".arrow"])
+def test_arrow(auxiliary_data, tmp_path, extension):
+    """Test writing and reading Parquet and Arrow/Feather files."""
+    pytest.importorskip("pyarrow")
+    filename = tmp_path / f"solver{extension}"
+    data = auxiliary_data.assign(iterations=[1, 2, 3, 4])
+    SolverData("A", data, success=["c", "s"]).write_arrow(filename)
+
+    solver = read_arrow(filename)
+    assert solver.algname == "A"
+    assert solver.success == ["c", "s"]
+    assert solver.data.equals(auxiliary_data)
+
+    # Column projection and predicate pushdown
+    solver = read_arrow(filename, algname="B", columns=[], subset=["p2", "p4"])
+    assert solver.algname == "B"
+    assert list(solver.data.name) == ["p2", "p4"]
+    assert list(solver.data.time) == [5.0, 60.0]
+    assert solver.data.fval.isna().all()
+
+    solver = SolverData("C", filename)
+    assert solver.algname == "C"
+    assert solver.success == ["c", "s"]
+    assert solver.data.equals(data[solver.data.columns])
+
+    with pytest.raises(ValueError):
+        read_arrow(tmp_path / "solver.csv")
+
+
+def test_arrow_path(tmp_path):
+    """A file path reads all the columns, success flags and metadata stored"""
+    pytest.importorskip("pyarrow")
+    filename = tmp_path / "solver.parquet"
+    data = pd.DataFrame(
+        {"name": ["p1", "p2"], "exit": ["ok", "c"], "time": [1.0, 2.0], "iter": [3, 4]}
+    )
+    SolverData("A", data, success=["ok"], metadata={"version": "1.2"}).write_arrow(
+        filename
+    )
+
+    solver = SolverData(None, filename)
+    assert solver.algname == "A"
+    assert solver.success == ["ok"]
+    assert solver.metadata == {"version": "1.2"}
+    assert solver.data["iter"].tolist() == [3, 4]
+    stored = read_arrow(filename, columns=["iter"])
+    assert solver.data[stored.data.columns].equals(stored.data)
+    assert solver.success == stored.success
+
+    solver = SolverData("B", filename, success=["c"], metadata={})
+    assert (solver.algname, solver.success, solver.metadata) == ("B", ["c"], {})
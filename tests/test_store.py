@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from perprof.parse import parse_file
+from perprof.profile_data import ProfileData
+from perprof.solver_data import SolverData, read_table
+from perprof.store import ResultsStore
+
+TABLE = """---
+algname: Newton
+success: c
+version: 2.1
+machine: cluster-7
+date: 2024-05-01
+---
+p1 c 1.0
+p2 d 2.0
+p3 c 0.5
+"""
+
+
+@pytest.fixture(name="solvers")
+def fixture_solvers(random_solvers):
+    """Random results of three solvers, with ties, failures, zeros and missing problems."""
+    rng = np.random.default_rng(5)
+    solvers = random_solvers(5, n_problems=200, n_rows=180)
+    for solver in solvers:
+        time = solver.data["time"].to_numpy().copy()
+        time[rng.random(len(time)) < 0.05] = 0.0
+        time[rng.random(len(time)) < 0.05] = np.nan
+        solver.data["time"] = time
+    return solvers
+
+
+def test_profile_matches(solvers):
+    """The profile computed in SQL is the one of ProfileData"""
+    with ResultsStore() as store:
+        for solver in solvers:
+            store.add(solver)
+        for options in [{}, {"grid": 20, "tau": 4.0}, {"cumulative_dtype": "uint32"}]:
+            expected = ProfileData(*solvers, **options)
+            profile = store.profile(["A", "B", "C"], **options)
+            assert profile.algnames == expected.algnames
+            assert set(profile.problems) == set(expected.problems)
+            order = expected.problems.get_indexer(profile.problems)
+            assert np.array_equal(profile.ratio, expected.ratio[order])
+            assert np.array_equal(profile.breakpoints, expected.breakpoints)
+            assert np.array_equal(profile.solved_counts, expected.solved_counts)
+
+        subset = ["p1", "p5", "p7", "missing"]
+        profile = store.profile([3, 1], subset=subset)
+        expected = ProfileData(solvers[2], solvers[0], subset=subset)
+        assert profile.algnames == ["C", "A"]
+        order = expected.problems.get_indexer(profile.problems)
+        assert np.array_equal(profile.ratio, expected.ratio[order])
+
+
+def test_historical_runs(solvers, tmp_path):
+    """Runs are kept across sessions, and runs of a solver can be compared"""
+    path = tmp_path / "results.db"
+    with ResultsStore(path) as store:
+        old = store.add(solvers[0], version="1.0")
+        store.add(solvers[1])
+    with ResultsStore(path) as store:
+        new = store.add(SolverData("A", solvers[2].data), version="1.1")
+        assert store.latest_run("A") == new
+        runs = store.runs("A")
+        assert list(runs.index) == [old, new]
+        assert runs["version"].tolist() == ["1.0", "1.1"]
+        assert runs.loc[old, "problems"] == len(solvers[0].data)
+        profile = store.profile([old, new])
+        assert profile.algnames == ["A #1", "A #3"]
+        profile = store.profile([old, new], algnames=["A 1.0", "A 1.1"])
+        assert profile.algnames == ["A 1.0", "A 1.1"]
+
+        with pytest.raises(ValueError):
+            store.profile([old])
+        with pytest.raises(ValueError):
+            store.profile([old, old])
+        with pytest.raises(KeyError):
+            store.profile([old, 42])
+        with pytest.raises(KeyError):
+            store.profile(["A", "D"])
+
+
+def test_table_metadata(tmp_path):
+    """The run metadata of the YAML header is read and stored"""
+    (tmp_path / "newton.table").write_text(TABLE, encoding="utf-8")
+    solver = read_table(tmp_path / "newton.table")
+    assert solver.metadata == {
+        "version": "2.1",
+        "machine": "cluster-7",
+        "date": "2024-05-01",
+    }
+    parser_options = {
+        "subset": None,
+        "success": "c",
+        "mintime": 0,
+        "maxtime": float("inf"),
+        "compare": "exitflag",
+        "free_format": True,
+        "unc": False,
+        "infeas_tol": 1e-4,
+    }
+    data, algname = parse_file(str(tmp_path / "newton.table"), parser_options)
+    assert algname == "Newton"
+    assert len(data) == 3
+
+    with ResultsStore() as store:
+        run_id = store.add_table(tmp_path / "newton.table", machine="laptop")
+        runs = store.runs()
+        assert runs.loc[run_id, "machine"] == "laptop"
+        assert runs.loc[run_id, "date"] == "2024-05-01"
+        assert runs.loc[run_id, "solved"] == 2
+        stored = store.solver_data(run_id)
+        assert stored.algname == "Newton"
+        assert stored.success == ["c"]
+        assert stored.metadata["machine"] == "laptop"
+        assert stored.data.equals(solver.data)
+        with pytest.raises(KeyError):
+            store.solver_data(42)
+
+        repeated = pd.DataFrame(
+            {"name": ["p1", "p1"], "exit": ["c", "c"], "time": [1, 2]}
+        )
+        with pytest.raises(ValueError):
+            store.add(SolverData("R", repeated))
+        assert len(store.runs()) == 1
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from perprof import streaming
+from perprof.profile_data import ProfileData
+from perprof.streaming import count_rows, iter_chunks, streaming_profile
+
+DATA_DIR = Path(__file__).resolve().parent / "test_data/"
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "perprof/examples/"
+
+
+@pytest.fixture(name="solvers")
+def fixture_solvers(random_solvers):
+    """Random solvers with shuffled and partially missing problems."""
+    return random_solvers(0, n_problems=200, n_rows=180)
+
+
+def test_iter_chunks():
+    """Test reading sources in chunks."""
+    chunks = list(iter_chunks(DATA_DIR / "simple_solver_a.table", 3))
+    assert [len(chunk.data) for chunk in chunks] == [3, 1]
+    assert chunks[0].algname == "A"
+    chunks = list(iter_chunks(DATA_DIR / "simple_solver_a.csv", 2))
+    assert [list(chunk.data.name) for chunk in chunks] == [["p1", "p2"], ["p3", "p4"]]
+    assert count_rows(DATA_DIR / "simple_solver_a.csv") >= 4
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 37, 7])
+def test_streaming_profile(solvers, chunk_size):
+    """Test that the streaming profile matches the in-memory one."""
+    grid = np.geomspace(1.0, 20.0, 30)
+    expected = ProfileData(*solvers, grid=grid)
+    profile = streaming_profile(*solvers, grid=grid, chunk_size=chunk_size)
+    assert profile.algnames == ["A", "B", "C"]
+    assert profile.n_problems == expected.n_problems
+    assert np.all(profile.breakpoints == grid)
+    assert np.all(profile.solved_counts == expected.solved_counts)
+    assert np.allclose(profile.cumulative, expected.cumulative)
+
+
+def test_streaming_files():
+    """Test the streaming profile from table files."""
+    files = [EXAMPLES_DIR / f"{name}.table" for name in ["alpha", "beta", "gamma"]]
+    expected = ProfileData(*files, grid=50, tau=10.0)
+    profile = streaming_profile(*files, grid=50, tau=10.0, chunk_size=100)
+    assert np.allclose(profile.breakpoints, expected.breakpoints)
+    assert np.all(profile.solved_counts == expected.solved_counts)
+
+    with pytest.raises(ValueError):
+        streaming_profile(*files, grid=50)
+    with pytest.raises(ValueError):
+        streaming_profile(files[0], grid=50, tau=10.0)
+
+
+def test_streaming_reads_once(solvers, monkeypatch):
+    """Each source is read once, whatever the number of partitions"""
+    reads = []
+    original = streaming.iter_chunks
+
+    def iter_chunks_(source, chunk_size, columns=None):
+        reads.append(source.algname)
+        return original(source, chunk_size, columns)
+
+    monkeypatch.setattr(streaming, "iter_chunks", iter_chunks_)
+    for chunk_size in [1000, 7]:
+        reads.clear()
+        streaming_profile(*solvers, grid=[1.0, 2.0], chunk_size=chunk_size)
+        assert reads == ["A", "B", "C"]
+
+
+def test_streaming_grid_tau(solvers):
+    """An explicit grid is clipped to tau, as in ProfileData"""
+    grid = np.geomspace(1.0, 20.0, 30)
+    expected = ProfileData(*solvers, grid=grid, tau=5.0)
+    profile = streaming_profile(*solvers, grid=grid, tau=5.0, chunk_size=37)
+    assert np.all(profile.breakpoints == expected.breakpoints)
+    assert profile.breakpoints.max() <= 5.0
+    assert np.all(profile.solved_counts == expected.solved_counts)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from perprof.profile_data import ProfileData
+from perprof.summary import format_summary, summary_metrics
+
+
+@pytest.fixture(name="profile")
+def fixture_profile(random_solvers):
+    """Random solvers with ties and failures."""
+    return ProfileData(*random_solvers(3, algnames="ABCD"))
+
+
+def test_summary(profile):
+    """The metrics agree with the profile and with direct computations"""
+    summary = profile.summary(levels=[0.25, 0.5])
+    assert list(summary.index) == profile.algnames
+    np.testing.assert_allclose(summary["robustness"], profile.cumulative[-1])
+    np.testing.assert_allclose(summary["efficiency"], profile.cumulative[0])
+
+    # The area under the step function of the profile
+    tau = profile.breakpoints[-1]
+    steps = np.diff(np.append(profile.breakpoints, tau), axis=0)
+    area = (profile.cumulative * steps[:, np.newaxis]).sum(axis=0)
+    np.testing.assert_allclose(summary["auc"], area / (tau - 1))
+
+    for j, algname in enumerate(profile.algnames):
+        column = profile.ratio[:, j]
+        others = np.delete(profile.ratio, j, axis=1).min(axis=1)
+        assert summary.loc[algname, "wins"] == ((column == 1) & (others > 1)).sum()
+        assert summary.loc[algname, "ties"] == ((column == 1) & (others == 1)).sum()
+        for level in [0.25, 0.5]:
+            at_level = summary.loc[algname, f"ratio_at_{100 * level:g}"]
+            reached = profile.breakpoints[profile.cumulative[:, j] >= level]
+            assert at_level == (reached[0] if reached.size > 0 else np.inf)
+
+    solved = np.isfinite(profile.ratio).all(axis=1)
+    times = profile.ratio[solved] * profile._best_times[solved, np.newaxis]
+    np.testing.assert_allclose(
+        summary["sgm_time"], np.exp(np.log(times + 10).mean(axis=0)) - 10
+    )
+
+
+def test_summary_tau(profile):
+    """With tau, the area only goes up to tau"""
+    summary = profile.summary(tau=1.0)
+    np.testing.assert_allclose(summary["auc"], summary["efficiency"])
+    assert (profile.summary(tau=2.0)["auc"] <= 1).all()
+
+
+def test_summary_loaded(profile, tmp_path):
+    """Profiles loaded from files have the same summary"""
+    profile.save(tmp_path / "profile.npz")
+    loaded = ProfileData.load(tmp_path / "profile.npz")
+    pd.testing.assert_frame_equal(loaded.summary(), profile.summary())
+
+
+def test_summary_without_times():
+    """Without times, the shifted geometric mean is NaN"""
+    summary = summary_metrics(np.array([[1.0, np.inf]]), ["A", "B"])
+    assert np.isnan(summary["sgm_time"]).all()
+    assert summary["ratio_at_90"].tolist() == [1.0, np.inf]
+
+
+@pytest.mark.parametrize("fmt", ["text", "csv", "tex"])
+def test_format_summary(profile, fmt):
+    """Each format has a line for each solver"""
+    table = format_summary(profile.summary(), fmt)
+    for algname in profile.algnames:
+        assert any(line.startswith(algname) for line in table.splitlines())
+    if fmt == "tex":
+        assert table.startswith("\\begin{tabular}")
+        assert "ratio\\_at\\_50" in table
+    with pytest.raises(ValueError):
+        format_summary(profile.summary(), "xlsx")
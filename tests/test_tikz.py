@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from perprof import tikz
+
+
+@pytest.fixture(name="profiler")
+def fixture_profiler(tmp_path, cli_options):
+    """Create a TikZ profiler of the demo profile, written to `tmp_path`."""
+
+    def profiler(name, *extra, output_format="--pdf"):
+        argv = ["--tikz", output_format, "--demo", "-o", tmp_path / name, *extra]
+        return tikz.Profiler(*cli_options(*argv)[1:])
+
+    return profiler
+
+
+def test_tex_parts(profiler):
+    """plot writes the preamble and the figure of the profile"""
+    pdata = profiler("pp", "--standalone", output_format="--tex")
+    pdata.plot()
+    content = Path(pdata.output).read_text(encoding="utf-8")
+    expected = pdata.tex_preamble() + pdata.tex_figure() + ["\\end{document}"]
+    assert content == "\n".join(expected)
+
+
+def test_compile_batch(tmp_path, profiler, cli_options, monkeypatch):
+    """Profiles with the same preamble are compiled in one document"""
+    compiled = []
+    splits = []
+
+    def compile_pdf(tex_file, verbose=False, timeout=None):
+        compiled.append(Path(tex_file).read_text(encoding="utf-8"))
+        assert timeout == 30
+
+    def split_pdf(pdf_file, outputs):
+        splits.append(outputs)
+        for output in outputs:
+            Path(output).write_bytes(b"%PDF")
+
+    monkeypatch.setattr(tikz, "compile_pdf", compile_pdf)
+    monkeypatch.setattr(tikz, "split_pdf", split_pdf)
+    profilers = [
+        profiler("a"),
+        profiler("b", "--page-background", "1,2,3"),
+        profiler("c", "--semilog"),
+    ]
+    pdfs = tikz.compile_batch(profilers, timeout=30)
+
+    assert [Path(pdf).name for pdf in pdfs] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert len(compiled) == 2
+    assert compiled[0].startswith("\\documentclass[multi=tikzpicture]{standalone}")
+    assert compiled[0].count("\\begin{tikzpicture}") == 2
+    assert compiled[1].count("\\begin{tikzpicture}") == 1
+    assert [[Path(p).name for p in s] for s in splits] == [
+        ["a.pdf", "c.pdf"],
+        ["b.pdf"],
+    ]
+    for name in "abc":
+        assert (tmp_path / f"{name}.tex").exists()
+        assert (tmp_path / f"{name}.pdf").exists()
+
+    stdout = tikz.Profiler(*cli_options("--tikz", "--demo")[1:])
+    with pytest.raises(ValueError):
+        tikz.compile_batch([stdout])
+
+
+def test_split_pdf_requires_tools(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pypdf", None)
+    monkeypatch.setattr(tikz.shutil, "which", lambda _: None)
+    with pytest.raises(RuntimeError):
+        tikz.split_pdf(str(tmp_path / "batch.pdf"), [str(tmp_path / "a.pdf")])